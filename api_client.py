@@ -0,0 +1,235 @@
+"""STT와 ChatGPT가 함께 쓰는 OpenAI API 클라이언트
+
+- 프로세스 전체에서 API 키별로 클라이언트 하나를 공유 (SDK의 HTTP 연결 풀 + keep-alive 재사용)
+- 재시도 가능한 오류는 지터가 들어간 지수 백오프로 재시도 (timeout을 주면 재시도까지 합친 전체 제한 시간)
+- 연속으로 실패하면 서킷 브레이커가 열려서 한동안 요청을 바로 거절 (장애 중 요청이 쌓이지 않게)
+
+base_url을 지정하지 않으면 OpenAI SDK 규칙대로 OPENAI_BASE_URL 환경 변수를 따르므로
+fake_openai_server.py 같은 로컬 서버로 돌려서 테스트할 수 있다.
+
+openai 패키지는 로드가 무거워서(수백 ms) 클라이언트를 처음 만들 때 import한다.
+"""
+import random
+import threading
+import time
+
+from telemetry import REGISTRY, trace
+
+_RETRIES = REGISTRY.counter("openai_retries_total", "재시도한 API 요청 수")
+_FAILURES = REGISTRY.counter("openai_failures_total", "최종 실패한 API 요청 수")
+_REJECTED = REGISTRY.counter("openai_rejected_total", "서킷 브레이커로 차단된 API 요청 수")
+
+
+def _request_seconds(endpoint):
+    return REGISTRY.histogram("openai_request_seconds", "API 요청 시도별 응답 시간 (초)", endpoint=endpoint)
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어서 요청을 보내지 않음"""
+
+
+class RetryPolicy:
+    """지터가 들어간 지수 백오프 (full jitter)"""
+
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=8.0, min_attempt_seconds=0.5):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_attempt_seconds = min_attempt_seconds  # 마감까지 이보다 적게 남으면 재시도하지 않음
+
+    def delay(self, attempt):
+        """attempt번째(0부터) 실패 후 기다릴 시간"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def is_retryable(error):
+    """일시적인 오류인지 판단 (연결/타임아웃, 408/409/429, 5xx)"""
+    from openai import APIConnectionError, APIStatusError  # 클라이언트를 만든 뒤에만 불리므로 이미 로드됨
+    if isinstance(error, APIConnectionError):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """연속 실패가 failure_threshold번 쌓이면 reset_timeout초 동안 요청을 차단
+
+    차단 시간이 지나면 요청 하나만 시험적으로 보내고(half-open), 성공하면 다시 닫힘.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """요청을 보내도 되면 True"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release(self):
+        """장애와 관계없는 결과: 상태는 그대로 두고 시험 요청 자리만 반납 (다음 요청이 다시 시험)"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"[ERROR] API 연속 실패 {self._failures}회 - {self.reset_timeout}초 동안 요청 차단")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class APIClient:
+    """연결 풀을 공유하는 OpenAI 클라이언트 + 재시도 + 서킷 브레이커"""
+
+    def __init__(self, api_key, base_url=None, timeout=60.0, retry=None, breaker=None):
+        # OpenAI 클라이언트는 내부 HTTP 연결 풀(keep-alive)을 가지고 있으므로 인스턴스 하나를
+        # 계속 재사용하면 요청마다 TCP/TLS 연결을 새로 맺지 않음.
+        # 재시도는 여기서 직접 처리하므로 SDK 자체 재시도는 끔
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+
+        # 통계
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0  # 서킷 브레이커로 차단된 요청
+
+    def call(self, func, endpoint="other", **kwargs):
+        """func(**kwargs)를 재시도/차단 정책에 따라 호출 (endpoint는 지표/트레이스 구분용)
+
+        kwargs에 timeout이 있으면 모든 시도와 대기를 합친 마감으로 보고, 시도마다 남은 시간만 준다
+        (작업 풀이 요청을 포기한 뒤에도 뒤에서 재시도가 계속되지 않게).
+        """
+        upload = kwargs.get("file")
+        timeout = kwargs.get("timeout")
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.rejected += 1
+                _REJECTED.inc()
+                raise CircuitOpenError("API 장애로 잠시 요청을 보내지 않습니다 (서킷 브레이커 열림)")
+            if hasattr(upload, "seek"):
+                upload.seek(0)  # 재시도 시 업로드 파일을 처음부터 다시 읽도록
+            if deadline is not None:
+                kwargs["timeout"] = max(deadline - time.monotonic(), 0.001)
+            self.requests += 1
+            started = time.perf_counter()
+            try:
+                result = func(**kwargs)
+            except Exception as e:
+                elapsed = time.perf_counter() - started
+                _request_seconds(endpoint).observe(elapsed)
+                trace("api_request", elapsed, endpoint=endpoint, attempt=attempt + 1, ok=False, error=type(e).__name__)
+                if not is_retryable(e):
+                    # 요청 자체의 문제(인증, 잘못된 파라미터 등)는 장애도 회복도 아니므로 상태는 그대로
+                    self.breaker.release()
+                    self.failures += 1
+                    _FAILURES.inc()
+                    raise
+                self.breaker.record_failure()
+                attempt += 1
+                if attempt >= self.retry.max_attempts:
+                    self.failures += 1
+                    _FAILURES.inc()
+                    raise
+                delay = self.retry.delay(attempt - 1)
+                if deadline is not None and time.monotonic() + delay + self.retry.min_attempt_seconds > deadline:
+                    self.failures += 1  # 다시 보내도 마감 안에 끝날 수 없음
+                    _FAILURES.inc()
+                    raise
+                self.retries += 1
+                _RETRIES.inc()
+                print(f"[DEBUG] API 재시도 {attempt}/{self.retry.max_attempts - 1} ({delay:.2f}초 후): {str(e)}")
+                time.sleep(delay)
+                continue
+            elapsed = time.perf_counter() - started
+            _request_seconds(endpoint).observe(elapsed)
+            trace("api_request", elapsed, endpoint=endpoint, attempt=attempt + 1, ok=True)
+            self.breaker.record_success()
+            return result
+
+    def transcribe(self, **kwargs):
+        return self.call(self.client.audio.transcriptions.create, endpoint="transcriptions", **kwargs)
+
+    def chat(self, **kwargs):
+        return self.call(self.client.chat.completions.create, endpoint="chat", **kwargs)
+
+    def chat_stream(self, **kwargs):
+        """스트리밍 채팅 (재시도는 연결/첫 응답까지만, 이후 끊기면 호출한 쪽에서 처리)"""
+        return self.call(self.client.chat.completions.create, endpoint="chat_stream", stream=True, **kwargs)
+
+    def warm_up(self, timeout=5.0):
+        """첫 요청 전에 SDK 리소스 모듈을 로드하고 연결 풀에 연결 하나를 맺어 둠 (실패하면 False)
+
+        모델 목록 조회(GET /models)는 과금되지 않는 가벼운 요청이라 keep-alive 연결 준비용으로 사용.
+        """
+        started = time.perf_counter()
+        self.client.audio.transcriptions  # SDK는 리소스 모듈을 처음 접근할 때 import함
+        self.client.chat.completions
+        try:
+            self.client.models.list(timeout=timeout)
+        except Exception as e:
+            trace("api_warmup", time.perf_counter() - started, ok=False, error=type(e).__name__)
+            print(f"[DEBUG] API 연결 예열 실패 (첫 요청 때 다시 연결): {str(e)}")
+            return False
+        trace("api_warmup", time.perf_counter() - started, ok=True)
+        return True
+
+    def close(self):
+        self.client.close()
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "breaker": self.breaker.state,
+        }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key, base_url=None):
+    """API 키(+base_url)별로 프로세스 전체에서 공유하는 APIClient 반환"""
+    key = (api_key, base_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = APIClient(api_key, base_url=base_url)
+            _clients[key] = client
+        return client
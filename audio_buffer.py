@@ -0,0 +1,85 @@
+class PCMRingBuffer:
+    """고정 크기 PCM 링 버퍼 (프레임 단위)
+
+    내부 bytearray를 용량의 2배로 잡고 모든 쓰기를 미러 영역에도 기록한다.
+    그래서 용량 이하 길이의 구간은 경계를 넘어가도 항상 연속된 memoryview로
+    꺼낼 수 있다 (읽을 때 복사 없음). 청크 하나는 최대 3번의 슬라이스 복사로 기록됨.
+
+    반환되는 memoryview는 내부 버퍼를 그대로 가리키므로 다음 write 전에 사용하거나
+    bytes()로 복사해야 한다. 동기화는 호출하는 쪽(recording_lock)에서 처리.
+    """
+
+    def __init__(self, capacity_frames, frame_size, buffer=None):
+        self.frame_size = frame_size
+        self.capacity = capacity_frames * frame_size
+        # buffer를 주면 그 메모리(공유 메모리 등, 용량의 2배 이상)를 그대로 사용
+        self._buf = buffer if buffer is not None else bytearray(self.capacity * 2)
+        self._view = memoryview(self._buf).cast("B")[:self.capacity * 2]
+        self._pos = 0  # 다음 쓰기 위치 (0 <= _pos < capacity)
+        self.total_written = 0  # 지금까지 기록된 누적 바이트 수 (절대 위치)
+
+    def __len__(self):
+        return min(self.total_written, self.capacity)
+
+    def clear(self):
+        self._pos = 0
+        self.total_written = 0
+
+    def release(self):
+        """외부 buffer(공유 메모리)를 쓸 때, 그 메모리를 닫기 전에 호출"""
+        self._view.release()
+        if isinstance(self._buf, memoryview):
+            self._buf.release()
+
+    def sync(self, total_written):
+        """다른 곳(다른 프로세스)에서 기록한 누적 위치에 맞춤 (읽기 전용으로 쓸 때)"""
+        self.total_written = total_written
+        self._pos = total_written % self.capacity
+
+    def write(self, data):
+        """청크 전체를 한 번에 기록 (용량보다 크면 마지막 용량분만 유지)"""
+        mv = memoryview(data).cast("B")
+        n = len(mv)
+        if n == 0:
+            return
+        cap = self.capacity
+        if n > cap:
+            # 앞부분은 어차피 덮어써지므로 위치만 전진
+            skipped = n - cap
+            self._pos = (self._pos + skipped) % cap
+            self.total_written += skipped
+            mv = mv[skipped:]
+            n = cap
+
+        pos = self._pos
+        buf = self._view
+        buf[pos:pos + n] = mv
+        if pos + n <= cap:
+            buf[pos + cap:pos + n + cap] = mv
+        else:
+            k = cap - pos
+            buf[pos + cap:cap * 2] = mv[:k]
+            buf[0:n - k] = mv[k:]
+
+        self._pos = (pos + n) % cap
+        self.total_written += n
+
+    def latest(self, nbytes=None):
+        """가장 최근 nbytes(기본: 버퍼 전체)를 연속된 memoryview로 반환"""
+        available = len(self)
+        if nbytes is None or nbytes > available:
+            nbytes = available
+        nbytes -= nbytes % self.frame_size
+        end = self._pos + self.capacity
+        return self._view[end - nbytes:end].toreadonly()
+
+    def window(self, start, end):
+        """절대 바이트 위치 [start, end) 구간을 memoryview로 반환
+
+        이미 덮어써진 구간이거나 아직 기록되지 않은 구간이면 ValueError.
+        """
+        oldest = self.total_written - len(self)
+        if start < oldest or end > self.total_written or start > end:
+            raise ValueError(f"버퍼 범위를 벗어난 구간: [{start}, {end}) (유효 범위: [{oldest}, {self.total_written}))")
+        phys_end = self._pos + self.capacity - (self.total_written - end)
+        return self._view[phys_end - (end - start):phys_end].toreadonly()
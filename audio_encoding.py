@@ -0,0 +1,119 @@
+"""STT 업로드용 오디오 인코딩 (다운믹스 + 리샘플링 + 메모리 내 컨테이너 생성)
+
+Whisper는 16kHz 모노면 충분하므로 44.1kHz 스테레오 원본을 그대로 보내지 않고
+numpy로 한 번에 변환한 뒤 BytesIO에 담아 업로드한다 (임시 파일 없음).
+"""
+import io
+import wave
+
+import numpy as np
+
+CONTAINERS = ("wav", "flac", "ogg")
+
+# 컨테이너별 soundfile 포맷/서브타입
+_SOUNDFILE_FORMATS = {
+    "flac": ("FLAC", "PCM_16"),
+    "ogg": ("OGG", "VORBIS"),
+}
+
+_soundfile = None
+
+
+def _load_soundfile():
+    """FLAC/OGG 압축 컨테이너용 soundfile (선택 사항, 처음 필요할 때 로드). 없으면 None"""
+    global _soundfile
+    if _soundfile is None:
+        try:
+            import soundfile
+        except ImportError:
+            soundfile = False
+        _soundfile = soundfile
+    return _soundfile or None
+
+
+class EncodingConfig:
+    """업로드 포맷 설정
+
+    container: "wav" (기본, 추가 패키지 불필요), "flac" 또는 "ogg" (soundfile 필요)
+    fallback: soundfile이 없어 wav로 바꿨으면 그 안내 문구 (쓰는 쪽이 상태 표시/로그로 알림), 아니면 None
+    """
+
+    def __init__(self, sample_rate=16000, channels=1, container="wav"):
+        if container not in CONTAINERS:
+            raise ValueError(f"지원하지 않는 컨테이너: {container} (가능: {', '.join(CONTAINERS)})")
+        if channels not in (1, 2):
+            raise ValueError(f"채널 수는 1 또는 2여야 합니다: {channels}")
+        self.fallback = None
+        if container != "wav" and _load_soundfile() is None:
+            self.fallback = f"soundfile 패키지가 없어 {container} 대신 wav로 인코딩합니다 (pip install soundfile)"
+            container = "wav"
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.container = container
+
+
+def _lowpass_kernel(cutoff, taps=31):
+    """windowed-sinc 저역 통과 필터 (cutoff는 원본 샘플레이트 대비 비율, 0~0.5)"""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return kernel / kernel.sum()
+
+
+def resample(samples, src_rate, dst_rate):
+    """float32 샘플 배열(프레임, 채널)을 dst_rate로 리샘플링
+
+    다운샘플링 시 에일리어싱을 막기 위해 먼저 저역 통과 필터를 거친 뒤 선형 보간.
+    """
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples
+    n_out = len(samples) * dst_rate // src_rate
+    if dst_rate < src_rate:
+        kernel = _lowpass_kernel(0.5 * dst_rate / src_rate * 0.9)
+        samples = np.stack(
+            [np.convolve(samples[:, ch], kernel, mode="same") for ch in range(samples.shape[1])],
+            axis=1,
+        )
+    positions = np.arange(n_out) * (src_rate / dst_rate)
+    src_index = np.arange(len(samples))
+    return np.stack(
+        [np.interp(positions, src_index, samples[:, ch]) for ch in range(samples.shape[1])],
+        axis=1,
+    ).astype(np.float32)
+
+
+def convert_pcm(pcm, channels, sample_width, rate, config):
+    """16bit PCM 바이트를 config의 채널 수/샘플레이트로 변환한 int16 배열(프레임, 채널) 반환"""
+    if sample_width != 2:
+        raise ValueError(f"16bit PCM만 지원합니다 (sample_width={sample_width})")
+    samples = np.frombuffer(pcm, dtype="<i2").reshape(-1, channels).astype(np.float32)
+
+    if config.channels == 1 and channels > 1:
+        samples = samples.mean(axis=1, keepdims=True)
+    elif config.channels > channels:
+        samples = np.repeat(samples, config.channels, axis=1)
+
+    samples = resample(samples, rate, config.sample_rate)
+    return np.clip(np.rint(samples), -32768, 32767).astype("<i2")
+
+
+def encode_pcm(pcm, channels, sample_width, rate, config, name="audio"):
+    """PCM 바이트를 업로드용 파일 객체(BytesIO)로 인코딩
+
+    반환된 객체의 name 속성에 확장자가 붙어 있어 OpenAI API가 포맷을 판단할 수 있음.
+    """
+    samples = convert_pcm(pcm, channels, sample_width, rate, config)
+    container = config.container
+    out = io.BytesIO()
+    if container == "wav":
+        with wave.open(out, "wb") as wf:
+            wf.setnchannels(config.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(config.sample_rate)
+            wf.writeframes(samples.tobytes())
+    else:
+        fmt, subtype = _SOUNDFILE_FORMATS[container]
+        _load_soundfile().write(out, samples, config.sample_rate, format=fmt, subtype=subtype)
+
+    out.name = f"{name}.{container}"
+    out.seek(0)
+    return out
@@ -0,0 +1,74 @@
+"""STT 백엔드
+
+파이프라인/배치 모드는 TranscriptionBackend.transcribe(audio_file)만 호출하므로
+백엔드를 바꿔 끼울 수 있다. LocalBackend는 네트워크 없이 동작하는 대체 구현
+(음성 길이만 텍스트로 돌려줌)이라 API 키 없이 전체 경로를 확인할 때 쓴다.
+"""
+import abc
+import io
+import wave
+
+
+class TranscriptionBackend(abc.ABC):
+    """STT 백엔드 인터페이스
+
+    audio_file: name 속성(확장자 포함)을 가진 파일 객체 (audio_encoding.encode_pcm 결과)
+    """
+    name = "base"
+
+    @abc.abstractmethod
+    def transcribe(self, audio_file, language="ko", timeout=None):
+        """인식한 텍스트 반환 (실패하면 예외)"""
+
+    def stats(self):
+        return {}
+
+
+class OpenAIBackend(TranscriptionBackend):
+    """OpenAI Whisper API (공유 APIClient 사용)"""
+    name = "openai"
+
+    def __init__(self, api_key, base_url=None, model="whisper-1"):
+        from api_client import get_client  # openai 패키지가 없어도 LocalBackend는 쓸 수 있도록 여기서 import
+        self.client = get_client(api_key, base_url)
+        self.model = model
+
+    def transcribe(self, audio_file, language="ko", timeout=None):
+        kwargs = {"model": self.model, "file": audio_file, "language": language}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return self.client.transcribe(**kwargs).text
+
+    def stats(self):
+        return self.client.stats()
+
+
+class LocalBackend(TranscriptionBackend):
+    """오프라인 대체 백엔드: 실제 인식 없이 구간 길이를 텍스트로 반환"""
+    name = "local"
+
+    def transcribe(self, audio_file, language="ko", timeout=None):
+        audio_file.seek(0)
+        data = audio_file.read()
+        audio_file.seek(0)
+        try:
+            with wave.open(io.BytesIO(data), "rb") as wf:
+                seconds = wf.getnframes() / wf.getframerate()
+        except wave.Error:
+            return f"[음성 {len(data)} bytes]"
+        return f"[음성 {seconds:.1f}초]"
+
+
+BACKENDS = {
+    OpenAIBackend.name: OpenAIBackend,
+    LocalBackend.name: LocalBackend,
+}
+
+
+def create_backend(name, **kwargs):
+    """이름으로 백엔드 생성 (kwargs는 해당 백엔드 생성자에 그대로 전달)"""
+    try:
+        cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"알 수 없는 STT 백엔드: {name} (가능: {', '.join(BACKENDS)})")
+    return cls(**kwargs)
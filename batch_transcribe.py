@@ -0,0 +1,211 @@
+"""GUI 없이 WAV 파일/표준 입력 PCM을 STT로 변환하는 배치 모드
+
+실시간 앱과 같은 VAD 구간 분할 → 16kHz 모노 인코딩 → STT 경로를 사용하고,
+긴 녹음은 무음 지점에서 나눈 구간들을 여러 스레드(또는 프로세스)에서 동시에 변환한다.
+결과는 입력 순서대로 타임스탬프와 함께 출력된다.
+
+실행 예시:
+    python batch_transcribe.py meeting.wav                       # OPENAI_API_KEY 사용
+    python batch_transcribe.py a.wav b.wav --workers 8 -o out.txt
+    python batch_transcribe.py long.wav --backend local --processes  # 오프라인
+    ffmpeg -i in.mp3 -f s16le -ac 2 -ar 44100 - | python batch_transcribe.py - --rate 44100 --channels 2
+"""
+import argparse
+import collections
+import json
+import os
+import sys
+import wave
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from audio_encoding import EncodingConfig, encode_pcm
+from backends import BACKENDS, create_backend
+from vad import VADConfig, iter_segments
+
+READ_FRAMES = 4096
+
+# 작업 프로세스/스레드별 백엔드 (프로세스마다 한 번만 생성)
+_worker_backend = None
+_worker_backend_args = None
+
+
+def _get_worker_backend(backend_name, backend_kwargs):
+    global _worker_backend, _worker_backend_args
+    key = (backend_name, tuple(sorted(backend_kwargs.items())))
+    if _worker_backend is None or _worker_backend_args != key:
+        _worker_backend = create_backend(backend_name, **backend_kwargs)
+        _worker_backend_args = key
+    return _worker_backend
+
+
+def transcribe_segment(pcm, channels, rate, encoding, backend_name, backend_kwargs, language):
+    """구간 하나를 인코딩해서 STT 변환 (작업 프로세스에서 실행되므로 모듈 최상위 함수)
+
+    실패하면 None을 반환 (빈 결과 ""와 구분해서 실패 수로 셈, 예외는 프로세스 간에 넘기지 않음)
+    """
+    backend = _get_worker_backend(backend_name, backend_kwargs)
+    audio_file = encode_pcm(pcm, channels, 2, rate, encoding)
+    try:
+        return backend.transcribe(audio_file, language=language)
+    except Exception as e:
+        print(f"[ERROR] STT 변환 실패: {str(e)}", file=sys.stderr)
+        return None
+
+
+def read_wav(path):
+    """WAV 파일을 (rate, channels, 청크 이터레이터)로 반환"""
+    wf = wave.open(path, "rb")
+    if wf.getsampwidth() != 2:
+        wf.close()
+        raise ValueError(f"{path}: 16bit PCM WAV만 지원합니다")
+
+    def chunks():
+        with wf:
+            while True:
+                data = wf.readframes(READ_FRAMES)
+                if not data:
+                    break
+                yield data
+
+    return wf.getframerate(), wf.getnchannels(), chunks()
+
+
+def read_stdin(rate, channels):
+    """표준 입력의 raw 16bit little-endian PCM"""
+    stream = sys.stdin.buffer
+    chunk_bytes = READ_FRAMES * channels * 2
+
+    def chunks():
+        pending = b""
+        while True:
+            data = stream.read(chunk_bytes)
+            if not data:
+                break
+            data = pending + data
+            usable = len(data) - len(data) % (channels * 2)
+            pending = data[usable:]
+            yield data[:usable]
+
+    return rate, channels, chunks()
+
+
+def format_timestamp(seconds):
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+
+class TranscriptWriter:
+    """변환 결과를 txt("[시작 - 끝] 텍스트") 또는 jsonl로 출력"""
+
+    def __init__(self, out, fmt):
+        self.out = out
+        self.fmt = fmt
+
+    def begin(self, source):
+        if self.fmt == "txt":
+            self.out.write(f"# {source}\n")
+
+    def segment(self, source, start, end, text):
+        if self.fmt == "jsonl":
+            record = {"source": source, "start": round(start, 3), "end": round(end, 3), "text": text}
+            self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            self.out.write(f"[{format_timestamp(start)} - {format_timestamp(end)}] {text}\n")
+        self.out.flush()
+
+
+def transcribe_source(source, rate, channels, chunks, executor, max_pending, args, writer):
+    """입력 하나를 구간으로 나눠 병렬 변환하고 순서대로 출력. (구간 수, 빈 결과 수, 실패 수) 반환"""
+    vad_config = VADConfig(min_segment_seconds=args.min_segment, max_segment_seconds=args.max_segment)
+    encoding = EncodingConfig(sample_rate=16000, channels=1, container=args.container)
+    if encoding.fallback:
+        print(f"[ERROR] {encoding.fallback}", file=sys.stderr)
+    backend_kwargs = _backend_kwargs(args)
+    bytes_per_second = rate * channels * 2
+
+    pending = collections.deque()
+    segments = 0
+    empty = 0
+    failed = 0
+
+    def write_oldest():
+        nonlocal empty, failed
+        start, end, future = pending.popleft()
+        text = future.result()
+        if text is None:
+            failed += 1
+        elif text.strip():
+            writer.segment(source, start / bytes_per_second, end / bytes_per_second, text.strip())
+        else:
+            empty += 1
+
+    writer.begin(source)
+    for start, end, pcm in iter_segments(chunks, rate, channels, vad_config):
+        future = executor.submit(transcribe_segment, pcm, channels, rate, encoding,
+                                 args.backend, backend_kwargs, args.language)
+        pending.append((start, end, future))
+        segments += 1
+        # 동시에 진행 중인 구간 수를 제한해서 메모리 사용량을 일정하게 유지
+        while len(pending) >= max_pending:
+            write_oldest()
+    while pending:
+        write_oldest()
+    return segments, empty, failed
+
+
+def _backend_kwargs(args):
+    if args.backend == "openai":
+        return {"api_key": args.api_key, "base_url": args.base_url}
+    return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WAV 파일/표준 입력 PCM을 GUI 없이 STT 변환")
+    parser.add_argument("inputs", nargs="+", help="WAV 파일 경로 ('-'는 표준 입력 raw PCM)")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="openai")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY"), help="기본값: OPENAI_API_KEY")
+    parser.add_argument("--base-url", default=None, help="API 주소 (기본값: OPENAI_BASE_URL 또는 OpenAI)")
+    parser.add_argument("--language", default="ko")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 변환할 구간 수")
+    parser.add_argument("--processes", action="store_true", help="스레드 대신 프로세스 풀 사용 (인코딩이 CPU를 많이 쓸 때)")
+    parser.add_argument("--rate", type=int, default=44100, help="표준 입력 PCM 샘플레이트")
+    parser.add_argument("--channels", type=int, default=2, help="표준 입력 PCM 채널 수")
+    parser.add_argument("--min-segment", type=float, default=1.0, help="구간 최소 길이 (초)")
+    parser.add_argument("--max-segment", type=float, default=20.0, help="구간 최대 길이 (초)")
+    parser.add_argument("--container", choices=["wav", "flac", "ogg"], default="wav", help="업로드 포맷")
+    parser.add_argument("--format", choices=["txt", "jsonl"], default="txt", help="출력 형식")
+    parser.add_argument("-o", "--output", default="-", help="출력 파일 ('-'는 표준 출력)")
+    args = parser.parse_args(argv)
+
+    if args.backend == "openai" and not args.api_key:
+        parser.error("OpenAI API 키가 필요합니다 (--api-key 또는 OPENAI_API_KEY)")
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    writer = TranscriptWriter(out, args.format)
+    pool_class = ProcessPoolExecutor if args.processes else ThreadPoolExecutor
+    total_failed = 0
+    try:
+        with pool_class(max_workers=args.workers) as executor:
+            for path in args.inputs:
+                if path == "-":
+                    rate, channels, chunks = read_stdin(args.rate, args.channels)
+                    source = "stdin"
+                else:
+                    rate, channels, chunks = read_wav(path)
+                    source = path
+                segments, empty, failed = transcribe_source(source, rate, channels, chunks, executor,
+                                                            args.workers * 2, args, writer)
+                total_failed += failed
+                print(f"[DEBUG] {source}: 구간 {segments}개 변환 (빈 결과 {empty}개, 실패 {failed}개)", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if total_failed:
+        print(f"[ERROR] 변환에 실패한 구간 {total_failed}개 (출력에서 빠짐)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,587 @@
+"""성능 측정 스크립트
+
+실행 예시:
+    python benchmark.py              # 전체 실행
+    python benchmark.py ring_buffer  # 특정 항목만 실행
+    python benchmark.py e2e --json new.json --compare old.json  # 결과 저장 + 이전 버전 결과와 비교
+"""
+import argparse
+import collections
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from audio_buffer import PCMRingBuffer
+from audio_encoding import EncodingConfig, encode_pcm
+from context import RollingContext, estimate_tokens
+from triggers import ResponseCache, TriggerEngine
+from scheduler import AdaptiveScheduler
+from search_index import index_path_for
+from segment_store import SegmentStore
+
+RATE = 44100
+CHANNELS = 2
+SAMPLE_WIDTH = 2
+CHUNK = 1024
+FRAME_SIZE = CHANNELS * SAMPLE_WIDTH
+
+
+def _timeit(func, repeat=3):
+    """func를 repeat번 실행해서 가장 빠른 시간(초)을 반환"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def bench_ring_buffer(seconds=30, record_seconds=5):
+    """기존 deque(바이트 단위 append) 방식과 PCMRingBuffer 비교
+
+    seconds 분량의 오디오를 CHUNK 단위로 넣고, record_seconds마다 윈도우를 꺼냄.
+    """
+    chunk = bytes(range(256)) * (CHUNK * FRAME_SIZE // 256)
+    n_chunks = RATE * seconds // CHUNK
+    chunks_per_window = RATE * record_seconds // CHUNK
+
+    def run_deque():
+        buf = collections.deque(maxlen=RATE * FRAME_SIZE * record_seconds)
+        for i in range(n_chunks):
+            for byte in chunk:
+                buf.append(byte)
+            if i % chunks_per_window == 0:
+                bytes(buf)
+
+    def run_ring():
+        buf = PCMRingBuffer(RATE * record_seconds, frame_size=FRAME_SIZE)
+        for i in range(n_chunks):
+            buf.write(chunk)
+            if i % chunks_per_window == 0:
+                bytes(buf.latest())
+
+    t_deque = _timeit(run_deque, repeat=1)
+    t_ring = _timeit(run_ring)
+    print(f"[ring_buffer] 오디오 {seconds}초 ({n_chunks}청크)")
+    print(f"  deque (바이트 단위): {t_deque * 1000:9.2f} ms  (실시간 대비 {t_deque / seconds * 100:.2f}% CPU)")
+    print(f"  PCMRingBuffer     : {t_ring * 1000:9.2f} ms  (실시간 대비 {t_ring / seconds * 100:.4f}% CPU)")
+    print(f"  속도 향상: {t_deque / t_ring:.0f}배")
+    return {"deque_s": t_deque, "ring_s": t_ring}
+
+
+def _test_tone(seconds, rate=RATE, channels=CHANNELS, freq=440.0):
+    """테스트용 16bit PCM 사인파"""
+    t = np.arange(int(rate * seconds)) / rate
+    tone = (np.sin(2 * np.pi * freq * t) * 8000).astype("<i2")
+    return np.repeat(tone[:, None], channels, axis=1).tobytes()
+
+
+def bench_encoding(seconds=5):
+    """업로드 포맷별 인코딩 시간과 크기 비교 (기준: 44.1kHz 스테레오 WAV)"""
+    pcm = _test_tone(seconds)
+    configs = [
+        ("wav 44.1kHz 스테레오 (기존)", EncodingConfig(RATE, CHANNELS, "wav")),
+        ("wav 16kHz 모노", EncodingConfig(16000, 1, "wav")),
+        ("flac 16kHz 모노", EncodingConfig(16000, 1, "flac")),
+        ("ogg 16kHz 모노", EncodingConfig(16000, 1, "ogg")),
+    ]
+    print(f"[encoding] 오디오 {seconds}초")
+    results = {}
+    baseline = None
+    for label, config in configs:
+        elapsed = _timeit(lambda: encode_pcm(pcm, CHANNELS, SAMPLE_WIDTH, RATE, config))
+        encoded = encode_pcm(pcm, CHANNELS, SAMPLE_WIDTH, RATE, config)
+        size = encoded.getbuffer().nbytes
+        baseline = baseline or size
+        print(f"  {label:<28} {size:>9} bytes ({baseline / size:5.1f}배 감소)  {elapsed * 1000:7.2f} ms  [{config.container}]")
+        results[label] = {"bytes": size, "seconds": elapsed, "container": config.container}
+    return results
+
+
+# 리플레이용 기준 문장 (단어, 시작 시각(초)) - 초당 약 2.5단어
+REFERENCE_TEXT = (
+    "오늘 회의에서는 다음 분기 예산 계획과 신규 프로젝트 일정에 대해 논의하겠습니다 "
+    "먼저 지난 분기 실적을 간단히 정리하면 매출은 목표 대비 팔 퍼센트 초과 달성했고 "
+    "비용은 예상보다 조금 늘었습니다 다음으로 신규 프로젝트는 삼월 첫째 주에 착수할 예정이며 "
+    "담당자는 이번 주 안에 확정하겠습니다 질문 있으시면 말씀해 주세요"
+)
+
+
+def bench_ui(rate=500, seconds=3.0):
+    """초당 rate개의 전사 이벤트를 워커 스레드에서 보낼 때 Tk 메인 루프 지연 측정
+
+    - direct: 이벤트마다 root.after(0, ...)로 최근 20줄 전체를 지우고 다시 씀 (기존 방식)
+    - dispatcher: UIDispatcher로 모아서 새 줄만 추가
+    메인 루프 지연은 10ms 주기 타이머가 실제로 얼마나 늦게 실행되는지로 잰다.
+    """
+    import threading
+    import tkinter as tk
+    from tkinter import scrolledtext
+
+    from ui_dispatcher import UIDispatcher, append_line
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"[ui] 디스플레이가 없어 건너뜀: {e}")
+        return None
+    root.withdraw()
+    results = {}
+
+    for mode in ("direct", "dispatcher"):
+        area = scrolledtext.ScrolledText(root, height=5)
+        history = collections.deque(maxlen=20)
+        lags = []
+        done = threading.Event()
+
+        def redraw():
+            area.delete(1.0, tk.END)
+            area.insert(tk.END, "\n".join(history))
+            area.see(tk.END)
+
+        dispatcher = UIDispatcher(root, max_fps=30)
+        dispatcher.register("line", lambda line: append_line(area, line, max_lines=20))
+        dispatcher.start()
+
+        def producer():
+            interval = 1.0 / rate
+            end = time.perf_counter() + seconds
+            i = 0
+            while time.perf_counter() < end:
+                line = f"[00:00:{i % 60:02d}] 테스트 문장 {i}번 입니다"
+                if mode == "direct":
+                    history.append(line)
+                    root.after(0, redraw)
+                else:
+                    dispatcher.post("line", line)
+                i += 1
+                time.sleep(interval)
+            done.set()
+
+        def heartbeat(expected):
+            now = time.perf_counter()
+            lags.append(max(0.0, now - expected))
+            if done.is_set():
+                root.quit()
+                return
+            root.after(10, heartbeat, now + 0.010)
+
+        threading.Thread(target=producer, daemon=True).start()
+        root.after(10, heartbeat, time.perf_counter() + 0.010)
+        root.mainloop()
+        dispatcher.stop()
+        area.destroy()
+
+        lags.sort()
+        p95 = lags[int(len(lags) * 0.95) - 1] * 1000
+        print(f"[ui] {mode:<10} 이벤트 {rate}/초: 메인 루프 지연 p95 {p95:7.2f} ms, 최대 {lags[-1] * 1000:7.2f} ms")
+        results[mode] = {"loop_lag_p95_ms": p95, "loop_lag_max_ms": lags[-1] * 1000}
+        if mode == "dispatcher":
+            stats = dispatcher.stats()
+            print(f"     이벤트 지연 평균 {stats['latency_avg_ms']:.1f} ms / p95 {stats['latency_p95_ms']:.1f} ms, "
+                  f"처리 주기 {stats['batches']}회")
+            results[mode].update(stats)
+
+    root.destroy()
+    return results
+
+
+def bench_triggers(events=200000, repeats=50):
+    """마우스 콜백 경로(fire) 비용, 트리거 합치기 비율, 응답 캐시 조회 시간"""
+    dispatched = []
+    engine = TriggerEngine(dispatched.append, debounce=0.05, min_interval=0.2).start()
+    elapsed = _timeit(lambda: [engine.fire("mouse") for _ in range(events)], repeat=1)
+    time.sleep(0.3)
+    engine.stop()
+    stats = engine.stats()
+    print(f"[triggers] fire() {elapsed / events * 1e9:7.1f} ns/회, "
+          f"트리거 {stats['seen']}개 → 요청 {stats['dispatched']}회 (합쳐짐 {stats['coalesced']})")
+
+    cache = ResponseCache()
+    prompt = "발언: \n\n텍스트: " + REFERENCE_TEXT[:300]
+    cache.put(prompt, "응답")
+    lookup = _timeit(lambda: [cache.get(prompt) for _ in range(repeats)]) / repeats
+    print(f"[triggers] 캐시 조회 {lookup * 1e6:7.2f} us (300자 문맥), 히트 {cache.hits}회")
+    return {"fire_ns": elapsed / events * 1e9, "lookup_us": lookup * 1e6, **stats}
+
+
+def bench_context(hours=3, segment_seconds=5, summary_delay=0.002):
+    """긴 세션 동안 프롬프트 문맥 크기 (전체 누적 대비) 와 요청 시점 비용"""
+    words = REFERENCE_TEXT.split()
+
+    def summarize(previous, new_text, max_tokens):
+        time.sleep(summary_delay)  # 요약 API 대신
+        return (previous + " " + new_text[:80])[-max_tokens:]
+
+    context = RollingContext(summarize, token_budget=600, tail_tokens=300, summary_tokens=200)
+    total_tokens = 0
+    max_tokens = 0
+    for i in range(hours * 3600 // segment_seconds):
+        text = " ".join(words[i % len(words):i % len(words) + 8])
+        context.add(text)
+        total_tokens += estimate_tokens(text)
+        max_tokens = max(max_tokens, context.tokens)
+        if i % 50 == 0:
+            time.sleep(summary_delay * 2)  # 요약 스레드가 따라올 시간
+    lookup = _timeit(lambda: [context.prompt_text() for _ in range(1000)]) / 1000
+    context.close()
+    print(f"[context] {hours}시간 세션: 전체 발언 {total_tokens} 토큰 → 프롬프트 문맥 최대 {max_tokens} 토큰, "
+          f"요약 {context.summaries}회, 요청 시점 비용 {lookup * 1e9:.0f} ns")
+    return {"total_tokens": total_tokens, "max_context_tokens": max_tokens, "prompt_ns": lookup * 1e9}
+
+
+class _LatencyInjectingBackend:
+    """가짜 Whisper: 응답 시간 = base + per_second × 오디오 길이 (± jitter), 시간대별로 API 지연을 주입
+
+    phases: [(끝 시각, base, per_second, 음성 비율), ...]
+    """
+
+    def __init__(self, phases, jitter=0.2, seed=1):
+        self.phases = phases
+        self.jitter = jitter
+        self.random = np.random.default_rng(seed)
+
+    def phase(self, now):
+        return next((p for p in self.phases if now < p[0]), self.phases[-1])
+
+    def latency(self, now, audio_seconds):
+        _, base, per_second, _ = self.phase(now)
+        return (base + per_second * audio_seconds) * self.random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def _simulate_windows(backend, scheduler=None, window=5.0, concurrency=3, step=0.05, seed=2):
+    """VAD 구간 분할 + 업로드 대기열 + 동시 요청을 시뮬레이션 시간으로 재현
+
+    발화는 평균 4초, 쉼은 음성 비율에 맞춰 무작위로 생성. 구간은 발화가 끝나거나 window에 닿으면 잘림.
+    반환: 구간별 (말 시작 → 결과) 지연 목록, 최대 대기 수, 시각별 (window, concurrency)
+    """
+    random = np.random.default_rng(seed)
+    end_time = backend.phases[-1][0]
+    t = 0.0
+    speaking, state_left = False, 0.0
+    seg_len = 0.0
+    queue = collections.deque()  # (말 시작 시각, 오디오 길이)
+    in_flight = []  # (끝나는 시각, 오디오 길이, 말 시작 시각, 응답 시간)
+    latencies = [[] for _ in backend.phases]
+    max_backlog = [0] * len(backend.phases)
+    trajectory = []
+    requests = 0
+    speech_total = audio_total = 0.0
+    while t < end_time:
+        t += step
+        phase = backend.phases.index(backend.phase(t))
+        ratio = backend.phases[phase][3]
+        state_left -= step
+        if state_left <= 0:
+            speaking = not speaking
+            mean = 4.0 if speaking else 4.0 * (1 - ratio) / ratio
+            state_left = random.exponential(mean) if mean > 0 else end_time
+        audio_total += step
+        if speaking:
+            seg_len += step
+            speech_total += step
+        if seg_len > 0 and (seg_len >= window or not speaking):
+            queue.append((t - seg_len, seg_len))
+            requests += 1
+            seg_len = 0.0
+
+        done = [r for r in in_flight if r[0] <= t]
+        for finished_at, audio, started, rtt in done:
+            in_flight.remove((finished_at, audio, started, rtt))
+            latencies[backend.phases.index(backend.phase(finished_at))].append(finished_at - started)
+            if scheduler is not None:
+                scheduler.observe(audio, rtt)
+        while queue and len(in_flight) < concurrency:
+            started, audio = queue.popleft()
+            rtt = backend.latency(t, audio)
+            in_flight.append((t + rtt, audio, started, rtt))
+        max_backlog[phase] = max(max_backlog[phase], len(queue))
+
+        if scheduler is not None and scheduler.update(len(queue), requests, speech_total, audio_total, now=t):
+            window, concurrency = scheduler.window, scheduler.concurrency
+        trajectory.append((t, window, concurrency))
+    return latencies, max_backlog, trajectory
+
+
+def bench_adaptive(target=6.0):
+    """적응형 스케줄러 수렴 시뮬레이션: API 지연과 말의 밀도가 바뀔 때 고정 설정(5초, 동시 3)과 비교
+
+    구간: 빠른 API + 드문 발화 → 느린 API + 촘촘한 발화 → 빠른 API + 촘촘한 발화 → 목표를 지킬 수 없을
+    만큼 느린 API (이때는 따라잡는 것이 우선)
+    """
+    phases = [(300.0, 0.6, 0.08, 0.4), (600.0, 3.0, 0.35, 0.9), (900.0, 0.6, 0.08, 0.9),
+              (1200.0, 6.0, 1.2, 0.9)]
+    names = ["빠른 API/드문 발화", "느린 API/촘촘한 발화", "빠른 API/촘촘한 발화", "매우 느린 API"]
+    results = {}
+    for mode in ("fixed", "adaptive"):
+        backend = _LatencyInjectingBackend(phases)
+        scheduler = None
+        if mode == "adaptive":
+            scheduler = AdaptiveScheduler(window=5.0, concurrency=3, min_window=2.0, max_window=15.0,
+                                          max_concurrency=6, target_latency=target, name="benchmark")
+        latencies, max_backlog, trajectory = _simulate_windows(backend, scheduler)
+        results[mode] = []
+        start = 0.0
+        for i, (end, *_rest) in enumerate(phases):
+            # 구간 후반부(수렴 후) 기준
+            settled = [(w, c) for t, w, c in trajectory if start + (end - start) * 0.5 <= t < end]
+            # 수렴 시간: 구간 끝까지 윈도우가 최종 값의 ±max(10%, 0.5초) 안에 머물기 시작한 시점
+            final = settled[-1][0]
+            outside = [t for t, w, c in trajectory if start <= t < end and abs(w - final) > max(final * 0.1, 0.5)]
+            converged = (outside[-1] if outside else start) - start
+            lat = np.array(latencies[i]) if latencies[i] else np.zeros(1)
+            row = {"phase": names[i], "p50": float(np.percentile(lat, 50)), "p95": float(np.percentile(lat, 95)),
+                   "max_backlog": max_backlog[i], "window": settled[-1][0], "concurrency": settled[-1][1],
+                   "window_range": (min(w for w, _ in settled), max(w for w, _ in settled)),
+                   "converged_after": converged}
+            results[mode].append(row)
+            print(f"[adaptive] {mode:8s} {names[i]:14s}: 지연 p50 {row['p50']:5.1f}s p95 {row['p95']:5.1f}s, "
+                  f"최대 대기 {row['max_backlog']:3d}, 윈도우 {row['window']:5.2f}s "
+                  f"(후반 {row['window_range'][0]:.2f}~{row['window_range'][1]:.2f}, {converged:.0f}s 후 수렴), "
+                  f"동시 {row['concurrency']}")
+            start = end
+        if scheduler is not None:
+            print(f"[adaptive] 스케줄러 {scheduler.stats()} (목표 지연 {target}s)")
+    return results
+
+
+def _run_python(code, cwd=None):
+    """새 파이썬 프로세스에서 code를 실행하고 마지막 출력 줄(JSON)을 반환 (콜드 스타트 측정용)"""
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=cwd, env=env,
+                            timeout=120)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        raise RuntimeError((result.stderr.strip().splitlines() or ["출력 없음"])[-1])
+    return json.loads(lines[-1])
+
+
+_IMPORT_CODE = """
+import json, sys, time
+started = time.perf_counter()
+import stt_app
+app_seconds = time.perf_counter() - started
+deferred = [name for name in ("openai", "pynput", "pyaudio", "soundfile") if name not in sys.modules]
+started = time.perf_counter()
+try:
+    import openai
+except ImportError:
+    pass
+print(json.dumps({"stt_app": app_seconds, "openai": time.perf_counter() - started, "deferred": deferred}))
+"""
+
+_WINDOW_CODE = """
+import json, time
+started = time.perf_counter()  # 모듈 로드 시간도 포함
+import stt_app
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError as e:
+    print(json.dumps({"skipped": str(e)}))
+    raise SystemExit
+app = stt_app.AudioSTTApp(root)
+root.update()
+window = time.perf_counter() - started
+app.warmup.wait_all(10)
+app.on_close()
+print(json.dumps({"window": window, "warmup": app.warmup.stats()}))
+"""
+
+_FIRST_TRANSCRIPT_CODE = """
+import json, time
+from fake_openai_server import FakeOpenAIServer
+server = FakeOpenAIServer(latency={latency}, connect_delay={connect_delay}).start()
+from audio_encoding import EncodingConfig, encode_pcm
+payload = encode_pcm(bytes(16000 * 2 * 3), 1, 2, 16000, EncodingConfig(), name="first.wav")
+started = time.perf_counter()  # 녹음 시작 (첫 구간 인코딩까지 끝난 시점)
+if {warm}:
+    # 창이 뜬 뒤 백그라운드 준비가 끝난 상태에서 녹음 시작
+    from api_client import get_client
+    get_client("sk-test", server.url).warm_up()
+    started = time.perf_counter()
+from backends import OpenAIBackend
+backend = OpenAIBackend("sk-test", base_url=server.url)
+text = backend.transcribe(payload, language="ko")
+print(json.dumps({{"seconds": time.perf_counter() - started, "connections": server.connections}}))
+"""
+
+
+def bench_startup(repeats=3, latency=0.3, connect_delay=0.15):
+    """콜드 스타트: stt_app import 시간, 창 표시까지 시간, 첫 전사까지 시간 (미리 준비 있음/없음)
+
+    매번 새 프로세스에서 측정. 첫 전사는 가짜 서버(응답 latency초, 새 연결마다 connect_delay초로
+    TCP/TLS 연결 비용을 흉내)로 녹음 시작 → 첫 구간 업로드/응답까지 (구간 길이는 제외).
+    """
+    def median(values):
+        return sorted(values)[len(values) // 2]
+
+    results = {}
+    runs = [_run_python(_IMPORT_CODE) for _ in range(repeats)]
+    results["import_ms"] = median([run["stt_app"] for run in runs]) * 1000
+    results["openai_import_ms"] = median([run["openai"] for run in runs]) * 1000
+    print(f"[startup] import stt_app {results['import_ms']:.0f}ms "
+          f"(창 표시 뒤로 미룬 모듈: {', '.join(runs[0]['deferred'])} / openai 로드만 {results['openai_import_ms']:.0f}ms)")
+
+    with tempfile.TemporaryDirectory() as cwd:  # sessions/ 저널이 현재 폴더에 생기므로
+        window = _run_python(_WINDOW_CODE, cwd=cwd)
+    if "skipped" in window:
+        print(f"[startup] 디스플레이가 없어 창 표시 측정은 건너뜀: {window['skipped']}")
+    else:
+        results["window_ms"] = window["window"] * 1000
+        results["warmup_ms"] = window["warmup"]
+        print(f"[startup] 창 표시까지 {results['window_ms']:.0f}ms, 백그라운드 준비 {window['warmup']}")
+
+    for mode in ("cold", "warm"):
+        code = _FIRST_TRANSCRIPT_CODE.format(latency=latency, connect_delay=connect_delay, warm=mode == "warm")
+        runs = [_run_python(code) for _ in range(repeats)]
+        results[f"first_transcript_{mode}_ms"] = median([run["seconds"] for run in runs]) * 1000
+        print(f"[startup] 첫 전사 ({'미리 준비' if mode == 'warm' else '준비 없음'}): "
+              f"{results[f'first_transcript_{mode}_ms']:.0f}ms (응답 지연 {latency * 1000:.0f}ms 포함, "
+              f"연결 {runs[0]['connections']}개)")
+    return results
+
+
+def bench_search(hours=4, segment_seconds=1.5, queries=("예산", "신규 프로젝트", "안건 17", "확정하겠습니다", "없는말")):
+    """긴 세션 전사 검색: 구간 추가 비용, 검색 시간, 다시 열 때 저장된 색인 사용 vs 전체 다시 색인"""
+    words = REFERENCE_TEXT.split()
+    count = int(hours * 3600 / segment_seconds)
+    with tempfile.TemporaryDirectory() as tmp:
+        journal_path = os.path.join(tmp, "session.jsonl")
+        store = SegmentStore(journal_path=journal_path, index_save_interval=None)  # 저장 시간은 따로 측정
+        t0 = time.time() - hours * 3600
+        started = time.perf_counter()
+        for i in range(count):
+            text = " ".join(words[i % len(words):i % len(words) + 6]) + f" 안건 {i % 50}"
+            store.append(text, t0 + i * segment_seconds, t0 + (i + 1) * segment_seconds)
+        append_us = (time.perf_counter() - started) / count * 1e6
+        save_ms = _timeit(store.save_index) * 1000
+        store.close()
+
+        lookups = {}
+        for query in queries:
+            hits = store.search(query)
+            lookups[query] = (_timeit(lambda: [store.search(query) for _ in range(100)]) / 100 * 1e6, len(hits))
+
+        def reopen():
+            SegmentStore(journal_path=journal_path).close()
+
+        reopen_ms = _timeit(reopen) * 1000
+        reopened = SegmentStore(journal_path=journal_path)
+        assert reopened.reindexed == 0 and len(reopened.index) == count
+        reopened.close()
+        index_bytes = os.path.getsize(index_path_for(journal_path))
+
+        def rebuild():
+            if os.path.exists(index_path_for(journal_path)):
+                os.remove(index_path_for(journal_path))
+            SegmentStore(journal_path=journal_path).journal.close()  # 색인을 저장하지 않고 닫음
+
+        rebuild_ms = _timeit(rebuild) * 1000
+
+    print(f"[search] {hours}시간 세션 ({count}개 구간): 구간 추가 {append_us:.0f}us (색인 + 저널), "
+          f"색인 저장 {save_ms:.0f}ms ({index_bytes / 1024:.0f}KB)")
+    print(f"[search] 다시 열기: 저장된 색인 {reopen_ms:.0f}ms vs 전체 다시 색인 {rebuild_ms:.0f}ms")
+    for query, (us, hits) in lookups.items():
+        print(f"[search]   '{query}': {us:.0f}us ({hits}건)")
+    return {"segments": count, "append_us": append_us, "save_ms": save_ms, "reopen_ms": reopen_ms, "rebuild_ms": rebuild_ms,
+            "lookup_us": {query: us for query, (us, _) in lookups.items()}}
+
+
+_E2E_CODE = """
+import json
+import e2e_benchmark
+print(json.dumps(e2e_benchmark.run({seconds}, latency={latency}, error_rate={error_rate})))
+"""
+
+
+def bench_e2e(seconds=30, latency=0.4, error_rate=0.05):
+    """엔드 투 엔드: 톤 WAV 재생 → 실제 앱 경로 → 가짜 서버 (새 프로세스에서, 옵션은 e2e_benchmark.py 참고)"""
+    import e2e_benchmark
+
+    results = _run_python(_E2E_CODE.format(seconds=seconds, latency=latency, error_rate=error_rate))
+    e2e_benchmark.print_results(results)
+    return results
+
+
+BENCHMARKS = {
+    "ring_buffer": bench_ring_buffer,
+    "encoding": bench_encoding,
+    "ui": bench_ui,
+    "triggers": bench_triggers,
+    "context": bench_context,
+    "adaptive": bench_adaptive,
+    "startup": bench_startup,
+    "search": bench_search,
+    "e2e": bench_e2e,
+}
+
+
+def _metadata():
+    """결과 파일에 남길 실행 환경 (버전 비교용)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "python": sys.version.split()[0],
+            "platform": sys.platform}
+
+
+def _flatten(value, prefix=""):
+    """중첩된 결과에서 숫자 값만 {"항목.키": 값} 으로"""
+    if isinstance(value, dict):
+        items = {}
+        for key, child in value.items():
+            items.update(_flatten(child, f"{prefix}.{key}" if prefix else str(key)))
+        return items
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def compare_results(old, new, threshold=0.05):
+    """두 결과 파일의 같은 숫자 항목을 비교해서 threshold 이상 바뀐 것만 출력"""
+    print(f"[compare] {old['meta'].get('commit') or '?'} ({old['meta']['time']}) → "
+          f"{new['meta'].get('commit') or '?'} ({new['meta']['time']})")
+    old_values, new_values = _flatten(old["results"]), _flatten(new["results"])
+    for key in sorted(old_values.keys() & new_values.keys()):
+        before, after = old_values[key], new_values[key]
+        if before == after or (before and abs(after - before) / abs(before) < threshold):
+            continue
+        change = f"{(after - before) / abs(before):+.0%}" if before else "new"
+        print(f"[compare] {key}: {before:g} → {after:g} ({change})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STT 변환기 성능 측정")
+    parser.add_argument("names", nargs="*", help=f"실행할 항목 (생략 시 전체): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--compare", help="이전 결과 JSON 파일과 비교")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"알 수 없는 항목: {', '.join(unknown)}")
+
+    results = {}
+    for name in args.names or BENCHMARKS:
+        results[name] = BENCHMARKS[name]()
+    report = {"meta": _metadata(), "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare_results(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""별도 프로세스에서 오디오를 캡처해서 공유 메모리 링 버퍼로 넘기는 캡처 소스
+
+캡처 프로세스는 PyAudio 콜백 모드 스트림을 열고, 콜백마다 받은 PCM을 공유 메모리 링에 기록한다.
+(메인 프로세스의 GIL 경쟁과 무관하게 PortAudio 콜백이 제때 처리됨)
+메인 프로세스는 같은 공유 메모리를 PCMRingBuffer로 감싸서 새로 기록된 구간을 읽을 때 한 번 복사한다.
+(읽은 청크는 윈도우 단계 큐에서 잠시 기다리므로, 링을 가리키는 채로 두면 윈도우 단계가 ring_seconds 넘게
+밀렸을 때 새 오디오로 조용히 덮어써짐)
+
+공유 메모리 구성: [헤더 64바이트: int64 x 8] + [링 데이터 (용량의 2배, 미러 영역 포함)]
+
+사운드 장치가 없는 환경(리눅스 서버 등)에서는 source="fake"로 사인파/WAV 파일을 실시간 속도로 흘려보낸다.
+
+    capture = CaptureProcess(device_index=3, rate=44100, channels=2).start()
+    pipeline = STTPipeline(read_chunk=capture.read, ...)
+    ...
+    capture.stop()
+"""
+import math
+import multiprocessing
+import struct
+import time
+import wave
+from multiprocessing import shared_memory
+
+from audio_buffer import PCMRingBuffer
+from telemetry import REGISTRY
+
+HEADER_BYTES = 64
+# 헤더 슬롯 (int64)
+TOTAL_WRITTEN = 0  # 지금까지 기록한 누적 바이트 수
+INPUT_OVERFLOWS = 1  # PortAudio가 알린 입력 오버플로 횟수 (장치 쪽에서 오디오 유실)
+INPUT_UNDERFLOWS = 2
+CALLBACKS = 3
+STATE = 4  # 0: 시작 중, 1: 캡처 중, 2: 종료, -1: 오류
+
+# PortAudio 콜백 status 플래그
+_PA_INPUT_UNDERFLOW = 0x1
+_PA_INPUT_OVERFLOW = 0x2
+
+
+class SharedRingWriter:
+    """캡처 프로세스 쪽: 공유 메모리 링에 기록"""
+
+    def __init__(self, shm, capacity_bytes, frame_size):
+        self.header = shm.buf[:HEADER_BYTES].cast("q")
+        self.ring = PCMRingBuffer(capacity_bytes // frame_size, frame_size, buffer=shm.buf[HEADER_BYTES:])
+        self.ring.sync(self.header[TOTAL_WRITTEN])
+
+    def write(self, data, status=0):
+        self.ring.write(data)
+        header = self.header
+        # 데이터를 먼저 기록하고 누적 위치를 나중에 갱신 (읽는 쪽은 누적 위치까지만 읽음)
+        header[TOTAL_WRITTEN] = self.ring.total_written
+        header[CALLBACKS] += 1
+        if status & _PA_INPUT_OVERFLOW:
+            header[INPUT_OVERFLOWS] += 1
+        if status & _PA_INPUT_UNDERFLOW:
+            header[INPUT_UNDERFLOWS] += 1
+
+    def release(self):
+        self.ring.release()
+        self.header.release()
+
+
+class FakeAudioSource:
+    """사운드 장치 대신 쓰는 가짜 입력 (콜백 모드 스트림처럼 frames_per_buffer마다 callback 호출)
+
+    wav_path가 있으면 그 파일을 반복 재생, 없으면 440Hz 사인파 (1초 소리 / 1초 무음 반복).
+    """
+
+    def __init__(self, callback, rate, channels, frames_per_buffer, wav_path=None):
+        self.callback = callback
+        self.rate = rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.wav_path = wav_path
+
+    def _chunks(self):
+        chunk_bytes = self.frames_per_buffer * self.channels * 2
+        if self.wav_path:
+            with wave.open(self.wav_path, "rb") as wf:
+                if wf.getsampwidth() != 2 or wf.getnchannels() != self.channels or wf.getframerate() != self.rate:
+                    raise ValueError(f"{self.wav_path}: {self.rate}Hz {self.channels}ch 16bit WAV가 필요합니다")
+                data = wf.readframes(wf.getnframes())
+            if not data:
+                raise ValueError(f"{self.wav_path}: 빈 파일")
+            data += bytes(-len(data) % chunk_bytes)
+            while True:
+                for i in range(0, len(data), chunk_bytes):
+                    yield data[i:i + chunk_bytes]
+        frame = 0
+        while True:
+            samples = []
+            for n in range(frame, frame + self.frames_per_buffer):
+                on = (n // self.rate) % 2 == 0
+                value = int(8000 * math.sin(2 * math.pi * 440 * n / self.rate)) if on else 0
+                samples.extend([value] * self.channels)
+            frame += self.frames_per_buffer
+            yield struct.pack(f"<{len(samples)}h", *samples)
+
+    def run(self, stop_event):
+        interval = self.frames_per_buffer / self.rate
+        next_at = time.perf_counter()
+        for chunk in self._chunks():
+            if stop_event.is_set():
+                return
+            self.callback(chunk, self.frames_per_buffer, None, 0)
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def _capture_main(shm_name, capacity_bytes, config, stop_event, data_ready):
+    """캡처 프로세스 진입점 (spawn에서도 import 가능하도록 모듈 최상위 함수)"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frame_size = config["channels"] * 2
+    writer = SharedRingWriter(shm, capacity_bytes, frame_size)
+
+    def callback(in_data, frame_count, time_info, status):
+        writer.write(in_data, status)
+        data_ready.set()
+        return (None, 0)  # paContinue
+
+    try:
+        if config["source"] == "fake":
+            source = FakeAudioSource(callback, config["rate"], config["channels"], config["frames_per_buffer"],
+                                     config.get("wav_path"))
+            writer.header[STATE] = 1
+            source.run(stop_event)
+        else:
+            import pyaudio  # 캡처 프로세스에서만 필요
+            p = pyaudio.PyAudio()
+            stream = p.open(format=pyaudio.paInt16, channels=config["channels"], rate=config["rate"], input=True,
+                            input_device_index=config.get("device_index"),
+                            frames_per_buffer=config["frames_per_buffer"], stream_callback=callback)
+            stream.start_stream()
+            writer.header[STATE] = 1
+            try:
+                while not stop_event.wait(0.2):
+                    if not stream.is_active():
+                        raise RuntimeError("오디오 스트림이 중지되었습니다")
+            finally:
+                stream.stop_stream()
+                stream.close()
+                p.terminate()
+        writer.header[STATE] = 2
+    except Exception as e:
+        writer.header[STATE] = -1
+        print(f"[ERROR] 캡처 프로세스 오류: {str(e)}")
+    finally:
+        data_ready.set()
+        writer.release()
+        shm.close()
+
+
+class CaptureProcess:
+    """캡처 프로세스를 띄우고 공유 메모리 링에서 새 오디오를 읽는 쪽 (메인 프로세스)"""
+
+    def __init__(self, device_index=None, rate=44100, channels=2, frames_per_buffer=1024, ring_seconds=5,
+                 source="pyaudio", wav_path=None, name="capture"):
+        self.rate = rate
+        self.channels = channels
+        self.frame_size = channels * 2
+        self.capacity = int(rate * ring_seconds) * self.frame_size
+        self.config = {"source": source, "device_index": device_index, "rate": rate, "channels": channels,
+                       "frames_per_buffer": frames_per_buffer, "wav_path": wav_path}
+        # 쓰는 쪽이 지금 덮어쓰고 있을 수 있는 가장 오래된 부분은 읽지 않음
+        self.safety_bytes = frames_per_buffer * self.frame_size * 4
+
+        self._shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + self.capacity * 2)
+        self._shm.buf[:HEADER_BYTES] = bytes(HEADER_BYTES)
+        self._header = self._shm.buf[:HEADER_BYTES].cast("q")
+        self._ring = PCMRingBuffer(self.capacity // self.frame_size, self.frame_size,
+                                   buffer=self._shm.buf[HEADER_BYTES:])
+        self._final_header = [0] * (HEADER_BYTES // 8)
+        self._read_pos = 0
+        self._stop = multiprocessing.Event()
+        self._data_ready = multiprocessing.Event()
+        self._process = None
+
+        # 통계 (읽는 쪽)
+        self.reader_waits = 0  # 읽을 데이터가 없어서 기다린 횟수 (캡처보다 읽기가 빠름: 정상)
+        self.reader_overrun_bytes = 0  # 읽기가 밀려서 링에서 덮어써진 바이트 (유실)
+        REGISTRY.counter("stt_capture_input_overflows_total", "캡처 장치 입력 오버플로 횟수",
+                         func=lambda: self._header_value(INPUT_OVERFLOWS), source=name)
+        REGISTRY.counter("stt_capture_reader_overrun_bytes_total", "읽기가 밀려 유실된 오디오 바이트",
+                         func=lambda: self.reader_overrun_bytes, source=name)
+        REGISTRY.counter("stt_capture_reader_waits_total", "새 오디오를 기다린 횟수",
+                         func=lambda: self.reader_waits, source=name)
+
+    @property
+    def pid(self):
+        """캡처 프로세스 pid (CPU 사용량 측정용, 시작 전/종료 후에는 None)"""
+        return self._process.pid if self._process is not None else None
+
+    def _header_value(self, slot):
+        if self._header is not None:
+            return self._header[slot]
+        return self._final_header[slot]  # close() 이후에는 마지막 값
+
+    def start(self, timeout=5.0):
+        self._process = multiprocessing.Process(
+            target=_capture_main, name="audio-capture", daemon=True,
+            args=(self._shm.name, self.capacity, self.config, self._stop, self._data_ready))
+        self._process.start()
+        # 장치가 열릴 때까지 대기 (열기 실패는 여기서 바로 알림)
+        deadline = time.monotonic() + timeout
+        while self._header[STATE] == 0:
+            if not self._process.is_alive() or time.monotonic() > deadline:
+                self.close()
+                raise RuntimeError("캡처 프로세스를 시작하지 못했습니다")
+            self._data_ready.wait(0.05)
+        if self._header[STATE] < 0:
+            self.close()
+            raise RuntimeError("캡처 프로세스에서 오디오 장치를 열지 못했습니다")
+        self._read_pos = self._header[TOTAL_WRITTEN]
+        return self
+
+    def read(self, max_bytes=None, timeout=0.1):
+        """새로 기록된 PCM을 bytes로 복사해서 반환 (timeout 동안 없으면 b"")
+
+        링에서 유실되는 것은 여기서 읽기가 밀린 경우뿐이고 (reader_overrun_bytes로 셈),
+        반환한 청크는 이후 단계가 얼마나 늦게 쓰든 덮어써지지 않는다.
+        """
+        total = self._header[TOTAL_WRITTEN]
+        if total <= self._read_pos:
+            self.reader_waits += 1
+            while True:
+                self._data_ready.clear()
+                total = self._header[TOTAL_WRITTEN]
+                if total > self._read_pos:
+                    break
+                if self._header[STATE] != 1:
+                    raise RuntimeError("캡처 프로세스가 종료되었습니다")
+                if not self._data_ready.wait(timeout):
+                    return b""
+
+        oldest = total - self.capacity + self.safety_bytes
+        if self._read_pos < oldest:
+            self.reader_overrun_bytes += oldest - self._read_pos
+            print(f"[DEBUG] 캡처 읽기 지연으로 {oldest - self._read_pos} bytes 유실")
+            self._read_pos = oldest
+        end = total if max_bytes is None else min(total, self._read_pos + max_bytes)
+        self._ring.sync(total)
+        data = bytes(self._ring.window(self._read_pos, end))
+        self._read_pos = end
+        return data
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._process is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+    def close(self):
+        """stop 후 공유 메모리 해제"""
+        self.stop()
+        if self._header is None:
+            return
+        self._final_header = self._header.tolist()
+        self._header.release()
+        self._header = None
+        self._ring.release()
+        self._ring = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # 아직 참조 중인 memoryview가 있으면 프로세스 종료 시 정리됨
+        self._shm.unlink()
+
+    def stats(self):
+        return {
+            "written": self._header_value(TOTAL_WRITTEN),
+            "callbacks": self._header_value(CALLBACKS),
+            "input_overflows": self._header_value(INPUT_OVERFLOWS),
+            "input_underflows": self._header_value(INPUT_UNDERFLOWS),
+            "reader_waits": self.reader_waits,
+            "reader_overrun_bytes": self.reader_overrun_bytes,
+        }
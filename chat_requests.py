@@ -0,0 +1,168 @@
+"""ChatGPT 요청 관리 (한 번에 하나, 새 요청이 오면 이전 요청은 취소)
+
+새 트리거가 들어오면 진행 중인 요청을 취소(스트림을 닫음)하고 새 요청을 시작한다.
+그래서 오래된 응답이 새 응답을 덮어쓰는 일이 없다. 요청별로 첫 토큰까지 걸린 시간(TTFT)을 기록.
+"""
+import collections
+import threading
+import time
+
+from telemetry import REGISTRY, trace
+
+_FIRST_TOKEN_SECONDS = REGISTRY.histogram("chat_first_token_seconds", "ChatGPT 요청부터 첫 토큰까지 시간 (초)")
+_TOTAL_SECONDS = REGISTRY.histogram("chat_request_seconds", "ChatGPT 요청 전체 시간 (초)")
+_CANCELLED = REGISTRY.counter("chat_cancelled_total", "새 요청으로 대체되어 취소된 ChatGPT 요청 수")
+
+class RequestCancelled(Exception):
+    """더 새로운 요청으로 대체되어 취소됨"""
+
+
+class ChatRequest:
+    def __init__(self, seq, text):
+        self.seq = seq
+        self.text = text
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self.stream = None  # 취소 시 닫을 스트림 (스트리밍 모드)
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()  # 스트림 등록과 취소가 엇갈려 열린 스트림이 남지 않게
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        with self._lock:
+            self._cancel.set()
+            stream = self.stream
+        _close(stream)  # 읽고 있는 스레드가 바로 빠져나오도록 연결을 끊음
+
+    def attach_stream(self, stream):
+        """열린 스트림을 등록해서 반환 (그 사이 취소됐으면 바로 닫고 RequestCancelled)"""
+        with self._lock:
+            if not self.cancelled:
+                self.stream = stream
+                return stream
+        _close(stream)
+        raise RequestCancelled()
+
+    def close_stream(self):
+        """등록된 스트림을 닫음 (요청이 어떻게 끝나든 호출)"""
+        with self._lock:
+            stream, self.stream = self.stream, None
+        _close(stream)
+
+    def check(self):
+        """취소됐으면 RequestCancelled 발생"""
+        if self.cancelled:
+            raise RequestCancelled()
+
+    def mark_first_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    @property
+    def ttft(self):
+        """첫 토큰까지 걸린 시간 (초)"""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+
+def _close(stream):
+    if stream is not None:
+        try:
+            stream.close()
+        except Exception:
+            pass
+
+
+class ChatRequestManager:
+    """func(request, *args)를 백그라운드 스레드에서 실행하고, 새 요청이 오면 이전 요청을 취소"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = None
+        self._next_seq = 0
+
+        # 통계
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.ttfts = collections.deque(maxlen=200)
+
+    @property
+    def busy(self):
+        return self._current is not None
+
+    @property
+    def pending_text(self):
+        """진행 중인 요청의 텍스트 (없으면 None)"""
+        current = self._current
+        return current.text if current is not None else None
+
+    @property
+    def pending_seq(self):
+        current = self._current
+        return current.seq if current is not None else None
+
+    def is_current(self, request):
+        return self._current is request
+
+    def submit(self, func, text, *args):
+        with self._lock:
+            previous = self._current
+            request = ChatRequest(self._next_seq, text)
+            self._next_seq += 1
+            self._current = request
+            self.submitted += 1
+        if previous is not None:
+            previous.cancel()
+            self.cancelled += 1
+            _CANCELLED.inc()
+            print(f"[DEBUG] 이전 ChatGPT 요청 #{previous.seq} 취소 (새 요청 #{request.seq})")
+        threading.Thread(target=self._run, args=(request, func, args), daemon=True).start()
+        return request
+
+    def cancel(self):
+        with self._lock:
+            request = self._current
+            self._current = None
+        if request is not None:
+            request.cancel()
+            self.cancelled += 1
+            _CANCELLED.inc()
+
+    def _run(self, request, func, args):
+        try:
+            func(request, *args)
+        except RequestCancelled:
+            pass
+        except Exception as e:
+            if not request.cancelled:
+                raise
+            print(f"[DEBUG] 취소된 ChatGPT 요청 #{request.seq} 종료: {str(e)}")
+        finally:
+            request.finished_at = time.perf_counter()
+            with self._lock:
+                if self._current is request:
+                    self._current = None
+            if not request.cancelled:
+                self.completed += 1
+                _TOTAL_SECONDS.observe(request.finished_at - request.started_at)
+                if request.ttft is not None:
+                    self.ttfts.append(request.ttft)
+                    _FIRST_TOKEN_SECONDS.observe(request.ttft)
+            trace("chat_request", request.finished_at - request.started_at, seq=request.seq,
+                  ttft=request.ttft, cancelled=request.cancelled)
+
+    def stats(self):
+        ttfts = sorted(self.ttfts)
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "ttft_avg_ms": sum(ttfts) / len(ttfts) * 1000 if ttfts else 0.0,
+            "ttft_p95_ms": ttfts[int(len(ttfts) * 0.95) - 1] * 1000 if ttfts else 0.0,
+        }
@@ -0,0 +1,205 @@
+"""AI 요청용 대화 문맥 (토큰 예산 고정)
+
+최근 발언(tail)은 그대로 보내고, tail에서 밀려난 오래된 발언은 백그라운드 스레드가
+기존 요약에 합쳐서 짧은 요약으로 유지한다. 요청 시점에는 미리 만들어 둔 문자열만 가져가므로
+세션이 길어져도 프롬프트 크기와 응답 시간이 일정하다.
+
+    [이전 요약] + (아직 요약되지 않은 부분의 끝) + [최근 발언]  <= token_budget
+
+요약이 계속 실패해도 요약 대기분은 max_pending_tokens까지만 쌓고(넘치면 오래된 것부터 버림),
+프롬프트에 넣을 끝부분은 따로 잘라 두므로 발언 추가 비용이 세션 길이에 비례하지 않는다.
+"""
+import collections
+import threading
+import time
+
+
+_HEADER_TOKENS = 24  # "[이전 요약]" 등 머리말 몫
+
+
+def estimate_tokens(text):
+    """토크나이저 없이 대략적인 토큰 수 (한글 등 비ASCII는 글자당 1, ASCII는 4글자당 1)"""
+    ascii_chars = sum(1 for ch in text if ch < "\x80")
+    return (len(text) - ascii_chars) + (ascii_chars + 3) // 4
+
+
+def _clip_tail(text, max_tokens):
+    """뒤에서부터 max_tokens 이내로 자름 (남길 부분만 한 번 훑음)"""
+    ascii_chars = other = 0
+    for i in range(len(text) - 1, -1, -1):
+        if text[i] < "\x80":
+            ascii_chars += 1
+        else:
+            other += 1
+        if other + (ascii_chars + 3) // 4 > max_tokens:
+            return text[i + 1:]
+    return text
+
+
+class RollingContext:
+    def __init__(self, summarize=None, token_budget=600, tail_tokens=300, summary_tokens=200,
+                 min_summary_tokens=100, max_pending_tokens=2000):
+        self.summarize = summarize  # summarize(이전 요약, 새 텍스트, max_tokens) -> 새 요약
+        self.token_budget = token_budget
+        self.tail_tokens = tail_tokens
+        self.summary_tokens = summary_tokens
+        self.min_summary_tokens = min_summary_tokens  # 이만큼 쌓이면 요약 갱신
+        self.max_pending_tokens = max(max_pending_tokens, token_budget)  # 요약 대기분 상한
+
+        self._lock = threading.Lock()
+        self._tail = collections.deque()  # (텍스트, 토큰 수)
+        self._tail_len = 0
+        self._pending = collections.deque()  # tail에서 밀려났지만 아직 요약에 반영되지 않은 (텍스트, 토큰 수)
+        self._pending_len = 0
+        self._pending_start = 0  # _pending[0]의 누적 순번 (요약 중에 앞쪽이 버려져도 맞게 지우기 위함)
+        self._earlier = ""  # _pending의 끝부분 (token_budget의 2배를 넘으면 token_budget으로 잘라 둠)
+        self._earlier_len = 0
+        self.summary = ""
+        self._prompt_text = ""
+        self._generation = 0  # reset() 이후 이전 요약 결과를 버리기 위한 번호
+
+        self._wake = threading.Event()
+        self._running = True
+        self._thread = None
+        if summarize is not None:
+            self._thread = threading.Thread(target=self._run, name="context-summary", daemon=True)
+            self._thread.start()
+
+        # 통계
+        self.summaries = 0
+        self.failures = 0
+        self.dropped_tokens = 0
+        self.summary_seconds = 0.0
+
+    def add(self, text):
+        text = text.strip()
+        if not text:
+            return
+        tokens = estimate_tokens(text) + 1
+        with self._lock:
+            self._tail.append((text, tokens))
+            self._tail_len += tokens
+            while len(self._tail) > 1 and self._tail_len > self.tail_tokens:
+                old, old_tokens = self._tail.popleft()
+                self._tail_len -= old_tokens
+                self._pending.append((old, old_tokens))
+                self._pending_len += old_tokens
+                self._earlier = f"{self._earlier} {old}" if self._earlier else old
+                self._earlier_len += old_tokens
+                if self._earlier_len > 2 * self.token_budget:
+                    self._clip_earlier(self._earlier)
+            while len(self._pending) > 1 and self._pending_len > self.max_pending_tokens:
+                # 요약이 밀려 있으면 가장 오래된 발언부터 버림
+                _, dropped_tokens = self._pending.popleft()
+                self._pending_len -= dropped_tokens
+                self._pending_start += 1
+                self.dropped_tokens += dropped_tokens
+            self._rebuild()
+            if self._pending_len >= self.min_summary_tokens:
+                self._wake.set()
+
+    def prompt_text(self):
+        """요청에 넣을 문맥 (미리 만들어 둔 문자열)"""
+        return self._prompt_text
+
+    @property
+    def tokens(self):
+        return estimate_tokens(self._prompt_text)
+
+    def _rebuild(self):
+        """lock 안에서 호출"""
+        tail = " ".join(text for text, _ in self._tail)
+        summary = _clip_tail(self.summary, self.summary_tokens)
+        summary_len = estimate_tokens(summary)
+        tail_len = self._tail_len
+        tail_budget = max(self.token_budget - summary_len - _HEADER_TOKENS, 0)
+        if tail_len > tail_budget:
+            # 구간 하나가 예산보다 길면 (tail에 하나만 남아 있어도) 끝부분만 보냄
+            tail = _clip_tail(tail, tail_budget)
+            tail_len = estimate_tokens(tail)
+        parts = []
+        if summary:
+            parts.append(f"[이전 요약]\n{summary}")
+        remaining = self.token_budget - summary_len - tail_len - _HEADER_TOKENS
+        if self._pending and remaining > 0:
+            # 요약이 밀려 있으면 남은 예산만큼 최근 쪽을 그대로 포함
+            earlier = _clip_tail(self._earlier, remaining)
+            if earlier:
+                parts.append(f"[이전 발언]\n...{earlier}")
+        if parts:
+            parts.append(f"[최근 발언]\n{tail}")
+            self._prompt_text = "\n\n".join(parts)
+        else:
+            self._prompt_text = tail
+
+    def _clip_earlier(self, text):
+        """lock 안에서 호출"""
+        self._earlier = _clip_tail(text, self.token_budget)
+        self._earlier_len = estimate_tokens(self._earlier)
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            if not self._running:
+                return
+            with self._lock:
+                self._wake.clear()
+                pending = [text for text, _ in self._pending]
+                pending_end = self._pending_start + len(pending)
+                previous = self.summary
+                generation = self._generation
+            if not pending:
+                continue
+
+            started = time.perf_counter()
+            try:
+                summary = self.summarize(previous, " ".join(pending), self.summary_tokens)
+            except Exception as e:
+                self.failures += 1
+                print(f"[ERROR] 문맥 요약 실패: {str(e)}")
+                time.sleep(5.0)  # 다음 발언이 들어오면 다시 시도
+                continue
+            self.summary_seconds += time.perf_counter() - started
+            self.summaries += 1
+
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                # 요약하는 동안 새로 밀려난 부분은 남겨둠
+                for _ in range(max(0, pending_end - self._pending_start)):
+                    _, done_tokens = self._pending.popleft()
+                    self._pending_len -= done_tokens
+                    self._pending_start += 1
+                self._clip_earlier(" ".join(text for text, _ in self._pending))
+                self.summary = (summary or "").strip()
+                self._rebuild()
+            print(f"[DEBUG] 문맥 요약 갱신 - 요약 {estimate_tokens(self.summary)} 토큰, "
+                  f"문맥 전체 {self.tokens} 토큰")
+
+    def reset(self):
+        with self._lock:
+            self._tail.clear()
+            self._tail_len = 0
+            self._pending.clear()
+            self._pending_len = 0
+            self._earlier = ""
+            self._earlier_len = 0
+            self.summary = ""
+            self._prompt_text = ""
+            self._generation += 1
+
+    def close(self):
+        self._running = False
+        self._wake.set()
+
+    def stats(self):
+        return {
+            "tokens": self.tokens,
+            "tail_tokens": self._tail_len,
+            "pending_tokens": self._pending_len,
+            "summary_tokens": estimate_tokens(self.summary),
+            "summaries": self.summaries,
+            "failures": self.failures,
+            "dropped_tokens": self.dropped_tokens,
+            "summary_avg_ms": self.summary_seconds / self.summaries * 1000 if self.summaries else 0.0,
+        }
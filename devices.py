@@ -0,0 +1,61 @@
+"""오디오 입력 장치 검색 (한 번 조회한 목록을 캐시)
+
+장치는 번호, 정확한 이름, 또는 정규식 패턴(대소문자 무시)으로 고를 수 있다.
+    find_device(3)
+    find_device("CABLE Output (VB-Audio Virtual Cable)")
+    find_device("스테레오 믹스|Stereo Mix")
+"""
+import re
+import threading
+
+LOOPBACK_PATTERN = "스테레오 믹스|Stereo Mix"
+
+_devices = None
+_lock = threading.Lock()
+
+
+class DeviceInfo:
+    __slots__ = ("index", "name", "channels", "rate", "host_api")
+
+    def __init__(self, index, name, channels, rate, host_api):
+        self.index = index
+        self.name = name
+        self.channels = channels  # 최대 입력 채널 수
+        self.rate = rate  # 기본 샘플레이트
+        self.host_api = host_api
+
+    def __repr__(self):
+        return f"DeviceInfo({self.index}, {self.name!r}, channels={self.channels}, rate={self.rate})"
+
+
+def list_input_devices(refresh=False):
+    """입력 장치 목록 (처음 한 번만 PyAudio로 조회, refresh=True면 다시 조회)"""
+    global _devices
+    with _lock:
+        if _devices is None or refresh:
+            import pyaudio  # 장치 조회가 필요할 때만 로드
+            p = pyaudio.PyAudio()
+            try:
+                devices = []
+                for i in range(p.get_device_count()):
+                    info = p.get_device_info_by_index(i)
+                    if info.get("maxInputChannels", 0) > 0:
+                        devices.append(DeviceInfo(i, info.get("name", ""), int(info["maxInputChannels"]),
+                                                  int(info.get("defaultSampleRate", 44100)), info.get("hostApi")))
+            finally:
+                p.terminate()
+            _devices = devices
+        return list(_devices)
+
+
+def find_device(spec, devices=None):
+    """spec(번호/이름/패턴)에 맞는 첫 입력 장치, 없으면 None"""
+    if devices is None:
+        devices = list_input_devices()
+    if isinstance(spec, int):
+        return next((d for d in devices if d.index == spec), None)
+    exact = next((d for d in devices if d.name == spec), None)
+    if exact is not None:
+        return exact
+    pattern = re.compile(spec, re.IGNORECASE)
+    return next((d for d in devices if pattern.search(d.name)), None)
@@ -0,0 +1,466 @@
+"""엔드 투 엔드 벤치마크: 녹음 파일 재생 → 실제 녹음/인식/표시/AI 요청 경로 → 가짜 OpenAI 서버
+
+사운드 장치, 실제 API 키, 마우스를 움직이는 사람 없이 앱 전체 경로를 같은 조건으로 반복 측정한다.
+- 오디오: 단어마다 다른 높이의 음(톤)으로 만든 WAV를 캡처 프로세스의 가짜 소스로 실시간 재생
+  (--wav로 44.1kHz 스테레오 16bit 녹음 파일을 줄 수도 있음. 이때는 단어 지연을 재지 않음)
+- 서버: 별도 프로세스의 FakeOpenAIServer (응답 지연/오류 비율 설정). Whisper 요청은 업로드된 WAV에서
+  톤을 찾아 단어로 "인식"하므로 어떤 단어가 언제 말해졌는지 알 수 있음
+- 앱: AudioSTTApp을 창 없이 실행 (HeadlessRoot가 Tk 메인 루프의 after 타이머 역할).
+  record_and_transcribe → 파이프라인 → _on_stt_result → update_transcript → UI 이벤트,
+  트리거 → _call_chatgpt_api 는 실제 코드 그대로이고, 위젯만 값을 기록하는 것으로 바뀜
+- AI 요청: 마우스 대신 trigger_interval초마다 트리거 발생
+
+측정: 캡처 프로세스/메인 프로세스 CPU, 메모리(RSS) 변화, 단어 지연 (말한 시점 → 화면 반영),
+분당 API 호출 수, 업로드 바이트. 결과 JSON은 benchmark.py --compare로 버전끼리 비교한다.
+
+    python e2e_benchmark.py --seconds 120 --latency 0.5 --error-rate 0.05 --json e2e.json
+"""
+import argparse
+import heapq
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+import wave
+
+import numpy as np
+
+import stt_app
+from api_client import get_client
+from fake_openai_server import FakeOpenAIServer
+from telemetry import REGISTRY
+
+# 톤 단어: VOCABULARY[k]는 TONE_BASE_HZ + k * TONE_STEP_HZ 의 음
+VOCABULARY = ["오늘", "회의", "다음", "분기", "예산", "계획", "신규", "프로젝트", "일정", "논의", "실적", "매출",
+              "목표", "비용", "담당자", "확정", "질문", "답변", "자료", "공유", "검토", "결정", "보고", "마감"]
+TONE_BASE_HZ = 400
+TONE_STEP_HZ = 60
+WORD_SECONDS = 0.3
+WORD_GAP_SECONDS = 0.12  # VAD가 구간을 자르지 않는 짧은 쉼
+SENTENCE_PAUSE_SECONDS = 1.2  # VAD가 구간을 자르는 긴 쉼
+
+RATE = 44100
+CHANNELS = 2
+CHUNK = 1024
+
+
+def write_tone_fixture(path, sentences=12, seed=0):
+    """톤 단어 문장으로 된 WAV를 만들고 (단어 번호 목록, 단어 끝 시각 목록, 전체 길이(초)) 반환
+
+    길이는 CHUNK 프레임의 배수로 맞춰서 가짜 소스가 반복 재생할 때 한 바퀴 길이가 정확히 같음.
+    """
+    rng = random.Random(seed)
+    word_frames = int(WORD_SECONDS * RATE)
+    fade = np.minimum(1.0, np.minimum(np.arange(word_frames), np.arange(word_frames)[::-1]) / (0.01 * RATE))
+    parts = [np.zeros(int(0.5 * RATE))]
+    t = 0.5
+    ids, ends = [], []
+    for _ in range(sentences):
+        for i in range(rng.randint(4, 9)):
+            if i:
+                parts.append(np.zeros(int(WORD_GAP_SECONDS * RATE)))
+                t += WORD_GAP_SECONDS
+            k = rng.randrange(len(VOCABULARY))
+            freq = TONE_BASE_HZ + k * TONE_STEP_HZ
+            parts.append(8000 * np.sin(2 * np.pi * freq * np.arange(word_frames) / RATE) * fade)
+            t += WORD_SECONDS
+            ids.append(k)
+            ends.append(t)
+        parts.append(np.zeros(int(SENTENCE_PAUSE_SECONDS * RATE)))
+        t += SENTENCE_PAUSE_SECONDS
+    mono = np.concatenate(parts)
+    mono = np.concatenate([mono, np.zeros(-len(mono) % CHUNK)])
+    pcm = np.repeat(np.rint(mono).astype("<i2")[:, None], CHANNELS, axis=1)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(CHANNELS)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(pcm.tobytes())
+    return ids, ends, len(mono) / RATE
+
+
+def transcribe_tones(body):
+    """가짜 Whisper: 업로드된 multipart 본문의 WAV에서 톤 구간을 찾아 단어로 바꿈
+
+    0.1초보다 짧은 조각은 버리고 (구간 경계에서 잘린 단어), 나머지는 가장 센 주파수로 단어를 고른다.
+    """
+    start = body.find(b"RIFF")
+    if start < 0:
+        return ""
+    try:
+        with wave.open(io.BytesIO(body[start:]), "rb") as wf:
+            rate, channels = wf.getframerate(), wf.getnchannels()
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2").reshape(-1, channels)
+    except (wave.Error, EOFError, ValueError):
+        return ""
+    samples = samples.mean(axis=1)
+    frame = rate // 100
+    n_frames = len(samples) // frame
+    if not n_frames:
+        return ""
+    rms = np.sqrt(np.mean(samples[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+    voiced = np.concatenate([[False], rms > 1000, [False]])
+    edges = np.flatnonzero(voiced[1:] != voiced[:-1])
+    words = []
+    for a, b in zip(edges[::2], edges[1::2]):
+        if b - a < 10:
+            continue
+        segment = samples[a * frame:b * frame]
+        spectrum = np.abs(np.fft.rfft(segment * np.hanning(len(segment))))
+        freq = np.argmax(spectrum) * rate / len(segment)
+        k = int(round((freq - TONE_BASE_HZ) / TONE_STEP_HZ))
+        if 0 <= k < len(VOCABULARY):
+            words.append(VOCABULARY[k])
+    return " ".join(words)
+
+
+def _serve(conn, latency, error_rate, token_delay, seed):
+    """서버 프로세스: 가짜 서버를 띄우고 url을 보낸 뒤, 요청이 오면 통계를 보내고 종료
+
+    앱과 같은 프로세스에서 돌리면 서버 스레드의 CPU가 앱 CPU에 섞이므로 따로 띄운다.
+    """
+    random.seed(seed)  # 오류를 낼 요청을 고르는 순서를 실행마다 같게
+    server = FakeOpenAIServer(latency=latency, error_rate=error_rate, transcribe=transcribe_tones,
+                              token_delay=token_delay).start()
+    conn.send(server.url)
+    conn.recv()
+    conn.send({"transcriptions": server.transcriptions, "chat_completions": server.chat_completions,
+               "errors": server.errors, "bytes_received": server.bytes_received, "connections": server.connections})
+    server.stop()
+
+
+class HeadlessRoot:
+    """창 없이 Tk 루트의 after 타이머만 흉내 냄 (run을 호출한 스레드가 메인 루프 역할)"""
+
+    def __init__(self):
+        self._timers = []  # (실행 시각, 순번, func, args)
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def title(self, *args):
+        pass
+
+    def geometry(self, *args):
+        pass
+
+    def protocol(self, name, func):
+        pass
+
+    def destroy(self):
+        pass
+
+    def after(self, ms, func, *args):
+        timer_id = next(self._ids)
+        with self._lock:
+            heapq.heappush(self._timers, (time.perf_counter() + ms / 1000, timer_id, func, args))
+        return timer_id
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def run(self, seconds, until=None):
+        """seconds 동안 (until()이 참이 되면 바로) 타이머를 실행"""
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline and not (until and until()):
+            with self._lock:
+                due = self._timers[0][0] if self._timers else deadline
+                timer = heapq.heappop(self._timers) if due <= time.perf_counter() else None
+            if timer is None:
+                time.sleep(min(max(due - time.perf_counter(), 0), 0.01))
+                continue
+            timer[2](*timer[3])
+
+
+class _HeadlessWidget:
+    """값만 기록하는 위젯 (Entry.get/insert, Label/Button.config)"""
+
+    def __init__(self, text=""):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+    def insert(self, index, text):
+        self.text += text
+
+    def bind(self, *args):
+        pass
+
+    def config(self, **kwargs):
+        self.text = kwargs.get("text", self.text)
+
+
+class HeadlessSTTApp(stt_app.AudioSTTApp):
+    """위젯 대신 화면에 반영된 내용과 시각을 기록하는 앱 (나머지 경로는 AudioSTTApp 그대로)"""
+
+    def __init__(self, root, api_key="sk-benchmark"):
+        self._api_key = api_key
+        self.shown_lines = []  # (표시 시각 time.time(), "[HH:MM:SS] 텍스트")
+        self.sent_texts = 0
+        self.responses = 0
+        self.response_tokens = 0
+        self.audio_t0 = None  # 캡처한 첫 바이트의 시각 추정 (time.time())
+        self.audio_seconds = 0.0  # 파이프라인이 읽은 오디오 길이
+        self._audio_bytes = 0
+        super().__init__(root)
+
+    def _setup_telemetry(self):
+        self.METRICS_PORT = None  # 벤치마크끼리 포트가 겹치지 않게
+        super()._setup_telemetry()
+
+    def create_widgets(self):
+        self.api_key_entry = _HeadlessWidget(self._api_key)
+        self.status_label = _HeadlessWidget("대기 중")
+        self.record_button = _HeadlessWidget("녹음 시작")
+
+    def start_mouse_listener(self):
+        pass  # 마우스 대신 벤치마크가 트리거를 발생
+
+    def _build_pipeline(self, lane, read_chunk, backend, multi=False):
+        def read():
+            # 캡처는 실시간이므로 지금까지 읽은 바이트로 첫 바이트의 시각을 역산 (가장 이른 값 = 읽기 지연이 가장 작을 때)
+            data = read_chunk()
+            size = memoryview(data).nbytes
+            if size:
+                self._audio_bytes += size
+                self.audio_seconds = self._audio_bytes / lane.bytes_per_second
+                t0 = time.time() - self._audio_bytes / lane.bytes_per_second
+                if self.audio_t0 is None or t0 < self.audio_t0:
+                    self.audio_t0 = t0
+            return data
+
+        return super()._build_pipeline(lane, read, backend, multi)
+
+    def _ui_append_transcript_line(self, line):
+        self.shown_lines.append((time.time(), line))
+
+    def _ui_set_provisional(self, text):
+        self._shown_provisional = text
+
+    def _update_sent_text(self, text):
+        self.sent_texts += 1
+
+    def _update_chatgpt_response_area(self, response_text):
+        if response_text:
+            self.responses += 1
+
+    def _append_chatgpt_response(self, seq, token):
+        self.response_tokens += 1
+
+
+def _rss_mb():
+    """메인 프로세스 RSS (MB). /proc가 없으면 최대 RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # 리눅스 KB 기준
+
+
+def _process_cpu_seconds(pid):
+    """다른 프로세스의 CPU 시간 (리눅스 /proc, 알 수 없으면 None)"""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def word_latencies(shown_lines, ids, ends, loop_seconds, audio_t0, lookahead=4):
+    """화면에 나온 단어를 재생한 단어 순서에 맞춰 (말한 시점 → 표시) 지연 목록과 맞지 않은 단어 수를 반환
+
+    파일이 반복 재생되므로 p번째 단어는 p // len(ids) 바퀴째의 ids[p % len(ids)].
+    구간 경계에서 두 번 인식된 단어나 잘못 인식된 단어는 lookahead 안에서 맞는 단어가 없으면 건너뜀.
+    """
+    latencies = []
+    unmatched = 0
+    position = 0
+    n = len(ids)
+    for shown_at, line in shown_lines:
+        for word in line.split("] ", 1)[-1].split():
+            k = VOCABULARY.index(word) if word in VOCABULARY else None
+            for p in range(position, position + lookahead):
+                if ids[p % n] == k:
+                    spoken_at = audio_t0 + (p // n) * loop_seconds + ends[p % n]
+                    latencies.append(shown_at - spoken_at)
+                    position = p + 1
+                    break
+            else:
+                unmatched += 1
+    return latencies, unmatched
+
+
+def run(seconds=60.0, latency=0.4, error_rate=0.0, token_delay=0.01, trigger_interval=10.0, wav_path=None,
+        settings=None, sample_interval=1.0, seed=0):
+    """앱 전체 경로를 seconds초 동안 실행하고 측정 결과 dict 반환
+
+    settings: 녹음 전에 앱에 지정할 설정 (예: {"ADAPTIVE": False, "RECORD_SECONDS": 3})
+    """
+    cwd = os.getcwd()
+    tmp = tempfile.TemporaryDirectory()  # sessions/ 저널이 현재 폴더에 생기므로
+    parent_conn, child_conn = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=_serve, args=(child_conn, latency, error_rate, token_delay, seed),
+                                     name="fake-openai", daemon=True)
+    server.start()
+    try:
+        os.chdir(tmp.name)
+        fixture = None
+        if wav_path is None:
+            wav_path = os.path.join(tmp.name, "fixture.wav")
+            fixture = write_tone_fixture(wav_path, seed=seed)
+        os.environ["OPENAI_BASE_URL"] = parent_conn.recv()
+
+        root = HeadlessRoot()
+        app = HeadlessSTTApp(root)
+        app.CAPTURE_SOURCE = "fake"
+        app.CAPTURE_WAV_PATH = wav_path
+        for name, value in (settings or {}).items():
+            setattr(app, name, value)
+        root.run(10, until=lambda: app.warmup.wait_all(0))  # 창이 뜬 뒤 백그라운드 준비가 끝날 때까지
+
+        samples = []  # (경과 초, RSS MB, 메인 CPU 초, 캡처 CPU 초)
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+
+        def sample():
+            pid = app.lanes[0].capture.pid if app.lanes and app.lanes[0].capture is not None else None
+            samples.append((time.perf_counter() - started, _rss_mb(), time.process_time() - cpu_started,
+                            _process_cpu_seconds(pid)))
+            root.after(int(sample_interval * 1000), sample)
+
+        def trigger():
+            app.triggers.fire("benchmark")
+            root.after(int(trigger_interval * 1000), trigger)
+
+        app.toggle_recording()
+        sample()
+        root.after(int(trigger_interval * 1000), trigger)
+        root.run(seconds)
+        app.toggle_recording()
+        # 남은 구간 업로드와 정리가 끝날 때까지 (lane.release 후 capture가 None)
+        root.run(30, until=lambda: app.lanes and all(lane.capture is None for lane in app.lanes))
+        root.run(1.0)  # 마지막 UI 이벤트/AI 응답
+        elapsed = time.perf_counter() - started
+        main_cpu = time.process_time() - cpu_started
+        app.on_close()
+    finally:
+        os.chdir(cwd)
+        parent_conn.send("stats")
+        server_stats = parent_conn.recv() if parent_conn.poll(10) else {}
+        server.join(5)
+        tmp.cleanup()
+
+    minutes = elapsed / 60
+    capture_cpu = next((s[3] for s in reversed(samples) if s[3] is not None), None)
+    results = {
+        "config": {"seconds": seconds, "latency": latency, "error_rate": error_rate,
+                   "trigger_interval": trigger_interval, "seed": seed, "settings": settings or {}},
+        "elapsed_seconds": round(elapsed, 2),
+        "cpu": {
+            "main_percent": round(main_cpu / elapsed * 100, 2),
+            "capture_percent": round(capture_cpu / samples[-1][0] * 100, 2) if capture_cpu else None,
+        },
+        "memory": _memory_stats(samples),
+        "api": {
+            "transcriptions_per_minute": round(server_stats.get("transcriptions", 0) / minutes, 2),
+            "chat_completions_per_minute": round(server_stats.get("chat_completions", 0) / minutes, 2),
+            "errors": server_stats.get("errors", 0),
+            "connections": server_stats.get("connections", 0),
+            "bytes_uploaded": server_stats.get("bytes_received", 0),
+            "bytes_uploaded_per_minute": round(server_stats.get("bytes_received", 0) / minutes),
+            "client": get_client(app.api_key_entry.get()).stats(),
+        },
+        "transcript": {"lines": len(app.shown_lines), "ai_requests_shown": app.sent_texts,
+                       "ai_responses": app.responses, "ai_response_tokens": app.response_tokens},
+        "histograms": REGISTRY.summary(),
+    }
+    if fixture is not None and app.audio_t0 is not None:
+        ids, ends, loop_seconds = fixture
+        latencies, unmatched = word_latencies(app.shown_lines, ids, ends, loop_seconds, app.audio_t0)
+        loops = int(app.audio_seconds / loop_seconds) + 1
+        spoken = sum(1 for p in range(loops * len(ids))
+                     if (p // len(ids)) * loop_seconds + ends[p % len(ids)] <= app.audio_seconds)
+        results["word_latency"] = {
+            "words_spoken": spoken,
+            "words_shown": len(latencies),
+            "words_unmatched": unmatched,
+            "recall": round(len(latencies) / spoken, 3) if spoken else None,
+            "p50_ms": round(_percentile(latencies, 0.5) * 1000) if latencies else None,
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000) if latencies else None,
+            "max_ms": round(max(latencies) * 1000) if latencies else None,
+        }
+    return results
+
+
+def _memory_stats(samples):
+    """RSS 시작/끝/최대와 후반부 기울기 (시작 직후 모듈 로드/버퍼 할당은 빼고 증가 추세만)"""
+    rss = [s[1] for s in samples]
+    tail = samples[len(samples) // 2:]
+    slope = 0.0
+    if len(tail) >= 2:
+        t = np.array([s[0] for s in tail])
+        y = np.array([s[1] for s in tail])
+        slope = float(np.polyfit(t, y, 1)[0]) * 60
+    return {"rss_start_mb": round(rss[0], 1), "rss_end_mb": round(rss[-1], 1), "rss_max_mb": round(max(rss), 1),
+            "growth_mb_per_minute": round(slope, 3),
+            "timeline": [[round(s[0], 1), round(s[1], 1)] for s in samples[::max(len(samples) // 30, 1)]]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STT 앱 엔드 투 엔드 벤치마크 (가짜 오디오 + 가짜 OpenAI 서버)")
+    parser.add_argument("--seconds", type=float, default=60, help="녹음 시간 (초)")
+    parser.add_argument("--latency", type=float, default=0.4, help="가짜 서버 응답 지연 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="가짜 서버 500 오류 비율 (0~1)")
+    parser.add_argument("--trigger-interval", type=float, default=10, help="AI 응답 요청 트리거 간격 (초)")
+    parser.add_argument("--wav", help="톤 파일 대신 재생할 WAV (44.1kHz 스테레오 16bit, 단어 지연은 측정 안 함)")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="앱 설정 덮어쓰기 (값은 JSON, 예: --set ADAPTIVE=false --set RECORD_SECONDS=3)")
+    parser.add_argument("--seed", type=int, default=0, help="톤 파일과 서버 오류 순서를 정하는 시드")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 ('-'면 표준 출력)")
+    args = parser.parse_args()
+
+    settings = {}
+    for item in args.set:
+        name, _, value = item.partition("=")
+        settings[name] = json.loads(value)
+    results = run(args.seconds, args.latency, args.error_rate, trigger_interval=args.trigger_interval,
+                  wav_path=args.wav, settings=settings, seed=args.seed)
+    print_results(results)
+    if args.json == "-":
+        print(json.dumps(results, ensure_ascii=False))
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def print_results(results):
+    cpu, memory, api = results["cpu"], results["memory"], results["api"]
+    print(f"[e2e] {results['elapsed_seconds']:.0f}초: CPU 메인 {cpu['main_percent']}% / 캡처 {cpu['capture_percent']}%, "
+          f"메모리 {memory['rss_start_mb']}→{memory['rss_end_mb']}MB (후반 {memory['growth_mb_per_minute']:+}MB/분)")
+    print(f"[e2e] API: Whisper {api['transcriptions_per_minute']}/분, ChatGPT {api['chat_completions_per_minute']}/분, "
+          f"오류 {api['errors']}, 업로드 {api['bytes_uploaded_per_minute'] / 1024:.0f}KB/분, 연결 {api['connections']}개")
+    words = results.get("word_latency")
+    if words:
+        print(f"[e2e] 단어 지연 p50 {words['p50_ms']}ms / p95 {words['p95_ms']}ms / 최대 {words['max_ms']}ms, "
+              f"표시된 단어 {words['words_shown']}/{words['words_spoken']} (맞지 않은 단어 {words['words_unmatched']})")
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
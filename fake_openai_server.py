@@ -0,0 +1,191 @@
+"""OpenAI API를 흉내 내는 로컬 HTTP 서버 (테스트/벤치마크용)
+
+/v1/audio/transcriptions, /v1/chat/completions (stream 포함), /v1/models (연결 예열용) 만 지원한다.
+응답 지연과 오류 비율, 새 연결마다의 지연(TCP/TLS 연결 비용 흉내)을 설정할 수 있고,
+받은 요청 수와 업로드 바이트를 센다.
+
+실행 예시:
+    python fake_openai_server.py --port 8000 --latency 0.5 --error-rate 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:8000/v1 python stt_app.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAIServer:
+    """백그라운드 스레드에서 도는 가짜 OpenAI 서버
+
+    transcribe(body) -> str 로 STT 응답 텍스트를, chat(request) -> str 로 채팅 응답을 바꿀 수 있음.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, transcribe=None, chat=None,
+                 token_delay=0.02, connect_delay=0.0):
+        self.latency = latency
+        self.connect_delay = connect_delay  # 새 연결을 받을 때마다 지연 (keep-alive 재사용 효과 확인용)
+        self.token_delay = token_delay  # 스트리밍 응답에서 토큰 사이 간격 (초)
+        self.error_rate = error_rate
+        self.fail_next = 0  # 다음 POST 요청 몇 개를 무조건 500으로 응답 (테스트용)
+        self.transcribe = transcribe or (lambda body: f"테스트 음성 {self.transcriptions}")
+        self.chat = chat or (lambda request: "테스트 응답입니다.")
+
+        # 통계
+        self.transcriptions = 0
+        self.chat_completions = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _delay(self):
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency > 0:
+            time.sleep(latency)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive 지원
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+                if server.connect_delay > 0:
+                    time.sleep(server.connect_delay)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream_chat(self, request):
+                """SSE(chunked)로 한 글자씩 전송"""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                base = {
+                    "id": f"chatcmpl-fake-{server.chat_completions}",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": request.get("model", "fake"),
+                }
+                try:
+                    for token in server.chat(request):
+                        chunk = dict(base, choices=[{"index": 0, "delta": {"content": token}, "finish_reason": None}])
+                        self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n")
+                        if server.token_delay:
+                            time.sleep(server.token_delay)
+                    chunk = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+                    self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                    self._write_chunk("data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # 클라이언트가 스트림을 취소함
+
+            def _write_chunk(self, text):
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [
+                        {"id": model, "object": "model", "created": 0, "owned_by": "fake"}
+                        for model in ("whisper-1", "gpt-4.1", "gpt-4.1-mini")]})
+                else:
+                    self._send_json(404, {"error": {"message": f"unknown path {self.path}", "type": "invalid_request_error"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                with server._lock:
+                    server.bytes_received += length
+
+                server._delay()
+                with server._lock:
+                    forced = server.fail_next > 0
+                    if forced:
+                        server.fail_next -= 1
+                if forced or random.random() < server.error_rate:
+                    with server._lock:
+                        server.errors += 1
+                    self._send_json(500, {"error": {"message": "fake server error", "type": "server_error"}})
+                    return
+
+                if self.path.endswith("/audio/transcriptions"):
+                    with server._lock:
+                        server.transcriptions += 1
+                    self._send_json(200, {"text": server.transcribe(body)})
+                elif self.path.endswith("/chat/completions"):
+                    with server._lock:
+                        server.chat_completions += 1
+                    request = json.loads(body or b"{}")
+                    if request.get("stream"):
+                        self._stream_chat(request)
+                        return
+                    self._send_json(200, {
+                        "id": f"chatcmpl-fake-{server.chat_completions}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request.get("model", "fake"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": server.chat(request)},
+                            "finish_reason": "stop",
+                        }],
+                    })
+                else:
+                    self._send_json(404, {"error": {"message": f"unknown path {self.path}", "type": "invalid_request_error"}})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 OpenAI API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 오류 비율 (0~1)")
+    parser.add_argument("--connect-delay", type=float, default=0.0, help="새 연결마다 지연 (초)")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.host, args.port, args.latency, args.error_rate, connect_delay=args.connect_delay)
+    print(f"가짜 OpenAI 서버 실행 중: {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
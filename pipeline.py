@@ -0,0 +1,416 @@
+"""캡처 → 윈도우 → 인코딩 → 업로드 단계로 구성된 STT 파이프라인
+
+각 단계는 자기 스레드에서 입력 큐를 블로킹으로 기다리다가(폴링 없음) 아이템이 들어오면
+처리해서 다음 단계의 큐로 넘긴다. 큐는 모두 크기가 제한되어 있고, 가득 찼을 때의
+동작(drop policy)을 단계별로 지정할 수 있다.
+"""
+import queue
+import threading
+import time
+
+from telemetry import REGISTRY
+from worker_pool import OrderedWorkerPool
+
+# 큐가 가득 찼을 때의 동작
+DROP_OLDEST = "drop_oldest"  # 가장 오래된 아이템을 버리고 새 아이템을 넣음
+DROP_NEWEST = "drop_newest"  # 새 아이템을 버림
+BLOCK = "block"  # 자리가 날 때까지 생산자를 대기시킴 (block_timeout 초과 시 버림)
+
+_STOP = object()  # 단계 종료 신호
+
+
+class BoundedQueue:
+    """크기 제한 + 드롭 정책을 가진 큐"""
+
+    def __init__(self, maxsize, policy=DROP_OLDEST, block_timeout=None):
+        if policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"알 수 없는 드롭 정책: {policy}")
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    def put(self, item):
+        """아이템 추가. 드롭된 경우 False 반환"""
+        if self.policy == BLOCK:
+            try:
+                self._queue.put(item, timeout=self.block_timeout)
+                return True
+            except queue.Full:
+                self.dropped += 1
+                return False
+
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return True
+            except queue.Full:
+                if self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def put_control(self, item):
+        """종료 신호 등 제어 아이템은 드롭 정책과 관계없이 반드시 넣음"""
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        return self._queue.get(timeout=timeout)
+
+
+class AudioWindow:
+    """STT로 보낼 오디오 구간 하나"""
+    __slots__ = ("seq", "pcm", "start_byte", "end_byte", "captured_at", "payload")
+
+    def __init__(self, seq, pcm, start_byte, end_byte, captured_at):
+        self.seq = seq
+        self.pcm = pcm
+        self.start_byte = start_byte
+        self.end_byte = end_byte
+        self.captured_at = captured_at
+        self.payload = None  # 인코딩 단계 결과 (업로드할 파일 객체)
+
+
+class Stage:
+    """입력 큐 하나와 처리 함수 하나를 가진 파이프라인 단계
+
+    handler(item)이 None이 아닌 값을 반환하면 다음 단계로 전달한다.
+    """
+
+    def __init__(self, name, handler, maxsize=8, policy=DROP_OLDEST, block_timeout=None):
+        self.name = name
+        self.handler = handler
+        self.queue = BoundedQueue(maxsize, policy, block_timeout)
+        self.downstream = None
+        self.processed = 0
+        self.errors = 0
+        self._thread = None
+
+        # 지표 (같은 이름의 단계는 녹음을 다시 시작해도 같은 지표를 이어서 씀)
+        self.handle_seconds = REGISTRY.histogram("stt_stage_seconds", "파이프라인 단계별 아이템 처리 시간 (초)",
+                                                 stage=name)
+        REGISTRY.gauge("stt_queue_depth", "단계 입력 큐에 쌓인 아이템 수", func=lambda: self.queue.depth, stage=name)
+        REGISTRY.counter("stt_queue_dropped_total", "큐가 가득 차서 버린 아이템 수",
+                         func=lambda: self.queue.dropped, stage=name)
+        REGISTRY.counter("stt_stage_errors_total", "단계 처리 오류 수", func=lambda: self.errors, stage=name)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self.queue.put_control(_STOP)
+        if self._thread:
+            self._thread.join(timeout)
+
+    def put(self, item):
+        return self.queue.put(item)
+
+    def emit(self, item):
+        if self.downstream is not None:
+            self.downstream.put(item)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                self._finish()
+                break
+            started = time.perf_counter()
+            try:
+                result = self.handler(item)
+            except Exception as e:
+                self.errors += 1
+                print(f"[ERROR] 파이프라인 단계 '{self.name}' 처리 오류: {str(e)}")
+                continue
+            self.handle_seconds.observe(time.perf_counter() - started)
+            self.processed += 1
+            if result is not None:
+                self.emit(result)
+
+    def _finish(self):
+        """종료 직전에 호출됨 (남은 데이터를 내보낼 단계에서 재정의)"""
+        try:
+            result = self.on_stop()
+        except Exception as e:
+            self.errors += 1
+            print(f"[ERROR] 파이프라인 단계 '{self.name}' 종료 처리 오류: {str(e)}")
+            return
+        if result is not None:
+            self.emit(result)
+
+    def on_stop(self):
+        return None
+
+    def stats(self):
+        return {
+            "stage": self.name,
+            "depth": self.queue.depth,
+            "maxsize": self.queue.maxsize,
+            "dropped": self.queue.dropped,
+            "processed": self.processed,
+            "errors": self.errors,
+        }
+
+
+class CaptureStage:
+    """오디오 장치에서 청크를 읽어 다음 단계로 넘기는 단계
+
+    stream.read가 블로킹이라 자체적으로 속도가 맞춰지므로 별도 큐 없이
+    호출한 스레드에서 바로 루프를 돈다.
+    """
+
+    def __init__(self, read_chunk, name="capture"):
+        self.name = name
+        self.read_chunk = read_chunk
+        self.downstream = None
+        self.processed = 0
+        self.errors = 0
+        self.bytes_read = 0
+        REGISTRY.counter("stt_capture_bytes_total", "장치에서 읽은 오디오 바이트 수", func=lambda: self.bytes_read,
+                         stage=name)
+        REGISTRY.counter("stt_stage_errors_total", "단계 처리 오류 수", func=lambda: self.errors, stage=name)
+
+    def run(self, keep_running):
+        while keep_running():
+            try:
+                data = self.read_chunk()
+            except Exception as e:
+                self.errors += 1
+                print(f"[ERROR] 오디오 읽기 오류: {str(e)}")
+                continue
+            if not len(data):
+                continue  # 제한 시간 안에 새 오디오가 없음 (keep_running 다시 확인)
+            self.processed += 1
+            self.bytes_read += len(data)
+            self.downstream.put(data)
+
+    def stats(self):
+        return {
+            "stage": self.name,
+            "depth": 0,
+            "maxsize": 0,
+            "dropped": 0,
+            "processed": self.processed,
+            "errors": self.errors,
+        }
+
+
+class WindowStage(Stage):
+    """청크를 링 버퍼에 쌓고 STT로 보낼 AudioWindow를 잘라서 내보냄
+
+    - 기본: window_bytes만큼 새로 모일 때마다 고정 길이로 자름
+    - segmenter(vad.SpeechSegmenter)만 있으면: 발화 구간 단위로 자르고 무음은 건너뜀
+    - hop_bytes가 있으면 (스트리밍): hop_bytes마다 최근 window_bytes를 겹치게 자름.
+      segmenter가 함께 있으면 윈도우 안에 음성이 없을 때는 건너뜀
+    """
+
+    def __init__(self, buffer, lock, window_bytes, hop_bytes=None, segmenter=None, maxsize=64,
+                 policy=DROP_OLDEST, name="window"):
+        super().__init__(name, self._on_chunk, maxsize, policy)
+        self.buffer = buffer
+        self.lock = lock
+        self.window_bytes = min(window_bytes, buffer.capacity)
+        self.hop_bytes = min(hop_bytes, self.window_bytes) if hop_bytes else None
+        self.segmenter = segmenter
+        self.skipped_silent = 0  # 스트리밍 모드에서 음성이 없어 건너뛴 윈도우 수
+        self._next_seq = 0
+        self._last_emit = buffer.total_written  # 마지막으로 내보낸 윈도우의 끝 위치 (절대 바이트)
+        REGISTRY.counter("stt_windows_total", "STT로 보낸 윈도우 수", func=lambda: self._next_seq, stage=name)
+        REGISTRY.counter("stt_windows_skipped_silent_total", "음성이 없어 건너뛴 스트리밍 윈도우 수",
+                         func=lambda: self.skipped_silent, stage=name)
+        if segmenter is not None:
+            REGISTRY.counter("stt_vad_discarded_total", "너무 짧아 버린 VAD 구간 수", func=lambda: segmenter.discarded,
+                             stage=name)
+            REGISTRY.gauge("stt_speech_ratio", "지금까지 입력 중 음성 비율", func=lambda: segmenter.speech_ratio,
+                           stage=name)
+            # 구간 비율을 임의 기간으로 보려면 두 누적값의 증가량 비율 (rate(speech) / rate(audio))
+            REGISTRY.counter("stt_vad_speech_seconds_total", "VAD가 음성으로 판정한 입력 길이 (초)",
+                             func=lambda: segmenter.speech_bytes / segmenter.bytes_per_second, stage=name)
+            REGISTRY.counter("stt_vad_audio_seconds_total", "VAD가 판정한 입력 전체 길이 (초)",
+                             func=lambda: segmenter.total_bytes / segmenter.bytes_per_second, stage=name)
+            if not self.hop_bytes:
+                REGISTRY.counter("stt_vad_skipped_requests_total", "무음이라 보내지 않은 STT 요청 수 (고정 윈도우 기준 추정)",
+                                 func=lambda: segmenter.skipped_windows(self.window_bytes), stage=name)
+
+    def _on_chunk(self, data):
+        with self.lock:
+            self.buffer.write(data)
+            end = self.buffer.total_written
+
+        if self.hop_bytes is not None:
+            if self.segmenter is not None:
+                self.segmenter.feed(data)
+            if end - self._last_emit < self.hop_bytes:
+                return None
+            self._last_emit = end
+            if self.segmenter is not None and self.segmenter.last_speech_byte <= end - self.window_bytes:
+                self.skipped_silent += 1
+                return None
+            return self._make_window(end - self.window_bytes, end)
+
+        if self.segmenter is not None:
+            windows = [self._make_window(seg_start, seg_end) for seg_start, seg_end in self.segmenter.feed(data)]
+            for window in windows[:-1]:
+                self.emit(window)
+            return windows[-1] if windows else None
+
+        if end - self._last_emit < self.window_bytes:
+            return None
+        self._last_emit = end
+        return self._make_window(end - self.window_bytes, end)
+
+    @property
+    def emitted(self):
+        """지금까지 내보낸 윈도우 수"""
+        return self._next_seq
+
+    def set_window_bytes(self, window_bytes):
+        """요청 하나에 담을 오디오 길이 변경 (녹음 중 적응형 스케줄러가 호출)
+
+        고정 윈도우는 다음 윈도우부터, VAD 모드는 구간 최대 길이로 적용된다.
+        스트리밍 모드는 겹치는 윈도우 길이가 인식 문맥이라 바꾸지 않음.
+        """
+        if self.hop_bytes is not None:
+            return
+        window_bytes = min(window_bytes, self.buffer.capacity)
+        if self.segmenter is not None:
+            self.segmenter.max_segment_bytes = window_bytes
+        self.window_bytes = window_bytes
+
+    def _make_window(self, start, end):
+        with self.lock:
+            start = max(start, self.buffer.total_written - len(self.buffer))
+            pcm = bytes(self.buffer.window(start, end))
+        window = AudioWindow(self._next_seq, pcm, start, end, time.time())
+        self._next_seq += 1
+        return window
+
+    def on_stop(self):
+        if self.segmenter is None or self.hop_bytes is not None:
+            return None
+        segment = self.segmenter.flush()
+        return self._make_window(*segment) if segment else None
+
+    def stats(self):
+        stats = super().stats()
+        if self.hop_bytes is not None:
+            stats["skipped_silent"] = self.skipped_silent
+        elif self.segmenter is not None:
+            stats["vad_segments"] = self.segmenter.segments
+            stats["vad_discarded"] = self.segmenter.discarded
+            stats["vad_skipped_requests"] = self.segmenter.skipped_windows(self.window_bytes)
+            stats["speech_ratio"] = round(self.segmenter.speech_ratio, 3)
+        return stats
+
+
+class UploadStage(Stage):
+    """인코딩된 윈도우를 OrderedWorkerPool로 동시에 업로드하는 단계
+
+    풀이 가득 차면 이 단계의 큐가 쌓이고 드롭 정책이 적용된다.
+    결과는 캡처 순서대로 on_result(window, text)로 전달됨.
+    """
+
+    def __init__(self, transcribe, on_result, max_concurrency=3, timeout=30.0, maxsize=4,
+                 policy=DROP_OLDEST, name="upload", max_concurrency_limit=None):
+        super().__init__(name, self._submit, maxsize, policy)
+        self.transcribe = transcribe
+        self.on_result = on_result
+        self.pool = OrderedWorkerPool(transcribe, self._deliver, max_workers=max_concurrency,
+                                      timeout=timeout, name=name, max_limit=max_concurrency_limit)
+        REGISTRY.gauge("stt_requests_in_flight", "진행 중인 STT 요청 수", func=lambda: self.pool.in_flight, stage=name)
+        REGISTRY.counter("stt_request_timeouts_total", "제한 시간을 넘겨 건너뛴 STT 요청 수",
+                         func=lambda: self.pool.timeouts, stage=name)
+        REGISTRY.counter("stt_request_failures_total", "실패한 STT 요청 수", func=lambda: self.pool.failed, stage=name)
+
+    def _submit(self, window):
+        self.pool.submit(window)
+        return None
+
+    def _deliver(self, window, text):
+        if text is not None:
+            self.on_result(window, text)
+
+    def on_stop(self):
+        self.pool.close(self.pool.timeout)
+        return None
+
+    def stats(self):
+        stats = super().stats()
+        stats.update(self.pool.stats())
+        return stats
+
+
+class STTPipeline:
+    """캡처 → 윈도우 → 인코딩 → 업로드 파이프라인
+
+    encode(window) -> window (window.payload 설정)
+    transcribe(window) -> text (최대 max_concurrency개가 동시에 호출됨)
+    on_result(window, text) 는 캡처 순서대로 한 번에 하나씩 호출됨 (업로드 작업 스레드에서)
+    name을 주면 (입력 장치가 여러 개일 때) 단계 이름이 "name/window" 처럼 구분된다.
+    max_concurrency_limit을 주면 녹음 중에 동시 요청 수를 그 값까지 늘릴 수 있다 (set_concurrency).
+    """
+
+    def __init__(self, read_chunk, buffer, lock, window_bytes, encode, transcribe, on_result,
+                 hop_bytes=None, segmenter=None, capture_queue_size=64, window_queue_size=4, encode_queue_size=4,
+                 max_concurrency=3, request_timeout=30.0, drop_policy=DROP_OLDEST, name=None,
+                 max_concurrency_limit=None):
+        self.name = name
+        prefix = f"{name}/" if name else ""
+        self.capture = CaptureStage(read_chunk, name=prefix + "capture")
+        self.window = WindowStage(buffer, lock, window_bytes, hop_bytes=hop_bytes, segmenter=segmenter,
+                                  maxsize=capture_queue_size, policy=drop_policy, name=prefix + "window")
+        self.encode = Stage(prefix + "encode", encode, maxsize=window_queue_size, policy=drop_policy)
+        self.upload = UploadStage(transcribe, on_result, max_concurrency=max_concurrency, timeout=request_timeout,
+                                  maxsize=encode_queue_size, policy=drop_policy, name=prefix + "upload",
+                                  max_concurrency_limit=max_concurrency_limit)
+
+        self.capture.downstream = self.window
+        self.window.downstream = self.encode
+        self.encode.downstream = self.upload
+        self.stages = [self.capture, self.window, self.encode, self.upload]
+
+    def start(self):
+        for stage in self.stages[1:]:
+            stage.start()
+
+    def run_capture(self, keep_running):
+        """호출한 스레드에서 캡처 루프 실행 (keep_running()이 False가 되면 반환)"""
+        self.capture.run(keep_running)
+
+    @property
+    def backlog(self):
+        """인코딩을 마치고 업로드 자리를 기다리는 윈도우 수"""
+        return self.upload.queue.depth + self.upload.pool.blocked
+
+    def set_window_seconds(self, seconds, bytes_per_second, frame_size):
+        self.window.set_window_bytes(int(seconds * bytes_per_second) // frame_size * frame_size)
+
+    def set_concurrency(self, max_concurrency):
+        return self.upload.pool.set_max_workers(max_concurrency)
+
+    def stop(self, timeout=None):
+        # 앞 단계부터 차례로 종료해서 남은 아이템이 뒤로 흘러가게 함
+        for stage in self.stages[1:]:
+            stage.stop(timeout)
+
+    def stats(self):
+        return [stage.stats() for stage in self.stages]
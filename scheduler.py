@@ -0,0 +1,184 @@
+"""적응형 윈도우/동시 요청 수 스케줄러
+
+고정된 윈도우 길이는 API가 느려지면 요청이 밀리고, 말이 빠르고 촘촘하면 첫 단어가 화면에
+뜨기까지 너무 오래 걸린다. AdaptiveScheduler는 실제로 잰 값으로 두 가지를 계속 조정한다.
+
+- 윈도우 길이 w: 말한 시점부터 표시까지의 최악 지연 ≈ w + 응답 시간(w) 이 목표 지연 안에 들도록.
+  응답 시간은 관측값으로 rtt ≈ base + slope * 오디오 길이 를 맞춰서 예측한다.
+- 동시 요청 수 c: 요청 도착률 × 평균 응답 시간 (리틀의 법칙) 만큼의 자리에 여유를 둠.
+  업로드 대기가 생기면 하나씩 늘리고, 이미 최대인데도 밀리면 윈도우를 늘려 요청 수를 줄인다.
+
+음성 비율은 윈도우를 바꿀 때 요청 도착률 예측에 쓴다 (말이 촘촘할수록 윈도우 길이를 꽉 채운
+구간이 많아서 도착률이 윈도우 길이에 반비례).
+
+    scheduler = AdaptiveScheduler(window=5.0, concurrency=3, target_latency=6.0)
+    scheduler.observe(audio_seconds, rtt_seconds)  # 요청이 끝날 때마다
+    # 결과가 올 때마다 호출 (interval 간격으로만 다시 계산)
+    if scheduler.update(backlog, requests, speech_seconds, audio_seconds):
+        pipeline.set_window_seconds(scheduler.window, ...)
+        pipeline.set_concurrency(scheduler.concurrency)
+"""
+import collections
+import math
+import threading
+import time
+
+from telemetry import REGISTRY
+
+
+class AdaptiveScheduler:
+    def __init__(self, window=5.0, concurrency=3, min_window=2.0, max_window=15.0, min_concurrency=1,
+                 max_concurrency=6, target_latency=6.0, interval=2.0, horizon=20.0, smoothing=0.2,
+                 max_step=0.25, headroom=1.25, name="upload"):
+        self.min_window = min_window
+        self.max_window = max(max_window, min_window)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max(max_concurrency, min_concurrency)
+        self.target_latency = target_latency
+        self.interval = interval  # 이 간격보다 자주 다시 계산하지 않음
+        self.horizon = horizon  # 요청 도착률/음성 비율을 잴 구간 (초)
+        self.smoothing = smoothing  # 응답 시간 지수 이동 평균 가중치
+        self.max_step = max_step  # 한 번에 바꾸는 윈도우 길이 비율 (진동 방지)
+        self.headroom = headroom
+        self.window = min(max(window, min_window), self.max_window)
+        self.concurrency = min(max(concurrency, min_concurrency), self.max_concurrency)
+
+        self._lock = threading.Lock()
+        # 응답 시간 = base + slope * 오디오 길이 (지수 가중 최소제곱용 이동 평균)
+        self._mean_x = None
+        self._mean_y = 0.0
+        self._mean_xx = 0.0
+        self._mean_xy = 0.0
+        self._samples = collections.deque()  # (시각, 누적 요청 수, 누적 음성 초, 누적 오디오 초)
+        self._last_update = None
+
+        # 통계
+        self.observations = 0
+        self.updates = 0
+        self.adjustments = 0
+        self.speech_ratio = 1.0
+        self.request_rate = 0.0
+        REGISTRY.gauge("stt_adaptive_window_seconds", "적응형 스케줄러가 고른 윈도우 길이 (초)",
+                       func=lambda: self.window, stage=name)
+        REGISTRY.gauge("stt_adaptive_concurrency", "적응형 스케줄러가 고른 동시 요청 수",
+                       func=lambda: self.concurrency, stage=name)
+        REGISTRY.gauge("stt_predicted_rtt_seconds", "현재 윈도우 길이에서 예상하는 STT 응답 시간 (초)",
+                       func=lambda: self.predict_rtt(self.window), stage=name)
+
+    def observe(self, audio_seconds, rtt_seconds):
+        """끝난 요청 하나의 오디오 길이와 응답 시간 (업로드 작업 스레드에서 호출)"""
+        a = self.smoothing
+        with self._lock:
+            if self._mean_x is None:
+                self._mean_x, self._mean_y = audio_seconds, rtt_seconds
+                self._mean_xx, self._mean_xy = audio_seconds * audio_seconds, audio_seconds * rtt_seconds
+            else:
+                self._mean_x += a * (audio_seconds - self._mean_x)
+                self._mean_y += a * (rtt_seconds - self._mean_y)
+                self._mean_xx += a * (audio_seconds * audio_seconds - self._mean_xx)
+                self._mean_xy += a * (audio_seconds * rtt_seconds - self._mean_xy)
+            self.observations += 1
+
+    def _model(self):
+        """(base, slope). 오디오 길이가 거의 같아서 기울기를 알 수 없으면 평균만 사용"""
+        if self._mean_x is None:
+            return None
+        var = self._mean_xx - self._mean_x * self._mean_x
+        slope = 0.0
+        if var > 0.25:  # 길이 차이가 0.5초 이상 섞여 있어야 기울기를 믿음
+            slope = min(max((self._mean_xy - self._mean_x * self._mean_y) / var, 0.0), 1.0)
+        base = max(self._mean_y - slope * self._mean_x, 0.0)
+        return base, slope
+
+    def predict_rtt(self, audio_seconds):
+        model = self._model()
+        if model is None:
+            return 0.0
+        base, slope = model
+        return base + slope * audio_seconds
+
+    def update(self, backlog=0, requests=None, speech_seconds=None, audio_seconds=None, now=None):
+        """관측값으로 윈도우 길이/동시 요청 수를 다시 계산. 값이 바뀌었으면 True
+
+        backlog: 업로드 자리를 기다리는 요청 수
+        requests: 지금까지 보낸 요청 수 (누적)
+        speech_seconds, audio_seconds: 지금까지 들어온 음성/전체 오디오 길이 (누적, VAD가 없으면 None)
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._last_update is not None and now - self._last_update < self.interval:
+                return False
+            self._last_update = now
+            self.updates += 1
+            self._measure(now, requests, speech_seconds, audio_seconds)
+            model = self._model()
+            if model is None:
+                return False  # 응답 시간을 아직 모름
+            base, slope = model
+
+            window = self.window
+            concurrency = self.concurrency
+            if backlog > 0 and concurrency >= self.max_concurrency:
+                # 동시 요청 수가 한계인데도 밀림: 지연 목표보다 따라잡는 것이 우선 (요청 수를 줄임)
+                target_window = window * (1 + self.max_step)
+            else:
+                # w + base + slope * w <= 목표 지연
+                target_window = (self.target_latency - base) / (1 + slope)
+            low, high = window * (1 - self.max_step), window * (1 + self.max_step)
+            new_window = min(max(target_window, low, self.min_window), high, self.max_window)
+
+            # 윈도우가 바뀌면 꽉 찬 구간 비율(≈음성 비율)만큼 요청 도착률이 윈도우 길이에 반비례해서 바뀜
+            ratio = self.speech_ratio
+            rate = self.request_rate * (ratio * window / new_window + (1 - ratio))
+            needed = math.ceil(rate * self._expected_rtt(base, slope, new_window) * self.headroom)
+            if backlog > 0:
+                needed = max(needed, concurrency + 1)
+            else:
+                needed = max(needed, concurrency - 1)  # 줄일 때는 하나씩
+            new_concurrency = min(max(needed, self.min_concurrency), self.max_concurrency)
+
+            if abs(new_window - window) < max(0.25, window * 0.05):
+                new_window = window  # 작은 흔들림은 무시
+            changed = new_window != window or new_concurrency != concurrency
+            if changed:
+                self.window = round(new_window, 2)
+                self.concurrency = new_concurrency
+                self.adjustments += 1
+        if changed:
+            print(f"[DEBUG] 적응형 스케줄러: 윈도우 {window:.2f}→{self.window:.2f}초, 동시 요청 {concurrency}→{self.concurrency} "
+                  f"(응답 {base:.2f}+{slope:.3f}×초, 대기 {backlog}, 음성 비율 {ratio:.0%}, 요청 {self.request_rate:.2f}/초)")
+        return changed
+
+    def _expected_rtt(self, base, slope, window):
+        """window 길이 요청의 예상 응답 시간 (VAD 구간은 대개 최대 길이보다 짧으므로 관측 평균 길이를 넘지 않게)"""
+        audio = min(window, max(self._mean_x, window * self.speech_ratio))
+        return base + slope * audio
+
+    def _measure(self, now, requests, speech_seconds, audio_seconds):
+        """최근 horizon초 동안의 요청 도착률과 음성 비율 (lock 안에서 호출)"""
+        self._samples.append((now, requests, speech_seconds, audio_seconds))
+        while len(self._samples) > 2 and now - self._samples[1][0] >= self.horizon:
+            self._samples.popleft()
+        first = self._samples[0]
+        elapsed = now - first[0]
+        if elapsed <= 0:
+            return
+        if requests is not None and first[1] is not None:
+            self.request_rate = (requests - first[1]) / elapsed
+        if speech_seconds is not None and first[2] is not None:
+            heard = audio_seconds - first[3]
+            if heard > 0:
+                self.speech_ratio = min(max((speech_seconds - first[2]) / heard, 0.0), 1.0)
+
+    def stats(self):
+        model = self._model() or (0.0, 0.0)
+        return {
+            "window": self.window,
+            "concurrency": self.concurrency,
+            "rtt_base": round(model[0], 3),
+            "rtt_per_second": round(model[1], 4),
+            "speech_ratio": round(self.speech_ratio, 3),
+            "request_rate": round(self.request_rate, 3),
+            "observations": self.observations,
+            "adjustments": self.adjustments,
+        }
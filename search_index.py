@@ -0,0 +1,162 @@
+"""전사 구간 전문 검색 (글자 n-gram 역색인)
+
+한국어는 조사/어미가 붙어서 공백 단위 단어로는 "예산"으로 "예산을"/"예산안"을 찾을 수 없다.
+그래서 단어마다 글자 2-gram을 색인하고, 질의의 2-gram이 모두 들어 있는 구간만 후보로 골라
+실제 부분 문자열 포함 여부로 확인한다. 구간이 추가될 때마다 그 구간만 색인하므로 세션 길이와
+관계없이 추가 비용이 일정하다.
+
+색인은 저널 옆에 (sessions/<세션>.index.json) 저장되어, 세션을 다시 열 때는 저장된 색인을 읽고
+그 이후에 저널에 추가된 구간만 새로 색인한다.
+"""
+import bisect
+import json
+import os
+import re
+import threading
+import unicodedata
+
+INDEX_VERSION = 1
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    return unicodedata.normalize("NFC", text).lower()
+
+
+def ngrams(text, n=2):
+    """정규화된 텍스트의 단어별 글자 n-gram 집합 (n보다 짧은 단어는 단어 그대로)"""
+    grams = set()
+    for word in _WORD.findall(text):
+        if len(word) <= n:
+            grams.add(word)
+        else:
+            grams.update(word[i:i + n] for i in range(len(word) - n + 1))
+    return grams
+
+
+def index_path_for(journal_path):
+    """저널 경로 옆 색인 파일 경로 (sessions/x.jsonl -> sessions/x.index.json)"""
+    return os.path.splitext(journal_path)[0] + ".index.json"
+
+
+class SearchIndex:
+    """구간 목록에 대한 n-gram 역색인 (구간 번호 = 저널에 기록된 순서)"""
+
+    def __init__(self, n=2):
+        self.n = n
+        self.segments = []  # 구간 번호 -> Segment
+        self._texts = []  # 구간 번호 -> 정규화된 텍스트 (후보 확인용)
+        self._postings = {}  # n-gram -> 구간 번호 목록 (오름차순)
+        self._lock = threading.Lock()  # 추가 (검색과 저장 중 기록은 락 없이: 목록에 덧붙이기만 하므로)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def add(self, segment):
+        """구간 하나를 색인하고 구간 번호를 반환"""
+        text = normalize(segment.text)
+        grams = ngrams(text, self.n)
+        with self._lock:
+            seg_id = len(self._texts)
+            # 검색 중인 스레드가 구간 목록/색인에만 있고 텍스트는 없는 번호를 보지 않도록 텍스트를 먼저 추가
+            self._texts.append(text)
+            self.segments.append(segment)
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings is None:
+                    self._postings[gram] = [seg_id]
+                else:
+                    postings.append(seg_id)
+        return seg_id
+
+    def search(self, query, limit=50):
+        """질의의 모든 단어를 (부분 문자열로) 포함하는 구간을 최신 순으로 [(구간 번호, Segment), ...]"""
+        words = _WORD.findall(normalize(query))
+        if not words:
+            return []
+        grams = set()
+        for word in words:
+            if len(word) >= self.n:
+                grams.update(word[i:i + self.n] for i in range(len(word) - self.n + 1))
+        # 가장 짧은 목록의 최신 구간부터 나머지 n-gram 포함 여부와 실제 문자열을 확인 (limit개면 중단)
+        # 한 글자 단어만 있으면 색인으로 좁힐 수 없어 전체를 확인
+        # (segments는 _texts 다음에 추가되므로 그 길이 안의 번호는 텍스트와 구간이 모두 있음)
+        others = []
+        candidates = range(len(self.segments))
+        if grams:
+            lists = []
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if not postings:
+                    return []
+                lists.append(postings)
+            lists.sort(key=len)
+            candidates, others = lists[0], lists[1:]
+
+        hits = []
+        for seg_id in reversed(candidates):
+            if others and not all(_contains(postings, seg_id) for postings in others):
+                continue
+            text = self._texts[seg_id]
+            if all(word in text for word in words):
+                hits.append((seg_id, self.segments[seg_id]))
+                if len(hits) >= limit:
+                    break
+        return hits
+
+    def around(self, seg_id, before=3, after=3):
+        """seg_id 앞뒤 구간 [(구간 번호, Segment), ...] (검색 결과에서 해당 시점으로 이동할 때)"""
+        start = max(seg_id - before, 0)
+        return list(enumerate(self.segments[start:seg_id + after + 1], start))
+
+    def save(self, path):
+        """색인을 파일로 저장 (임시 파일에 쓴 뒤 교체하므로 저장 중 종료돼도 이전 색인은 남음)
+
+        락 안에서는 구간 수와 n-gram 목록만 잡아 두고, 기록은 그 구간 수까지 잘라서 락 밖에서 한다
+        (목록에 덧붙이기만 하므로 저장하는 동안에도 add가 기다리지 않음).
+        """
+        tmp_path = path + ".tmp"
+        with self._lock:
+            count = len(self.segments)
+            last = self._texts[count - 1] if count else ""
+            postings = list(self._postings.items())
+        postings = {gram: ids[:bisect.bisect_left(ids, count)] for gram, ids in postings}
+        data = {"version": INDEX_VERSION, "n": self.n, "count": count, "last": last, "postings": postings}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, segments, n=2):
+        """저널에서 읽은 segments에 대해 저장된 색인을 불러오고, 그 뒤 구간만 새로 색인
+
+        색인 파일이 없거나 저널과 맞지 않으면 (버전/개수/마지막 구간이 다름) 전체를 다시 색인.
+        반환: (SearchIndex, 새로 색인한 구간 수)
+        """
+        index = cls(n)
+        data = None
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] 검색 색인을 읽지 못해 다시 만듭니다: {str(e)}")
+        count = 0
+        if data and data.get("version") == INDEX_VERSION and data.get("n") == n:
+            count = data["count"]
+            if count > len(segments) or (count and normalize(segments[count - 1].text) != data["last"]):
+                print("[DEBUG] 검색 색인이 저널과 맞지 않아 다시 만듭니다")
+                count = 0
+        if count:
+            index._postings = data["postings"]
+            index._texts = [normalize(segment.text) for segment in segments[:count]]
+            index.segments = list(segments[:count])
+        for segment in segments[count:]:
+            index.add(segment)
+        return index, len(segments) - count
+
+
+def _contains(sorted_ids, seg_id):
+    i = bisect.bisect_left(sorted_ids, seg_id)
+    return i < len(sorted_ids) and sorted_ids[i] == seg_id
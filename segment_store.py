@@ -0,0 +1,235 @@
+"""STT 결과 구간 저장소
+
+전체 텍스트를 문자열 하나로 계속 이어 붙이는 대신 구간(Segment) 단위로 보관한다.
+- 최근 M줄 히스토리는 추가할 때마다 한 줄씩만 갱신 (AI 요청 문맥은 context.RollingContext가 관리)
+- 모든 구간은 JSONL 저널 파일에 추가 전용으로 기록되고, 백그라운드 스레드가 주기적으로 flush
+  (프로그램이 비정상 종료돼도 마지막 flush 이전 내용은 남음)
+- 모든 구간은 검색 색인(search_index.SearchIndex)에도 추가되고, 색인은 닫을 때와 index_save_interval초마다
+  한 번 저널 스레드가 저널 옆에 저장 (같은 저널로 다시 열면 저장된 색인을 읽고 그 뒤 구간만 새로 색인하므로
+  비정상 종료 시 잃는 것은 마지막 저장 이후 구간의 색인 시간뿐)
+"""
+import collections
+import datetime
+import json
+import os
+import queue
+import threading
+import time
+
+from search_index import SearchIndex, index_path_for
+
+
+class Segment:
+    """인식된 텍스트 구간 하나 (시각은 epoch 초)"""
+    __slots__ = ("start", "end", "text", "source", "gap")
+
+    def __init__(self, start, end, text, source="loopback", gap=False):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.source = source
+        self.gap = gap  # 이 구간 앞에서 인식 오류가 반복됐는지 (저장 시 줄바꿈으로 표시)
+
+    def to_dict(self):
+        return {"start": round(self.start, 3), "end": round(self.end, 3), "text": self.text,
+                "source": self.source, "gap": self.gap}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["start"], data["end"], data["text"], data.get("source", "loopback"), data.get("gap", False))
+
+
+class SegmentJournal:
+    """JSONL 추가 전용 저널 (쓰기는 백그라운드 스레드에서 모아서 처리, 그 스레드에서 다른 작업도 실행 가능)"""
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._last_sync = 0.0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="segment-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, segment):
+        if not self._closed:
+            self._queue.put(json.dumps(segment.to_dict(), ensure_ascii=False))
+
+    def submit(self, task):
+        """앞서 추가된 구간을 기록한 뒤 저널 스레드에서 task() 실행 (색인 저장처럼 느린 파일 작업용)"""
+        if not self._closed:
+            self._queue.put(task)
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            # 쌓여 있는 줄을 한 번에 모아서 기록
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = None in items
+            lines = []
+            for item in items:
+                if callable(item):
+                    self._write(lines)
+                    lines = []
+                    self._run_task(item)
+                elif item is not None:
+                    lines.append(item)
+            self._write(lines, force_sync=done)
+            if done:
+                return
+
+    def _run_task(self, task):
+        try:
+            task()
+        except Exception as e:
+            print(f"[ERROR] 저널 스레드 작업 오류: {str(e)}")
+
+    def _write(self, lines, force_sync=False):
+        try:
+            if lines:
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+                self.written += len(lines)
+            # 디스크 동기화는 flush_interval마다 한 번만 (요청이 몰려도 fsync가 밀리지 않게)
+            now = time.monotonic()
+            if force_sync or now - self._last_sync >= self.flush_interval:
+                os.fsync(self._file.fileno())
+                self._last_sync = now
+        except Exception as e:
+            print(f"[ERROR] 저널 기록 오류: {str(e)}")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+    @staticmethod
+    def load(path):
+        """저널 파일에서 구간 목록 복원 (마지막 줄이 잘려 있으면 무시)"""
+        segments = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    segments.append(Segment.from_dict(json.loads(line)))
+                except (ValueError, KeyError):
+                    continue
+        return segments
+
+
+class SegmentStore:
+    """구간 목록 + 최근 히스토리 + 저널"""
+
+    def __init__(self, history_lines=20, journal_path=None, show_source=False, index_save_interval=300.0):
+        self.show_source = show_source  # 여러 입력 소스를 합칠 때 줄마다 소스 이름 표시
+        self.segments = []
+        self.recent_lines = collections.deque(maxlen=history_lines)  # "[HH:MM:SS] 텍스트"
+        self._saved = 0  # save_text로 이미 저장한 구간 수
+        self._lock = threading.Lock()  # 소스별 결과 스레드가 동시에 append할 수 있음
+
+        # 검색 색인은 clear()와 관계없이 저널 전체(이전 실행에서 기록된 구간 포함)를 대상으로 함
+        self.index_path = index_path_for(journal_path) if journal_path else None
+        # 색인 저장은 전체 색인을 다시 쓰므로 (4시간 세션에서 수십 ms) 구간 수가 아니라 시간 간격으로 제한
+        # (None이면 닫을 때와 save_index를 부를 때만 저장)
+        self.index_save_interval = index_save_interval
+        self._index_unsaved = 0
+        self._index_saved_at = time.monotonic()
+        self._index_save_pending = False
+        self.reindexed = 0  # 열 때 새로 색인한 구간 수
+        if journal_path and os.path.exists(journal_path):
+            self.index, self.reindexed = SearchIndex.load(self.index_path, SegmentJournal.load(journal_path))
+            self._index_unsaved = self.reindexed
+        else:
+            self.index = SearchIndex()
+        self.journal = SegmentJournal(journal_path) if journal_path else None
+
+    def append(self, text, start, end, source="loopback", gap=False):
+        """구간을 추가하고 히스토리에 들어간 줄("[HH:MM:SS] 텍스트")을 반환"""
+        segment = Segment(start, end, text, source, gap)
+        with self._lock:
+            return self._append(segment)
+
+    def _append(self, segment):
+        self.segments.append(segment)
+        line = self.format_line(segment)
+        self.recent_lines.append(line)
+
+        if self.journal:
+            self.journal.append(segment)
+        self.index.add(segment)
+        self._index_unsaved += 1
+        if (self.index_path and self.index_save_interval is not None and not self._index_save_pending
+                and time.monotonic() - self._index_saved_at >= self.index_save_interval):
+            # 색인 저장은 수십 ms 걸리므로 결과 전달 스레드 대신 저널 스레드에서 (앞의 저장이 끝나기 전에는 다시 넣지 않음)
+            self._index_save_pending = True
+            self.journal.submit(self._save_index)
+        return line
+
+    def search(self, query, limit=50):
+        """저널 전체에서 질의를 포함하는 구간 (최신 순) [(구간 번호, Segment), ...]"""
+        return self.index.search(query, limit)
+
+    def around(self, seg_id, before=3, after=3):
+        """검색 결과 구간 앞뒤 구간 (해당 시점으로 이동할 때)"""
+        return self.index.around(seg_id, before, after)
+
+    def save_index(self):
+        self._save_index()
+
+    def _save_index(self):
+        with self._lock:
+            unsaved = self._index_unsaved
+        try:
+            self.index.save(self.index_path)
+        except OSError as e:
+            unsaved = 0
+            print(f"[ERROR] 검색 색인 저장 오류: {str(e)}")
+        with self._lock:
+            self._index_unsaved -= unsaved  # 저장하는 동안 추가된 구간은 다음 저장 대상
+            self._index_saved_at = time.monotonic()
+            self._index_save_pending = False
+
+    def format_line(self, segment):
+        clock = datetime.datetime.fromtimestamp(segment.end).strftime("%H:%M:%S")
+        if self.show_source:
+            return f"[{clock}] {segment.source}: {segment.text.strip()}"
+        return f"[{clock}] {segment.text.strip()}"
+
+    def save_text(self, path):
+        """아직 저장하지 않은 구간만 텍스트 파일 끝에 추가 (세션 첫 저장은 새로 씀)
+
+        소스가 여러 개면 구간 시작 시각 순서로 "[시각] 소스: 텍스트" 줄 단위로 저장.
+        """
+        mode = "a" if self._saved else "w"
+        new_segments = self.segments[self._saved:]
+        with open(path, mode, encoding="utf-8") as f:
+            if self.show_source:
+                f.write("".join(self.format_line(s) + "\n" for s in sorted(new_segments, key=lambda s: s.start)))
+            else:
+                f.write("".join(("\n" if s.gap else "") + s.text + " " for s in new_segments))
+        self._saved = len(self.segments)
+        return len(new_segments)
+
+    def clear(self):
+        """화면/문맥용 상태 초기화 (저널은 그대로 이어서 기록)"""
+        with self._lock:
+            self.segments = []
+            self.recent_lines.clear()
+            self._saved = 0
+
+    def close(self):
+        if self.journal:
+            self.journal.close()
+        if self.index_path and self._index_unsaved:
+            self.save_index()
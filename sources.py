@@ -0,0 +1,98 @@
+"""입력 장치(소스)별 캡처 상태
+
+소스마다 자기 캡처(별도 프로세스 또는 스트림), 링 버퍼, VAD, 이어 붙이기 상태, STT 파이프라인을 가진다.
+여러 소스(스피커 출력 + 마이크, 가상 케이블 여러 개 등)를 동시에 녹음할 때 서로 영향을 주지 않고,
+결과는 소스 이름이 붙은 채로 하나의 구간 저장소에 합쳐진다.
+"""
+import queue
+import threading
+
+from audio_buffer import PCMRingBuffer
+from capture_process import CaptureProcess
+from telemetry import REGISTRY
+
+_PA_INPUT_OVERFLOW = 0x2  # 콜백 status 플래그 pyaudio.paInputOverflow
+
+
+class SourceLane:
+    def __init__(self, name, device=None, rate=None, channels=2, chunk=1024, buffer_seconds=11):
+        self.name = name
+        self.device = device  # devices.DeviceInfo (가짜 소스면 None)
+        if rate is None:
+            # 장치의 기본 샘플레이트로 열어야 변환/열기 오류가 없음 (가짜 소스는 44.1kHz)
+            rate = device.rate if device is not None else 44100
+        self.rate = rate
+        self.channels = min(channels, device.channels) if device is not None else channels
+        self.chunk = chunk
+        self.sample_width = 2  # paInt16
+        self.bytes_per_second = rate * self.channels * self.sample_width
+        self.buffer = PCMRingBuffer(int(rate * buffer_seconds), frame_size=self.channels * self.sample_width)
+        self.lock = threading.Lock()
+
+        self.capture = None  # CaptureProcess (별도 프로세스 캡처)
+        self.stream = None  # 이 프로세스에서 직접 여는 PyAudio 스트림 (콜백 모드)
+        self._chunks = queue.Queue()  # 콜백이 받은 청크 → _read_stream
+        self._pa = None
+        self.pipeline = None
+        self.segmenter = None
+        self.stitcher = None
+        self.scheduler = None  # scheduler.AdaptiveScheduler (적응형 윈도우를 쓸 때)
+        self.provisional = ""  # 스트리밍 모드의 아직 확정되지 않은 텍스트
+        self.overflows = REGISTRY.counter("stt_audio_overflows_total", "입력 오버플로로 오디오가 유실된 횟수",
+                                          source=name)
+
+    @property
+    def device_index(self):
+        return self.device.index if self.device is not None else None
+
+    def open(self, in_process=True, source="pyaudio", ring_seconds=5, wav_path=None):
+        """캡처 시작, read_chunk 함수 반환 (wav_path: 가짜 소스에서 재생할 WAV)"""
+        if in_process:
+            self.capture = CaptureProcess(device_index=self.device_index, rate=self.rate, channels=self.channels,
+                                          frames_per_buffer=self.chunk, ring_seconds=ring_seconds, source=source,
+                                          wav_path=wav_path, name=self.name).start()
+            return self.capture.read
+
+        import pyaudio
+        self._pa = pyaudio.PyAudio()
+        self.stream = self._pa.open(format=pyaudio.paInt16, channels=self.channels, rate=self.rate, input=True,
+                                    input_device_index=self.device_index, frames_per_buffer=self.chunk,
+                                    stream_callback=self._on_audio)
+        self.stream.start_stream()
+        return self._read_stream
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PortAudio 콜백: 받은 청크는 그대로 넘기고, 장치 쪽 오버플로는 status 플래그로 셈
+
+        (블로킹 read의 오버플로 예외는 이미 받은 청크까지 버리므로 쓰지 않음)
+        """
+        if status & _PA_INPUT_OVERFLOW:
+            self.overflows.inc()
+            print(f"[DEBUG] '{self.name}' 오디오 입력 오버플로 (장치에서 유실된 오디오 있음)")
+        self._chunks.put(in_data)
+        return (None, 0)  # paContinue
+
+    def _read_stream(self, timeout=0.1):
+        """콜백이 받은 청크 하나 (timeout 동안 없으면 b"")"""
+        try:
+            return self._chunks.get(timeout=timeout)
+        except queue.Empty:
+            return b""
+
+    def stop_capture(self):
+        if self.capture is not None:
+            self.capture.stop()
+            print(f"[DEBUG] '{self.name}' 캡처 프로세스: {self.capture.stats()}")
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+
+    def release(self):
+        """파이프라인이 공유 메모리를 다 쓴 뒤에 호출"""
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
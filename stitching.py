@@ -0,0 +1,120 @@
+"""겹치는 윈도우의 STT 결과를 하나의 텍스트로 이어 붙이기
+
+스트리밍 모드에서는 짧은 간격(hop)마다 더 긴 구간(window)을 다시 인식하므로 연속된
+결과가 서로 겹친다. 이미 확정된 텍스트의 끝과 새 결과의 앞부분을 단어 단위로 맞춰서
+중복을 제거하고, 새로 추가된 부분만 돌려준다.
+
+전략:
+    "none"      - 겹침 처리 없이 결과를 그대로 추가 (겹치지 않는 윈도우용)
+    "overlap"   - 중복 제거 후 새 부분을 바로 확정
+    "agreement" - 연속된 두 결과(이전 결과와 새 결과)가 겹치는 부분까지 확정하고 나머지는 임시 텍스트로 둠
+                  (윈도우에서 밀려난 이전 결과의 앞부분도 확정)
+"""
+import re
+
+STRATEGIES = ("none", "overlap", "agreement")
+
+_PUNCTUATION = re.compile(r"[^\w]+")
+
+
+def _normalize(word):
+    return _PUNCTUATION.sub("", word).lower()
+
+
+def align(history, words, min_overlap=2):
+    """history 끝까지 이어지는 words와의 가장 긴 공통 구간 (history 위치, words 위치, 길이)
+
+    Whisper는 윈도우 경계의 단어를 빠뜨리거나 덧붙이기도 하므로 정확한 접미사/접두사
+    일치 대신, history 끝(허용 오차 1단어)까지 닿는 가장 긴 공통 구간을 찾는다.
+    겹침이 없으면 (0, 0, 0).
+    """
+    if not history or not words:
+        return 0, 0, 0
+    hist = [_normalize(w) for w in history]
+    new = [_normalize(w) for w in words]
+    best = (0, 0, 0)
+    # history의 각 위치 i에서 끝까지와 new의 j부터를 비교
+    for i in range(len(hist)):
+        for j in range(len(new)):
+            k = 0
+            while i + k < len(hist) and j + k < len(new) and hist[i + k] == new[j + k]:
+                k += 1
+            if k > best[2] and i + k >= len(hist) - 1:
+                best = (i, j, k)
+    if best[2] < min(min_overlap, len(hist)):
+        return 0, 0, 0
+    return best
+
+
+def find_overlap(history, words, min_overlap=2):
+    """history 끝부분과 겹치는 words의 앞부분 길이를 반환 (겹침이 없으면 0)"""
+    _, j, k = align(history, words, min_overlap)
+    return j + k
+
+
+class TranscriptStitcher:
+    """겹치는 STT 결과를 이어 붙이는 상태 객체 (결과는 캡처 순서대로 넣어야 함)"""
+
+    def __init__(self, strategy="agreement", min_overlap=2, lookback_words=40):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"알 수 없는 이어 붙이기 전략: {strategy} (가능: {', '.join(STRATEGIES)})")
+        self.strategy = strategy
+        self.min_overlap = min_overlap
+        self.lookback_words = lookback_words
+        self._committed = []  # 확정된 단어 (최근 lookback_words개만 유지)
+        self._provisional = []  # 아직 확정되지 않은 단어
+        self._hypothesis = []  # 직전 결과 전체 (agreement)
+        self._hypothesis_done = 0  # _hypothesis 중 앞에서부터 확정된 단어 수
+
+    @property
+    def provisional(self):
+        return " ".join(self._provisional)
+
+    def add(self, text):
+        """새 STT 결과를 넣고 (새로 확정된 텍스트, 임시 텍스트)를 반환"""
+        words = text.split()
+        if self.strategy == "none":
+            self._commit(words)
+            return " ".join(words), ""
+
+        if self.strategy == "overlap":
+            # 이미 확정된 부분 제거
+            novel = words[find_overlap(self._committed, words, self.min_overlap):]
+            self._commit(novel)
+            return " ".join(novel), ""
+
+        # agreement: 직전 결과와 새 결과를 맞춰서 두 결과가 함께 본 부분까지 확정
+        previous, done = self._hypothesis, self._hypothesis_done
+        i, j, k = align(previous, words, self.min_overlap)
+        if k:
+            # 직전 결과의 겹침 앞부분(윈도우에서 밀려남) + 겹치는 부분 중 아직 확정하지 않은 단어
+            committed = previous[done:i] + words[j + max(done - i, 0):j + k]
+            self._commit(committed)
+            done = min(j + max(k, done - i), len(words))
+        else:
+            # 겹침이 없으면 직전 결과의 남은 부분은 다시 볼 수 없으므로 확정
+            committed = previous[done:]
+            self._commit(committed)
+            done = find_overlap(self._committed, words, self.min_overlap)
+        self._hypothesis, self._hypothesis_done = words, done
+        self._provisional = words[done:]
+        return " ".join(committed), self.provisional
+
+    def flush(self):
+        """남은 임시 텍스트를 확정 (스트림 종료 시)"""
+        words = self._provisional
+        self._provisional = []
+        self._hypothesis_done = len(self._hypothesis)
+        self._commit(words)
+        return " ".join(words)
+
+    def reset(self):
+        self._committed = []
+        self._provisional = []
+        self._hypothesis = []
+        self._hypothesis_done = 0
+
+    def _commit(self, words):
+        if words:
+            self._committed.extend(words)
+            del self._committed[:-self.lookback_words]
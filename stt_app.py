@@ -1,17 +1,35 @@
-import pyaudio
-import wave
-import speech_recognition as sr
+import time
 import threading
+import multiprocessing
 import tkinter as tk
-from tkinter import ttk, scrolledtext
-import os
+from tkinter import ttk, scrolledtext, filedialog
 import datetime
-from openai import OpenAI
-import time
-import queue
-import collections
-import pynput
-from pynput import mouse
+import os
+from devices import LOOPBACK_PATTERN, find_device, list_input_devices
+from sources import SourceLane
+from scheduler import AdaptiveScheduler
+from pipeline import STTPipeline, DROP_OLDEST
+from audio_encoding import EncodingConfig, encode_pcm
+from vad import VADConfig, SpeechSegmenter
+from stitching import TranscriptStitcher
+from api_client import get_client
+from backends import OpenAIBackend
+from segment_store import SegmentStore
+from context import RollingContext
+from triggers import TriggerEngine, ResponseCache
+from chat_requests import ChatRequestManager, RequestCancelled
+from ui_dispatcher import UIDispatcher, append_line, replace_tagged
+from telemetry import REGISTRY, MetricsServer, TraceWriter, enable_leveled_logging, set_trace, trace
+from warmup import Warmup
+
+_STARTED = time.perf_counter()  # 시작 시간 측정 기준 (창 표시/첫 전사까지, 모듈 로드가 끝난 시점)
+
+EMPTY_RESULTS = REGISTRY.counter("stt_empty_results_total", "빈 텍스트로 돌아온 STT 결과 수")
+NOISE_FILTERED = REGISTRY.counter("stt_noise_filtered_total", "노이즈 문구로 걸러낸 STT 결과 수")
+END_TO_END_SECONDS = REGISTRY.histogram("stt_end_to_end_seconds", "윈도우를 자른 시점부터 화면 반영까지 (초)")
+STARTUP_SECONDS = REGISTRY.gauge("stt_startup_seconds", "프로그램 시작부터 창이 보일 때까지 (초)")
+FIRST_TRANSCRIPT_SECONDS = REGISTRY.histogram("stt_first_transcript_seconds",
+                                              "녹음 시작부터 첫 전사 표시까지 (초, 첫 구간 길이 포함)")
 
 class AudioSTTApp:
     def __init__(self, root):
@@ -19,36 +37,128 @@ class AudioSTTApp:
         self.root.title("STT 변환기")
         self.root.geometry("800x600")  # 창 크기 확대
         
+        # 계측: 로컬 지표 엔드포인트 (http://127.0.0.1:9464/metrics, None이면 끔), 이벤트 트레이스 (.jsonl/.csv)
+        self.METRICS_PORT = 9464
+        self.TRACE_PATH = None  # 예: "sessions/trace.jsonl"
+        self.LOG_LEVEL = None  # "INFO"/"DEBUG" 등으로 지정하면 print 로그 대신 레벨 로깅 (INFO면 [DEBUG] 로그 생략)
+        self._setup_telemetry()
+        
         # STT 처리 간격 설정 (초)
-        self.RECORD_SECONDS = 5  # 5초마다 처리
+        self.RECORD_SECONDS = 5  # 5초마다 처리 (적응형 스케줄러를 쓰면 시작 값)
+        # 적응형 스케줄러: 측정한 Whisper 응답 시간, 업로드 대기 수, 음성 비율로 녹음 중에
+        # 윈도우 길이(VAD 모드에서는 구간 최대 길이)와 동시 요청 수를 범위 안에서 조정
+        self.ADAPTIVE = True
+        self.ADAPTIVE_WINDOW_SECONDS = (2.0, 15.0)
+        self.ADAPTIVE_CONCURRENCY = (2, 6)  # 하나면 느린 응답 하나에 뒤가 모두 막힘
+        self.TARGET_LATENCY_SECONDS = 6.0  # 말한 시점부터 표시까지 목표 (윈도우 길이 + 응답 시간)
         
         self.is_recording = False
-        self.transcript = ""
-        self.recent_transcript = ""  # 최근 텍스트 (마지막 300자)를 저장하는 변수
-        self.recent_history = []  # 마지막 300자 텍스트 히스토리를 저장하는 리스트 (ChatGPT에 전송되는 내용)
+        self.recent_transcript = ""  # ChatGPT에 전송되는 문맥 (이전 요약 + 최근 발언, 아래 self.context가 미리 만들어 둠)
+        # 인식 결과 구간 저장소 (최근 20줄 히스토리, sessions/ 아래 JSONL 저널)
+        self.session_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.segment_store = SegmentStore(history_lines=20,
+                                          journal_path=os.path.join("sessions", f"{self.session_id}.jsonl"))
+        self.SEARCH_LIMIT = 50  # 검색 결과 최대 개수 (최신 순)
         self.error_count = 0  # 오류 발생 횟수를 추적하는 변수 추가
+        self._transcript_lock = threading.Lock()  # update_transcript (소스별 결과 스레드에서 동시에 호출됨)
         
         # 오디오 스트리밍을 위한 변수들
-        self.audio_queue = queue.Queue()
-        self.audio_buffer = collections.deque(maxlen=44100*2*2*self.RECORD_SECONDS)  # 설정된 시간만큼 버퍼 (44.1kHz, 16bit, 2ch)
-        self.recording_lock = threading.Lock()
+        # 음성 구간 검출(VAD): 무음은 STT로 보내지 않고, 말이 끊기는 지점에서 구간을 자름
+        self.USE_VAD = True
+        self.VAD = VADConfig(min_segment_seconds=1.0, max_segment_seconds=self.RECORD_SECONDS * 2)
+        
+        # 스트리밍 모드: STREAM_HOP_SECONDS마다 최근 STREAM_WINDOW_SECONDS를 겹치게 인식하고 결과를 이어 붙임
+        self.STREAMING = False
+        self.STREAM_HOP_SECONDS = 1.5
+        self.STREAM_WINDOW_SECONDS = 6
+        self.STITCH_STRATEGY = "agreement"  # none / overlap / agreement (stitching.py 참고)
+        self.provisional_text = ""  # 아직 확정되지 않은 스트리밍 텍스트 (소스별 임시 텍스트를 합친 것)
+        self._shown_provisional = ""  # 화면에 표시 중인 임시 텍스트 (메인 스레드 전용)
+        
+        # 입력 소스: (이름, 장치 번호/이름/정규식 패턴). 여러 개면 동시에 녹음하고 결과에 이름을 붙임
+        # 예: [("스피커", LOOPBACK_PATTERN), ("마이크", "마이크|Microphone")]
+        self.CAPTURE_SOURCES = [("loopback", LOOPBACK_PATTERN)]
+        # 소스별로 가장 긴 구간(+앞뒤 여유)이 들어갈 만큼 버퍼 (44.1kHz, 16bit)
+        self.BUFFER_SECONDS = max(self.RECORD_SECONDS, self.VAD.max_segment_seconds, self.STREAM_WINDOW_SECONDS,
+                                  self.ADAPTIVE_WINDOW_SECONDS[1] if self.ADAPTIVE else 0) + 1
+        self.lanes = []  # 소스별 캡처 → 윈도우 → 인코딩 → 업로드 파이프라인 (녹음 중에만 존재)
+        self.PIPELINE_DROP_POLICY = DROP_OLDEST  # 단계 큐가 가득 찼을 때의 동작 (drop_oldest / drop_newest / block)
+        self.STT_MAX_CONCURRENCY = 3  # 동시에 진행할 Whisper 요청 수 (결과는 캡처 순서대로 반영)
+        self.STT_TIMEOUT_SECONDS = 30  # 요청별 제한 시간 (초과 시 해당 구간은 건너뜀)
+        self.CAPTURE_IN_PROCESS = True  # 별도 프로세스에서 콜백 모드로 캡처 (False면 이 프로세스에서 콜백 모드 스트림을 직접 엶)
+        self.CAPTURE_SOURCE = "pyaudio"  # "fake"면 사운드 장치 없이 테스트용 사인파
+        self.CAPTURE_WAV_PATH = None  # 가짜 소스에서 사인파 대신 반복 재생할 WAV (44.1kHz 스테레오 16bit)
+        self.CAPTURE_RING_SECONDS = 5  # 캡처 프로세스와 공유하는 링 버퍼 길이
+        self.ENCODING = EncodingConfig(sample_rate=16000, channels=1, container="wav")  # 업로드 포맷 ("flac"/"ogg"는 soundfile 필요)
         
         # ChatGPT 관련 변수
         self.chatgpt_api_key = ""
         self.chatgpt_prompt = "발언: "
         self.chatgpt_response = ""
         
+        # 문맥: 최근 발언은 그대로, 오래된 발언은 백그라운드에서 요약 (세션이 길어져도 토큰 수 일정)
+        self.CONTEXT_TOKEN_BUDGET = 600
+        self.CONTEXT_TAIL_TOKENS = 300  # 최근 발언 (한글 약 300자)
+        self.SUMMARY_MODEL = "gpt-4.1-mini"
+        self.context = RollingContext(self._summarize_context, token_budget=self.CONTEXT_TOKEN_BUDGET,
+                                      tail_tokens=self.CONTEXT_TAIL_TOKENS, summary_tokens=200)
+        
+        self.CHAT_STREAMING = True  # 응답 토큰을 도착하는 대로 표시
+        self.chat_requests = ChatRequestManager()  # 한 번에 하나만 진행, 새 요청이 오면 이전 요청 취소
+        
+        # AI 요청 트리거: 마우스 이동 / 단축키 / 말 끝남을 디바운스하고 합쳐서 한 번만 요청
+        self.TRIGGER_DEBOUNCE_SECONDS = 0.3  # 마지막 트리거 후 이만큼 조용하면 요청
+        self.TRIGGER_MIN_INTERVAL_SECONDS = 2.0  # 요청 사이 최소 간격
+        self.TRIGGER_HOTKEY = "<ctrl>+<alt>+a"
+        self.TRIGGER_ON_SPEECH_END = False  # VAD 구간이 끝날 때마다 자동 요청
+        self.triggers = TriggerEngine(self._on_trigger, self.TRIGGER_DEBOUNCE_SECONDS, self.TRIGGER_MIN_INTERVAL_SECONDS)
+        self.response_cache = ResponseCache(max_entries=64, ttl=300)  # 같은 문맥이면 API 호출 없이 바로 응답
+        
         # 마우스 움직임 감지 관련 변수
-        self.isGPT = False  # ChatGPT 호출 플래그
         self.last_mouse_pos = None  # 마지막 마우스 위치
         self.mouse_listener = None  # 마우스 리스너
+        self.hotkey_listener = None  # 단축키 리스너
+        self._listener_lock = threading.Lock()  # 준비 스레드의 리스너 시작과 on_close의 중지가 엇갈리지 않게
+        
+        # 창을 먼저 띄우고 무거운 준비(pynput/pyaudio/openai 로드, 장치 조회, API 연결)는 백그라운드에서
+        self.warmup = Warmup()
+        self.closed = False
+        self._record_started_at = None  # 첫 전사 시간 측정용
         
         # UI 구성
         self.create_widgets()
-        
-        # 마우스 움직임 감지 시작
-        self.start_mouse_listener()
-        
+        self._cache_api_key()
+        
+        # 워커 스레드의 UI 업데이트는 모두 dispatcher를 거쳐 메인 루프에서 몰아서 처리
+        self.ui = UIDispatcher(self.root, max_fps=30)
+        self.ui.register("status", lambda message: self.status_label.config(text=message), coalesce=True)
+        self.ui.register("record_button", lambda label: self.record_button.config(text=label), coalesce=True)
+        self.ui.register("transcript_line", self._ui_append_transcript_line)
+        self.ui.register("provisional", self._ui_set_provisional, coalesce=True)
+        self.ui.register("sent_text", self._update_sent_text, coalesce=True)
+        self.ui.register("response", self._update_chatgpt_response_area, coalesce=True)
+        self.ui.register("response_append", self._append_chatgpt_response)
+        self.ui.start()
+        
+        self.triggers.start()
+        self.root.after_idle(self._on_window_shown)
+        
+        # 창을 닫을 때 저널 기록 마무리
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    def _setup_telemetry(self):
+        if self.LOG_LEVEL:
+            enable_leveled_logging(self.LOG_LEVEL)
+        self.metrics_server = None
+        if self.METRICS_PORT:
+            try:
+                self.metrics_server = MetricsServer(port=self.METRICS_PORT).start()
+                print(f"[DEBUG] 지표 엔드포인트: {self.metrics_server.url}")
+            except OSError as e:
+                print(f"[ERROR] 지표 서버 시작 실패 (포트 {self.METRICS_PORT}): {str(e)}")
+        if self.TRACE_PATH:
+            set_trace(TraceWriter(self.TRACE_PATH))
+    
     def create_widgets(self):
         # 메인 프레임
         main_frame = ttk.Frame(self.root, padding="10")
@@ -87,8 +197,31 @@ class AudioSTTApp:
         self.api_key_entry = ttk.Entry(api_frame, width=50, show="*")
         self.api_key_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
         
-        # 기본 API 키 값 설정
-        self.api_key_entry.insert(0, "")
+        # 기본 API 키 값 설정 (환경 변수가 있으면 사용)
+        self.api_key_entry.insert(0, os.environ.get("OPENAI_API_KEY", ""))
+        self.api_key_entry.bind("<KeyRelease>", self._cache_api_key)
+        self.api_key_entry.bind("<FocusOut>", self._prewarm_api)
+        self.api_key_entry.bind("<Return>", self._prewarm_api)
+        
+        # 검색 프레임 (세션 전체 전사에서 검색, 결과를 고르면 그 시점 앞뒤 구간 표시)
+        search_frame = ttk.Frame(main_frame)
+        search_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(search_frame, text="검색:").pack(side=tk.LEFT, padx=5)
+        self.search_entry = ttk.Entry(search_frame, width=30)
+        self.search_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        self.search_entry.bind("<KeyRelease>", self.run_search)  # 색인 검색이라 입력할 때마다 실행
+        self.search_count_label = ttk.Label(search_frame, text="")
+        self.search_count_label.pack(side=tk.LEFT, padx=5)
+        self.open_session_button = ttk.Button(search_frame, text="세션 열기", command=self.open_session)
+        self.open_session_button.pack(side=tk.RIGHT, padx=5)
+        
+        # 검색 결과 목록과 선택한 결과의 앞뒤 구간 (검색어가 있을 때만 표시)
+        self.search_results = tk.Listbox(main_frame, height=4, font=("맑은 고딕", 9))
+        self.search_results.bind("<<ListboxSelect>>", self.show_search_context)
+        self.search_context_area = scrolledtext.ScrolledText(main_frame, wrap=tk.WORD, font=("맑은 고딕", 9), height=4)
+        self.search_context_area.tag_configure("hit", background="#fff2a8")
+        self._search_frame = search_frame
+        self._search_hits = []  # 결과 목록 순서대로 구간 번호
         
         # 컨텐츠 프레임 (텍스트 영역들을 담을 프레임)
         content_frame = ttk.Frame(main_frame)
@@ -107,6 +240,7 @@ class AudioSTTApp:
         # 전체 텍스트 영역 (시간대별 정리)
         self.recent_text_area = scrolledtext.ScrolledText(content_frame, wrap=tk.WORD, font=("맑은 고딕", 10), height=5)
         self.recent_text_area.pack(fill=tk.X, padx=5, pady=(0, 10))
+        self.recent_text_area.tag_configure("provisional", foreground="gray")
         
         # ChatGPT 전송 텍스트 확인 레이블
         ttk.Label(content_frame, text="AI에게 전송된 텍스트:").pack(anchor=tk.W, padx=5, pady=(0, 5))
@@ -125,8 +259,32 @@ class AudioSTTApp:
         # 디바이스 정보 표시
         # self.show_available_devices()
     
+    def _on_window_shown(self):
+        """창이 처음 그려진 뒤: 시작 시간 기록 후 백그라운드 준비 작업 시작"""
+        startup = time.perf_counter() - _STARTED
+        STARTUP_SECONDS.set(startup)
+        print(f"[DEBUG] 창 표시까지 {startup * 1000:.0f}ms")
+        self.warmup.submit("input_listeners", self.start_mouse_listener)  # pynput 로드
+        if self.CAPTURE_SOURCE != "fake":
+            # pyaudio 로드 + 장치 목록 조회 (캐시되어 녹음 시작 시 다시 조회하지 않음)
+            self.warmup.submit("devices", lambda: [find_device(spec) for _, spec in self.CAPTURE_SOURCES])
+        self._prewarm_api()
+    
+    def _cache_api_key(self, event=None):
+        """입력란의 API 키를 속성에 복사 (메인 스레드, 다른 스레드는 Entry 대신 self.api_key를 읽음)"""
+        self.api_key = self.api_key_entry.get().strip()
+    
+    def _prewarm_api(self, event=None):
+        """입력된 API 키로 공유 클라이언트를 미리 만들고 연결을 맺어 둠 (키 입력란을 벗어날 때도 호출)"""
+        self._cache_api_key()
+        api_key = self.api_key
+        if api_key:
+            self.warmup.submit(f"api_client_{api_key[-4:]}", lambda: get_client(api_key).warm_up())
+    
     def start_mouse_listener(self):
-        """마우스 움직임 감지 시작"""
+        """마우스 움직임 감지 시작 (백그라운드 준비 스레드에서 호출)"""
+        import pynput  # 로드가 무거워서 창을 띄운 뒤에 로드
+        
         def on_move(x, y):
             if self.last_mouse_pos is None:
                 self.last_mouse_pos = (x, y)
@@ -137,33 +295,90 @@ class AudioSTTApp:
             dy = abs(y - self.last_mouse_pos[1])
             
             if dx > 10 or dy > 10:  # 10픽셀 이상 움직였을 때만 감지
-                if not self.isGPT and self.recent_transcript.strip() and self.is_recording:  # 녹음 중이고, GPT 호출 중이 아니고, 텍스트가 있을 때만
-                    print(f"[DEBUG] 마우스 움직임 감지! 위치: ({x}, {y})")
-                    print(f"[DEBUG] 즉시 ChatGPT API 호출 - 현재 텍스트: '{self.recent_transcript}'")
-                    self.isGPT = True
-                    self.update_status("마우스 감지됨 - AI 답변 요청 중...")
-                    
-                    # API 키 가져오기
-                    api_key = self.api_key_entry.get().strip()
-                    if api_key:
-                        # 즉시 ChatGPT API 호출
-                        threading.Thread(target=self._call_chatgpt_api, args=(api_key, self.recent_transcript), daemon=True).start()
-                    else:
-                        print("[ERROR] API 키가 없어서 ChatGPT 호출 불가")
-                        self.isGPT = False
-                
+                # 콜백은 초당 수백 번 불리므로 트리거만 기록 (판단은 트리거 스레드에서)
+                self.triggers.fire("mouse")
                 self.last_mouse_pos = (x, y)
         
-        # 마우스 리스너 시작
-        self.mouse_listener = mouse.Listener(on_move=on_move)
-        self.mouse_listener.start()
-        print("[DEBUG] 마우스 움직임 감지 시작됨")
+        with self._listener_lock:
+            if self.closed:  # 로드하는 동안 창이 닫힘
+                return
+            
+            # 마우스 리스너 시작
+            self.mouse_listener = pynput.mouse.Listener(on_move=on_move)
+            self.mouse_listener.start()
+            print("[DEBUG] 마우스 움직임 감지 시작됨")
+            
+            # 단축키 트리거 (다른 창이 활성화되어 있어도 동작)
+            try:
+                self.hotkey_listener = pynput.keyboard.GlobalHotKeys({self.TRIGGER_HOTKEY: lambda: self.triggers.fire("hotkey")})
+                self.hotkey_listener.start()
+                print(f"[DEBUG] 단축키 트리거 등록됨: {self.TRIGGER_HOTKEY}")
+            except Exception as e:
+                print(f"[ERROR] 단축키 등록 실패: {str(e)}")
+    
+    def _on_trigger(self, sources):
+        """합쳐진 트리거 처리 (트리거 스레드)"""
+        text = self.recent_transcript
+        # 녹음 중이고, 텍스트가 있을 때만
+        if not text.strip() or not self.is_recording:
+            return
+        
+        # API 키 가져오기 (Entry는 메인 스레드에서만 읽고, 여기서는 복사해 둔 값을 사용)
+        api_key = self.api_key
+        if not api_key:
+            print("[ERROR] API 키가 없어서 ChatGPT 호출 불가")
+            return
+        
+        print(f"[DEBUG] 트리거 감지! ({', '.join(sorted(sources))})")
+        self._request_ai_response(text, api_key)
+    
+    def _request_ai_response(self, text, api_key):
+        """캐시에 있으면 바로 표시, 같은 텍스트로 요청 중이면 무시, 아니면 새 요청 (이전 요청은 취소)"""
+        cached = self.response_cache.get(self._build_prompt(text))
+        if cached is not None:
+            print(f"[DEBUG] 캐시된 AI 응답 사용 - 텍스트 길이: {len(text)}자")
+            self.chat_requests.cancel()  # 진행 중인 (이전 문맥) 요청이 캐시 응답을 덮어쓰지 않게
+            self.chatgpt_response = cached
+            self.ui.post("sent_text", text)
+            self.ui.post("response", cached)
+            self.update_status("AI 응답 완료 (캐시)")
+            return
+        
+        if self.chat_requests.pending_text == text:
+            return
+        
+        print(f"[DEBUG] ChatGPT API 호출 - 현재 텍스트: '{text}'")
+        self.update_status("AI 응답 요청 중...")
+        self.chat_requests.submit(self._call_chatgpt_api, text, api_key)
+    
+    def on_close(self):
+        with self._listener_lock:
+            self.closed = True  # 이후에는 준비 스레드가 리스너를 시작하지 않음
+        self.is_recording = False
+        self.stop_mouse_listener()
+        self.triggers.stop()
+        self.chat_requests.cancel()
+        print(f"[DEBUG] 트리거: {self.triggers.stats()}, 응답 캐시: {self.response_cache.stats()}")
+        print(f"[DEBUG] ChatGPT 요청: {self.chat_requests.stats()}, 문맥: {self.context.stats()}")
+        print(f"[DEBUG] 미리 준비 작업 (ms): {self.warmup.stats()}")
+        self.context.close()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        writer = set_trace(None)
+        if writer:
+            writer.close()
+        self.segment_store.close()  # 남은 구간을 저널 파일에 기록
+        self.ui.stop()
+        self.root.destroy()
     
     def stop_mouse_listener(self):
         """마우스 움직임 감지 중지"""
-        if self.mouse_listener:
-            self.mouse_listener.stop()
-            print("[DEBUG] 마우스 움직임 감지 중지됨")
+        with self._listener_lock:
+            if self.mouse_listener:
+                self.mouse_listener.stop()
+                print("[DEBUG] 마우스 움직임 감지 중지됨")
+            if self.hotkey_listener:
+                self.hotkey_listener.stop()
         
     def show_available_devices(self):
         # 디바이스 정보 프레임
@@ -174,20 +389,17 @@ class AudioSTTApp:
         device_text = scrolledtext.ScrolledText(device_frame, height=5, wrap=tk.WORD)
         device_text.pack(fill=tk.X, expand=True)
         
-        # 디바이스 정보 가져오기
+        # 디바이스 정보 가져오기 (입력 장치만, 캐시된 목록)
         try:
-            p = pyaudio.PyAudio()
             device_info = "사용 가능한 오디오 입력 장치:\n"
+            loopback = find_device(LOOPBACK_PATTERN)
             
-            for i in range(p.get_device_count()):
-                info = p.get_device_info_by_index(i)
-                if info.get('maxInputChannels') > 0:  # 입력 장치만 표시
-                    device_info += f"장치 {i}: {info.get('name')}\n"
-                    if "스테레오 믹스" in info.get('name') or "Stereo Mix" in info.get('name'):
-                        device_info += "   (스피커 출력 캡처에 사용 가능)\n"
+            for device in list_input_devices(refresh=True):
+                device_info += f"장치 {device.index}: {device.name}\n"
+                if loopback is not None and device.index == loopback.index:
+                    device_info += "   (스피커 출력 캡처에 사용 가능)\n"
             
             device_text.insert(tk.END, device_info)
-            p.terminate()
         except Exception as e:
             device_text.insert(tk.END, f"오디오 장치 정보를 가져오는 중 오류 발생: {str(e)}")
         
@@ -200,172 +412,242 @@ class AudioSTTApp:
             self.is_recording = True
             self.record_button.config(text="녹음 중지")
             self.status_label.config(text="녹음 중...")
+            self._record_started_at = time.perf_counter()
+            self._cache_api_key()  # 붙여넣기처럼 키 입력 이벤트 없이 바뀐 경우 대비
             
             # 백그라운드 스레드에서 녹음 및 STT 변환 실행
             threading.Thread(target=self.record_and_transcribe, daemon=True).start()
     
     def record_and_transcribe(self):
+        lanes = []
         try:
-            # PyAudio 설정
-            p = pyaudio.PyAudio()
+            # OpenAI Whisper 사용을 위한 클라이언트 설정 (녹음 스레드라 Entry 대신 복사해 둔 키)
+            api_key = self.api_key
+            if not api_key:
+                self.update_status("OpenAI API 키가 필요합니다.")
+                self.is_recording = False
+                self.ui.post("record_button", "녹음 시작")
+                return
+            if self.ENCODING.fallback:
+                print(f"[ERROR] {self.ENCODING.fallback}")
+                self.update_status(self.ENCODING.fallback)
             
-            # 스테레오 믹스 장치 찾기
-            loopback_device_index = None
-            for i in range(p.get_device_count()):
-                device_info = p.get_device_info_by_index(i)
-                device_name = device_info.get("name", "")
-                if "스테레오 믹스" in device_name or "Stereo Mix" in device_name:
-                    loopback_device_index = i
-                    break
+            # 입력 장치 찾기 (장치 목록은 한 번만 조회해서 캐시)
+            fake = self.CAPTURE_SOURCE == "fake"
+            devices = [] if fake else list_input_devices()
+            for name, spec in self.CAPTURE_SOURCES:
+                device = None if fake else find_device(spec, devices)
+                if device is None and not fake:
+                    print(f"[ERROR] '{name}' 입력 장치를 찾을 수 없습니다: {spec}")
+                    continue
+                lanes.append(SourceLane(name, device, channels=2, chunk=1024,
+                                        buffer_seconds=self.BUFFER_SECONDS))
             
-            if loopback_device_index is None:
+            if not lanes:
                 self.update_status("스테레오 믹스 장치를 찾을 수 없습니다. Windows 사운드 설정에서 활성화하세요.")
                 self.is_recording = False
-                self.record_button.config(text="녹음 시작")
+                self.ui.post("record_button", "녹음 시작")
                 return
             
-            # 오디오 스트림 설정
-            CHUNK = 1024
-            FORMAT = pyaudio.paInt16
-            CHANNELS = 2
-            RATE = 44100
-            
-            stream = p.open(format=FORMAT,
-                        channels=CHANNELS,
-                        rate=RATE,
-                        input=True,
-                        input_device_index=loopback_device_index,
-                        frames_per_buffer=CHUNK)
+            # 소스가 여러 개면 전사 결과에 소스 이름을 붙임
+            self.segment_store.show_source = len(lanes) > 1
+            backend = OpenAIBackend(api_key)  # ChatGPT 호출과 같은 API 클라이언트(연결 풀) 공유
+            for lane in lanes:
+                read_chunk = lane.open(in_process=self.CAPTURE_IN_PROCESS, source=self.CAPTURE_SOURCE,
+                                       ring_seconds=self.CAPTURE_RING_SECONDS, wav_path=self.CAPTURE_WAV_PATH)
+                lane.pipeline = self._build_pipeline(lane, read_chunk, backend, multi=len(lanes) > 1)
+                print(f"[DEBUG] 입력 '{lane.name}': {lane.device or '가짜 소스'}, {lane.rate}Hz {lane.channels}ch")
+            self.lanes = lanes
             
             self.update_status("녹음 시작...")
+            for lane in lanes:
+                lane.pipeline.start()
             
-            # OpenAI Whisper 사용을 위한 클라이언트 설정
-            api_key = self.api_key_entry.get().strip()
-            if not api_key:
-                self.update_status("OpenAI API 키가 필요합니다.")
-                self.is_recording = False
-                self.record_button.config(text="녹음 시작")
-                return
-            
-            # STT 처리 스레드 시작
-            stt_thread = threading.Thread(target=self.stt_processor, args=(api_key,), daemon=True)
-            stt_thread.start()
-            
-            # 연속 오디오 수집 루프 (절대 멈추지 않음)
+            # 연속 오디오 수집 루프 (녹음 중지 시 반환). 소스마다 캡처 루프 하나씩
             print("[DEBUG] 연속 오디오 수집 시작...")
-            while self.is_recording:
-                try:
-                    data = stream.read(CHUNK, exception_on_overflow=False)
-                    
-                    # 오디오 데이터를 버퍼에 추가
-                    with self.recording_lock:
-                        for byte in data:
-                            self.audio_buffer.append(byte)
-                    
-                    # 큐에도 추가 (STT 처리용)
-                    self.audio_queue.put(data)
-                    
-                except Exception as e:
-                    print(f"[ERROR] 오디오 읽기 오류: {str(e)}")
-                    continue
+            keep_running = lambda: self.is_recording
+            threads = [threading.Thread(target=lane.pipeline.run_capture, args=(keep_running,),
+                                        name=f"capture-{lane.name}", daemon=True) for lane in lanes[1:]]
+            for thread in threads:
+                thread.start()
+            lanes[0].pipeline.run_capture(keep_running)
+            for thread in threads:
+                thread.join()
             
             # 스트림 정리
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
+            for lane in lanes:
+                lane.stop_capture()
+            for lane in lanes:
+                lane.pipeline.stop()
+                lane.release()  # 파이프라인이 공유 메모리를 다 쓴 뒤에 해제
+                for stats in lane.pipeline.stats():
+                    print(f"[DEBUG] 파이프라인 단계 '{stats['stage']}': 처리 {stats['processed']}, 드롭 {stats['dropped']}, 오류 {stats['errors']}")
+            for lane in lanes:
+                if lane.scheduler is not None:
+                    print(f"[DEBUG] 적응형 스케줄러 '{lane.name}': {lane.scheduler.stats()}")
+            print(f"[DEBUG] API 클라이언트: {backend.stats()}")
+            print(f"[DEBUG] 지연 시간: {REGISTRY.summary()}")
+            for lane in lanes:
+                if self.STREAMING:
+                    # 남은 임시 텍스트 확정
+                    rest = lane.stitcher.flush()
+                    lane.provisional = ""
+                    if rest:
+                        self.update_transcript(rest, success=True, source=lane.name)
+                elif lane.segmenter is not None:
+                    segmenter = lane.segmenter
+                    print(f"[DEBUG] VAD '{lane.name}': 구간 {segmenter.segments}개 전송, 무음으로 건너뛴 요청 약 {segmenter.skipped_windows(lane.bytes_per_second * self.RECORD_SECONDS)}회, 음성 비율 {segmenter.speech_ratio:.0%}")
+            if self.STREAMING:
+                self._post_provisional()
             print("[DEBUG] 오디오 수집 종료")
             
         except Exception as e:
             print(f"[ERROR] 녹음 오류: {str(e)}")
             self.update_status(f"오류 발생: {str(e)}")
-            self.error_count += 1
+            with self._transcript_lock:
+                self.error_count += 1
             self.is_recording = False
-            self.record_button.config(text="녹음 시작")
+            self.ui.post("record_button", "녹음 시작")
+            for lane in lanes:
+                try:
+                    lane.stop_capture()
+                    lane.release()
+                except Exception:
+                    pass
     
-    def stt_processor(self, api_key):
-        """별도 스레드에서 STT 처리"""
-        client = OpenAI(api_key=api_key)
-        RATE = 44100
-        CHANNELS = 2
-        FORMAT = pyaudio.paInt16
-        
-        # PyAudio 인스턴스 생성 (sample width 얻기 위해)
-        p = pyaudio.PyAudio()
-        sample_width = p.get_sample_size(FORMAT)
-        p.terminate()
-        
-        print("[DEBUG] STT 처리 스레드 시작...")
-        
-        last_process_time = time.time()
-        
-        while self.is_recording:
-            current_time = time.time()
+    def _build_pipeline(self, lane, read_chunk, backend, multi=False):
+        """소스 하나의 캡처 → 윈도우 → 인코딩 → 업로드 파이프라인 구성"""
+        if self.USE_VAD:
+            lane.segmenter = SpeechSegmenter(self.VAD, lane.rate, lane.channels, start_byte=lane.buffer.total_written)
+        
+        window_seconds = self.RECORD_SECONDS
+        hop_bytes = None
+        if self.STREAMING:
+            window_seconds = self.STREAM_WINDOW_SECONDS
+            hop_bytes = int(lane.rate * self.STREAM_HOP_SECONDS) * lane.channels * lane.sample_width
+            lane.stitcher = TranscriptStitcher(self.STITCH_STRATEGY)
+        
+        concurrency_limit = None
+        if self.ADAPTIVE:
+            min_window, max_window = self.ADAPTIVE_WINDOW_SECONDS
+            if self.STREAMING:
+                # 겹치는 윈도우 길이는 고정, 동시 요청 수만 조정 (요청마다 보내는 오디오는 윈도우 전체)
+                min_window = max_window = self.STREAM_WINDOW_SECONDS
+            start_window = self.VAD.max_segment_seconds if self.USE_VAD and not self.STREAMING else window_seconds
+            lane.scheduler = AdaptiveScheduler(
+                window=start_window, concurrency=self.STT_MAX_CONCURRENCY,
+                min_window=min_window, max_window=max_window,
+                min_concurrency=self.ADAPTIVE_CONCURRENCY[0], max_concurrency=self.ADAPTIVE_CONCURRENCY[1],
+                target_latency=self.TARGET_LATENCY_SECONDS, name=lane.name)
+            concurrency_limit = lane.scheduler.max_concurrency
+        
+        return STTPipeline(
+            read_chunk=read_chunk,
+            buffer=lane.buffer,
+            lock=lane.lock,
+            window_bytes=int(lane.rate * window_seconds) * lane.channels * lane.sample_width,
+            encode=lambda window: self._encode_window(window, lane.channels, lane.sample_width, lane.rate),
+            transcribe=lambda window: self._transcribe_window(backend, window, lane),
+            on_result=lambda window, text: self._on_stt_result(lane, window, text),
+            hop_bytes=hop_bytes,
+            segmenter=lane.segmenter,
+            max_concurrency=self.STT_MAX_CONCURRENCY,
+            request_timeout=self.STT_TIMEOUT_SECONDS,
+            drop_policy=self.PIPELINE_DROP_POLICY,
+            name=lane.name if multi else None,
+            max_concurrency_limit=concurrency_limit,
+        )
+    
+    def _encode_window(self, window, channels, sample_width, rate):
+        """오디오 구간을 업로드 포맷(기본 16kHz 모노 WAV)으로 메모리 상에서 변환 (인코딩 단계)"""
+        window.payload = encode_pcm(window.pcm, channels, sample_width, rate, self.ENCODING, name=f"audio_{window.seq}")
+        return window
+    
+    def _transcribe_window(self, backend, window, lane):
+        """OpenAI Whisper STT 변환 (업로드 단계, 여러 스레드에서 동시에 호출됨)"""
+        started = time.perf_counter()
+        try:
+            print(f"[DEBUG] OpenAI Whisper STT 변환 시작... (파일 크기: {window.payload.getbuffer().nbytes} bytes, 원본 {len(window.pcm)} bytes)")
             
-            # 설정된 간격마다 처리
-            if current_time - last_process_time >= self.RECORD_SECONDS:
-                try:
-                    # 현재 버퍼에서 설정된 시간분 데이터 추출
-                    with self.recording_lock:
-                        if len(self.audio_buffer) > 0:
-                            # 버퍼의 모든 데이터를 복사 (최대 설정된 시간분)
-                            audio_data = bytes(self.audio_buffer)
-                        else:
-                            audio_data = b''
-                    
-                    if len(audio_data) > 0:
-                        # 임시 WAV 파일로 저장
-                        temp_wav = f"temp_audio_{int(current_time)}.wav"
-                        try:
-                            with wave.open(temp_wav, "wb") as wf:
-                                wf.setnchannels(CHANNELS)
-                                wf.setsampwidth(sample_width)
-                                wf.setframerate(RATE)
-                                wf.writeframes(audio_data)
-                            
-                            # OpenAI Whisper STT 변환
-                            print(f"[DEBUG] OpenAI Whisper STT 변환 시작... (파일 크기: {len(audio_data)} bytes)")
-                            
-                            with open(temp_wav, "rb") as audio_file:
-                                transcript = client.audio.transcriptions.create(
-                                    model="whisper-1",
-                                    file=audio_file,
-                                    language="ko"
-                                )
-                            
-                            text = transcript.text
-                            print(f"[DEBUG] Whisper STT 결과: '{text}'")
-                            
-                            if text.strip():
-                                self.update_transcript(text, success=True)
-                                self.error_count = 0
-                            else:
-                                print("[DEBUG] 빈 텍스트 결과, 건너뜀")
-                                
-                        except Exception as stt_error:
-                            print(f"[ERROR] Whisper STT 오류: {str(stt_error)}")
-                            self.update_status(f"음성 인식 오류: {str(stt_error)}")
-                            self.error_count += 1
-                        
-                        finally:
-                            # 임시 파일 삭제
-                            try:
-                                os.remove(temp_wav)
-                            except:
-                                pass
-                    
-                    last_process_time = current_time
-                    
-                except Exception as e:
-                    print(f"[ERROR] STT 처리 오류: {str(e)}")
+            text = backend.transcribe(window.payload, language="ko", timeout=self.STT_TIMEOUT_SECONDS)
+            self._observe_rtt(lane, window, time.perf_counter() - started)
+            print(f"[DEBUG] Whisper STT 결과: '{text}'")
+            if not text.strip():
+                EMPTY_RESULTS.inc()
+            return text
             
-            # 0.1초 대기 (이거 없으면 while문 미친듯이 돌면서 CPU 100% 소모함;;)
-            time.sleep(0.1)
-        
-        print("[DEBUG] STT 처리 스레드 종료")
+        except Exception as stt_error:
+            # 실패한 요청도 자리를 차지했던 시간만큼 반영 (시간 초과면 최소 timeout)
+            rtt = time.perf_counter() - started
+            if "timeout" in type(stt_error).__name__.lower():
+                rtt = max(rtt, self.STT_TIMEOUT_SECONDS)
+            self._observe_rtt(lane, window, rtt)
+            print(f"[ERROR] Whisper STT 오류: {str(stt_error)}")
+            self.update_status(f"음성 인식 오류: {str(stt_error)}")
+            with self._transcript_lock:
+                self.error_count += 1
+            return None
+    
+    def _observe_rtt(self, lane, window, rtt):
+        if lane.scheduler is not None:
+            lane.scheduler.observe(len(window.pcm) / lane.bytes_per_second, rtt)
+    
+    def _on_stt_result(self, lane, window, text):
+        self._adapt(lane)
+        if self.STREAMING:
+            # 겹치는 윈도우 결과에서 중복을 제거하고 새로 확정된 부분만 추가
+            text, lane.provisional = lane.stitcher.add(text)
+            self._post_provisional()
+            if not text.strip():
+                return
+        if text.strip():
+            # 윈도우를 자른 시점부터 결과가 반영되기까지 (인코딩 + 대기 + 업로드 + Whisper)
+            latency = time.time() - window.captured_at
+            END_TO_END_SECONDS.observe(latency)
+            if self._record_started_at is not None:
+                first = time.perf_counter() - self._record_started_at
+                self._record_started_at = None
+                FIRST_TRANSCRIPT_SECONDS.observe(first)
+                print(f"[DEBUG] 녹음 시작부터 첫 전사까지 {first * 1000:.0f}ms")
+            trace("stt_result", latency, source=lane.name, seq=window.seq, audio_bytes=len(window.pcm), chars=len(text))
+            # 구간의 실제 시각 (윈도우를 자른 시점 기준으로 역산)
+            duration = (window.end_byte - window.start_byte) / lane.bytes_per_second
+            self.update_transcript(text, success=True, start=window.captured_at - duration, end=window.captured_at,
+                                   source=lane.name)
+            if self.TRIGGER_ON_SPEECH_END and self.USE_VAD and not self.STREAMING:
+                self.triggers.fire("speech_end")
+        else:
+            print("[DEBUG] 빈 텍스트 결과, 건너뜀")
     
-    def update_transcript(self, text, success=False):
-        # 현재 시간 가져오기
-        current_time = datetime.datetime.now().strftime("%H:%M:%S")
+    def _adapt(self, lane):
+        """측정값으로 소스의 윈도우 길이/동시 요청 수 조정 (결과마다 호출, 스케줄러 간격마다 한 번 계산)"""
+        scheduler = lane.scheduler
+        if scheduler is None:
+            return
+        speech_seconds = audio_seconds = None
+        if lane.segmenter is not None:
+            speech_seconds = lane.segmenter.speech_bytes / lane.bytes_per_second
+            audio_seconds = lane.segmenter.total_bytes / lane.bytes_per_second
+        pipeline = lane.pipeline
+        if scheduler.update(pipeline.backlog, pipeline.window.emitted, speech_seconds, audio_seconds):
+            pipeline.set_window_seconds(scheduler.window, lane.bytes_per_second, lane.channels * lane.sample_width)
+            pipeline.set_concurrency(scheduler.concurrency)
+            trace("stt_adapt", source=lane.name, window=scheduler.window, concurrency=scheduler.concurrency,
+                  backlog=pipeline.backlog)
+    
+    def _post_provisional(self):
+        """소스별 임시 텍스트를 합쳐서 표시 (소스가 여러 개면 이름을 붙임)"""
+        multi = len(self.lanes) > 1
+        self.provisional_text = " ".join(f"[{lane.name}] {lane.provisional}" if multi else lane.provisional
+                                         for lane in self.lanes if lane.provisional)
+        self.ui.post("provisional", self.provisional_text)
+    
+    def update_transcript(self, text, success=False, start=None, end=None, source="loopback"):
+        # 구간 시각 (모르면 현재 시간)
+        if end is None:
+            end = time.time()
+        if start is None:
+            start = end
         
         # 노이즈 텍스트 필터링 (하드코딩 예외처리)
         noise_texts = [
@@ -377,49 +659,57 @@ class AudioSTTApp:
         cleaned_text = text.strip()
         if cleaned_text in noise_texts:
             print(f"[DEBUG] 노이즈 텍스트 필터링됨: '{cleaned_text}'")
+            NOISE_FILTERED.inc()
             return  # 노이즈면 처리하지 않고 바로 리턴
+        if not cleaned_text:
+            return
         
-        # 성공적인 인식이고 이전에 오류가 2회 이상 발생했을 경우 줄바꿈 추가
-        if success and self.error_count >= 2:
-            self.transcript += "\n" + text + " "
-            self.error_count = 0  # 오류 카운트 초기화
-        else:
-            self.transcript += text + " "
+        # 소스가 여러 개면 소스별 결과 스레드에서 동시에 호출되므로 저장소/문맥/오류 수 갱신은 한 번에 하나씩
+        with self._transcript_lock:
+            # 성공적인 인식이고 이전에 오류가 2회 이상 발생했을 경우 줄바꿈 표시
+            gap = success and self.error_count >= 2
+            if success:
+                self.error_count = 0  # 오류 카운트 초기화
             
-        # 마지막 300자 추출하여 recent_transcript 업데이트
-        if len(self.transcript) <= 300:
-            self.recent_transcript = self.transcript
-        else:
-            self.recent_transcript = self.transcript[-300:]
-        
-        # STT 결과를 시간대별 히스토리에 추가
-        if text.strip():  # 빈 텍스트가 아닌 경우만 추가
-            # 새로운 STT 결과를 시간과 함께 히스토리에 추가
-            self.recent_history.append(f"[{current_time}] {text.strip()}")
-            # 최대 20개 항목만 유지
-            if len(self.recent_history) > 20:
-                self.recent_history = self.recent_history[-20:]
+            # 구간 저장소에 추가 (최근 20줄 히스토리는 저장소에서 한 줄씩 갱신됨)
+            line = self.segment_store.append(text, start, end, source=source, gap=gap)
+            # 소스가 여러 개면 AI 문맥에도 누가(어느 장치에서) 말했는지 표시
+            self.context.add(f"[{source}] {text}" if self.segment_store.show_source else text)
+            self.recent_transcript = self.context.prompt_text()
             
-        # 전체 텍스트 영역 업데이트 (숨김 처리로 주석)
-        # self.text_area.delete(1.0, tk.END)
-        # self.text_area.insert(tk.END, self.transcript)
-        # self.text_area.see(tk.END)
-        
-        # 시간대별 전체 텍스트 영역 업데이트
-        self.recent_text_area.delete(1.0, tk.END)
-        self.recent_text_area.insert(tk.END, "\n".join(self.recent_history))
-        self.recent_text_area.see(tk.END)
+            # 시간대별 전체 텍스트 영역에 이 구간의 줄만 추가 (메인 루프에서 처리)
+            self.ui.post("transcript_line", line)
+    
+    def _ui_append_transcript_line(self, line):
+        """새 줄을 끝에 추가하고 20줄을 넘는 앞줄은 삭제 (메인 스레드)"""
+        replace_tagged(self.recent_text_area, "provisional", "")
+        append_line(self.recent_text_area, line, max_lines=self.segment_store.recent_lines.maxlen)
+        self._ui_set_provisional(self._shown_provisional)
+    
+    def _ui_set_provisional(self, text):
+        """스트리밍 모드의 임시 텍스트는 회색으로 끝에 표시 (확정되면 히스토리로 옮겨짐, 메인 스레드)"""
+        self._shown_provisional = text
+        replace_tagged(self.recent_text_area, "provisional", f"\n... {text}" if text else "")
     
     def update_status(self, message):
-        self.root.after(0, lambda: self.status_label.config(text=message))
+        self.ui.post("status", message)
     
     def clear_transcript(self):
-        self.transcript = ""
-        self.recent_transcript = ""  # recent_transcript도 함께 초기화
-        self.recent_history = []  # 히스토리도 초기화
+        # 결과 스레드의 update_transcript와 엇갈리지 않게 (지운 뒤에 이전 줄이 다시 붙지 않도록 화면도 함께)
+        with self._transcript_lock:
+            self.segment_store.clear()  # 구간/히스토리 초기화 (저널 파일은 유지)
+            self.context.reset()
+            self.recent_transcript = ""  # recent_transcript도 함께 초기화
+            self.error_count = 0
+            for lane in self.lanes:
+                if lane.stitcher is not None:
+                    lane.stitcher.reset()  # 스트리밍 이어 붙이기 상태도 초기화
+                lane.provisional = ""
+            self.provisional_text = ""
+            self._shown_provisional = ""
+            # self.text_area.delete(1.0, tk.END)  # 기존 전체 텍스트 영역 (숨김 처리로 주석)
+            self.recent_text_area.delete(1.0, tk.END)  # 시간대별 전체 텍스트 영역 초기화
         self.chatgpt_response = ""  # ChatGPT 응답도 초기화
-        # self.text_area.delete(1.0, tk.END)  # 기존 전체 텍스트 영역 (숨김 처리로 주석)
-        self.recent_text_area.delete(1.0, tk.END)  # 시간대별 전체 텍스트 영역 초기화
         self.chatgpt_response_area.delete(1.0, tk.END)  # ChatGPT 응답 영역도 초기화
         
         # 전송된 텍스트 표시창도 초기화
@@ -427,15 +717,70 @@ class AudioSTTApp:
         self.sent_text_entry.delete(0, tk.END)
         self.sent_text_entry.config(state="readonly")
     
+    def run_search(self, event=None):
+        """검색어로 세션 전체 구간을 찾아 결과 목록 갱신 (최신 순)"""
+        query = self.search_entry.get().strip()
+        self.search_results.delete(0, tk.END)
+        self._search_hits = []
+        if not query:
+            self.search_results.pack_forget()
+            self.search_context_area.pack_forget()
+            self.search_count_label.config(text="")
+            return
+        started = time.perf_counter()
+        hits = self.segment_store.search(query, limit=self.SEARCH_LIMIT)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for seg_id, segment in hits:
+            self._search_hits.append(seg_id)
+            self.search_results.insert(tk.END, self.segment_store.format_line(segment))
+        more = "+" if len(hits) >= self.SEARCH_LIMIT else ""
+        self.search_count_label.config(text=f"{len(hits)}{more}건 ({elapsed_ms:.1f}ms)")
+        if not self.search_results.winfo_ismapped():
+            self.search_results.pack(fill=tk.X, padx=5, pady=(0, 10), after=self._search_frame)
+    
+    def show_search_context(self, event=None):
+        """선택한 검색 결과 시점의 앞뒤 구간을 표시하고 해당 구간을 강조"""
+        selection = self.search_results.curselection()
+        if not selection:
+            return
+        seg_id = self._search_hits[selection[0]]
+        self.search_context_area.delete(1.0, tk.END)
+        for i, segment in self.segment_store.around(seg_id, before=3, after=3):
+            tags = ("hit",) if i == seg_id else ()
+            self.search_context_area.insert(tk.END, self.segment_store.format_line(segment) + "\n", tags)
+            if i == seg_id:
+                self.search_context_area.see(tk.END)
+        if not self.search_context_area.winfo_ismapped():
+            self.search_context_area.pack(fill=tk.X, padx=5, pady=(0, 10), after=self.search_results)
+    
+    def open_session(self):
+        """이전 세션 저널을 열어 검색 대상으로 삼고, 이후 인식 결과도 그 저널에 이어서 기록"""
+        if self.is_recording:
+            self.update_status("녹음 중에는 세션을 열 수 없습니다")
+            return
+        path = filedialog.askopenfilename(initialdir="sessions", filetypes=[("세션 저널", "*.jsonl")])
+        if not path:
+            return
+        show_source = self.segment_store.show_source
+        self.segment_store.close()
+        # 저장된 색인을 읽고 색인 이후에 기록된 구간만 새로 색인
+        self.segment_store = SegmentStore(history_lines=20, journal_path=path, show_source=show_source)
+        self.session_id = os.path.splitext(os.path.basename(path))[0]
+        count = len(self.segment_store.index)
+        print(f"[DEBUG] 세션 열기: {path} (구간 {count}개, 새로 색인 {self.segment_store.reindexed}개)")
+        self.update_status(f"세션 {self.session_id} 열림 (구간 {count}개)")
+        self.run_search()
+    
     def save_transcript(self):
         filename = "transcript.txt"
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(self.transcript)
+        # 지난 저장 이후 새로 인식된 구간만 파일 끝에 추가
+        self.segment_store.save_text(filename)
         self.update_status(f"텍스트가 {filename}에 저장되었습니다")
 
     def request_chatgpt_response(self):
         # API 키 가져오기
-        api_key = self.api_key_entry.get().strip()
+        self._cache_api_key()
+        api_key = self.api_key
         if not api_key:
             self.update_status("OpenAI API 키가 필요합니다.")
             return
@@ -445,30 +790,48 @@ class AudioSTTApp:
             self.update_status("처리할 텍스트가 없습니다.")
             return
         
-        # 상태 업데이트
-        self.update_status("AI 응답 요청 중...")
-        
-        # 백그라운드 스레드에서 API 요청 실행
-        threading.Thread(target=self._call_chatgpt_api, args=(api_key, self.recent_transcript), daemon=True).start()
+        # 캐시 확인 후 백그라운드 스레드에서 API 요청 실행 (진행 중인 이전 요청은 취소됨)
+        self._request_ai_response(self.recent_transcript, api_key)
+    
+    def _summarize_context(self, previous, new_text, max_tokens):
+        """이전 요약 + 새 발언 → 새 요약 (문맥 요약 스레드에서 호출)"""
+        api_key = self.api_key
+        if not api_key:
+            raise RuntimeError("API 키가 없습니다")
+        content = f"이전 요약:\n{previous or '(없음)'}\n\n새 발언:\n{new_text}"
+        response = get_client(api_key).chat(
+            model=self.SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": "회의/대화 기록을 요약합니다. 이전 요약에 새 발언의 핵심 내용(주제, 결정 사항, 질문, 숫자)을 합쳐 "
+                                              "한국어로 짧게 다시 써 주세요. 요약문만 출력합니다."},
+                {"role": "user", "content": content}
+            ],
+            max_tokens=max_tokens,
+            temperature=0.2
+        )
+        return response.choices[0].message.content
     
-    def _call_chatgpt_api(self, api_key, text):
+    def _build_prompt(self, text):
+        return f"{self.chatgpt_prompt}\n\n텍스트: {text}"
+    
+    def _call_chatgpt_api(self, request, api_key):
+        text = request.text
         try:
             # UI에 전송된 텍스트 표시
-            self.root.after(0, self._update_sent_text, text)
+            self.ui.post("sent_text", text)
             
-            # OpenAI API 설정 (새로운 방식)
-            client = OpenAI(api_key=api_key)
+            # 공유 API 클라이언트 (연결 재사용 + 재시도 + 서킷 브레이커)
+            client = get_client(api_key)
             
             # 프롬프트 준비
-            prompt = f"{self.chatgpt_prompt}\n\n텍스트: {text}"
+            prompt = self._build_prompt(text)
             
-            print(f"[DEBUG] ChatGPT API 호출 시작 - 텍스트 길이: {len(text)}자")  # 터미널 출력
+            print(f"[DEBUG] ChatGPT API 호출 시작 #{request.seq} - 텍스트 길이: {len(text)}자")  # 터미널 출력
             print(f"[DEBUG] 전송되는 텍스트: '{text}'")  # 실제 텍스트 내용 출력
             print(f"[DEBUG] 완전한 프롬프트:\n{prompt}")  # 전체 프롬프트 출력
             print("-" * 50)  # 구분선
             
-            # API 호출 (새로운 방식)
-            response = client.chat.completions.create(
+            params = dict(
                 model="gpt-4.1",
                 messages=[
                     {"role": "system", "content": """
@@ -479,34 +842,71 @@ class AudioSTTApp:
                 temperature=0.7
             )
             
-            # 응답 추출 (새로운 방식)
-            response_text = response.choices[0].message.content.strip()
+            if self.CHAT_STREAMING:
+                # 토큰이 도착하는 대로 응답 영역에 추가
+                stream = request.attach_stream(client.chat_stream(**params))
+                self.ui.post("response", "")
+                parts = []
+                for chunk in stream:
+                    request.check()
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if request.first_token_at is None:
+                            request.mark_first_token()
+                            print(f"[DEBUG] ChatGPT 첫 토큰까지 {request.ttft * 1000:.0f} ms")
+                        parts.append(delta)
+                        self.ui.post("response_append", request.seq, delta)
+                response_text = "".join(parts).strip()
+            else:
+                # API 호출 (새로운 방식)
+                response = client.chat(**params)
+                request.mark_first_token()
+                
+                # 응답 추출 (새로운 방식)
+                response_text = response.choices[0].message.content.strip()
+            
+            # 더 새로운 요청이 시작됐으면 결과를 버림
+            request.check()
             self.chatgpt_response = response_text
+            self.response_cache.put(prompt, response_text)
             
-            print(f"[DEBUG] ChatGPT API 응답 성공 - 응답 길이: {len(response_text)}자")  # 터미널 출력
+            # 스트리밍 응답에 내용이 하나도 없으면 (빈 응답/필터링) 첫 토큰 시간이 없음
+            ttft = f"{request.ttft * 1000:.0f} ms" if request.ttft is not None else "없음 (빈 응답)"
+            print(f"[DEBUG] ChatGPT API 응답 성공 #{request.seq} - 응답 길이: {len(response_text)}자, 첫 토큰 {ttft}")  # 터미널 출력
             print(f"[DEBUG] ChatGPT 응답 내용:\n{response_text}")  # 응답 내용도 출력
             print("=" * 50)  # 구분선
             
             # UI 업데이트 (메인 스레드에서 실행)
-            self.root.after(0, self._update_chatgpt_response_area)
-            self.root.after(0, lambda: self.update_status("AI 응답 완료"))
-            
-            # ChatGPT 호출 완료 후 플래그 리셋
-            self.isGPT = False
-            print("[DEBUG] ChatGPT 호출 완료, 플래그 리셋됨")
+            self.ui.post("response", response_text)
+            self.update_status("AI 응답 완료")
             
+        except RequestCancelled:
+            print(f"[DEBUG] ChatGPT 요청 #{request.seq} 취소됨 (새 요청으로 대체)")
         except Exception as e:
+            if request.cancelled:
+                # 취소하면서 스트림을 닫아 생긴 연결 오류는 무시
+                print(f"[DEBUG] ChatGPT 요청 #{request.seq} 취소됨 (새 요청으로 대체)")
+                return
             # 오류 메시지를 터미널과 UI 모두에 출력
             error_message = f"AI 응답 오류: {str(e)}"
             print(f"[ERROR] {error_message}")  # 터미널 출력
-            self.root.after(0, lambda: self.update_status(error_message))
-            
-            # 오류 발생 시에도 플래그 리셋
-            self.isGPT = False
+            self.update_status(error_message)
+        finally:
+            request.close_stream()  # 끝까지 읽었든 취소/오류든 연결을 돌려줌
     
-    def _update_chatgpt_response_area(self):
+    def _update_chatgpt_response_area(self, response_text):
         self.chatgpt_response_area.delete(1.0, tk.END)
-        self.chatgpt_response_area.insert(tk.END, self.chatgpt_response)
+        self.chatgpt_response_area.insert(tk.END, response_text)
+    
+    def _append_chatgpt_response(self, seq, token):
+        """스트리밍 토큰 추가 (취소된 요청의 늦게 도착한 토큰은 무시, 메인 스레드)"""
+        current = self.chat_requests.pending_seq
+        if current is not None and current != seq:
+            return
+        self.chatgpt_response_area.insert(tk.END, token)
+        self.chatgpt_response_area.see(tk.END)
     
     def _update_sent_text(self, text):
         """전송된 텍스트를 UI에 표시"""
@@ -520,6 +920,7 @@ class AudioSTTApp:
         self.sent_text_entry.config(state="readonly")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 캡처 프로세스 (PyInstaller 등으로 묶은 경우)
     root = tk.Tk()
     app = AudioSTTApp(root)
     root.mainloop() 
\ No newline at end of file
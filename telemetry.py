@@ -0,0 +1,358 @@
+"""계측: 카운터/게이지/히스토그램, Prometheus 텍스트 엔드포인트, CSV/JSONL 트레이스, 레벨 로깅
+
+모듈들은 프로세스 전체에서 공유하는 REGISTRY에 지표를 등록해 두고 값만 갱신한다.
+(지표 갱신은 락 하나 + 덧셈 정도라 핫 패스에서 써도 됨)
+
+    from telemetry import REGISTRY
+    STAGE_SECONDS = REGISTRY.histogram("stt_stage_seconds", "단계별 처리 시간", stage="encode")
+    STAGE_SECONDS.observe(0.012)
+
+실행 중 지표 확인:
+    curl http://127.0.0.1:9464/metrics
+"""
+import bisect
+import collections
+import csv
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 초 단위 지연 시간용 기본 버킷 (1ms ~ 60s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Counter:
+    """증가만 하는 값 (func가 있으면 읽을 때 func() 값을 사용)"""
+
+    def __init__(self, func=None):
+        self.func = func
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self.func() if self.func is not None else self._value
+
+
+class Gauge:
+    """현재 값 (큐 깊이 등). func가 있으면 읽을 때 func() 값을 사용"""
+
+    def __init__(self, func=None):
+        self.func = func
+        self._value = 0
+
+    def set(self, value):
+        self._value = value
+
+    @property
+    def value(self):
+        return self.func() if self.func is not None else self._value
+
+
+class Histogram:
+    """버킷별 누적 개수 + 최근 샘플 (백분위 계산용)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, reservoir=1024):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._recent = collections.deque(maxlen=reservoir)
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+            self._recent.append(value)
+
+    def time(self):
+        """with histogram.time(): ... 블록 실행 시간을 기록"""
+        return _Timer(self)
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def sum(self):
+        return self._sum
+
+    def percentile(self, q):
+        """최근 샘플 기준 q(0~1) 백분위"""
+        with self._lock:
+            recent = sorted(self._recent)
+        if not recent:
+            return 0.0
+        return recent[min(len(recent) - 1, max(0, int(len(recent) * q + 0.5) - 1))]
+
+    def cumulative(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+            count = self._count
+        running = 0
+        result = []
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            running += n
+            result.append((bound, running))
+        return result, total, count
+
+
+class _Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class _Family:
+    def __init__(self, name, kind, help_text):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.children = {}  # 정렬된 (label, value) 튜플 -> 지표
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind, name, help_text, labels, factory):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = _Family(name, kind, help_text)
+            elif family.kind != kind:
+                raise ValueError(f"지표 '{name}'는 이미 {family.kind}로 등록되어 있습니다")
+            metric = family.children.get(key)
+            if metric is None:
+                metric = family.children[key] = factory()
+            return metric
+
+    def counter(self, name, help_text="", func=None, **labels):
+        metric = self._get("counter", name, help_text, labels, Counter)
+        if func is not None:
+            metric.func = func  # 같은 지표를 다시 등록하면 (녹음 재시작 등) 새 객체 값을 읽음
+        return metric
+
+    def gauge(self, name, help_text="", func=None, **labels):
+        metric = self._get("gauge", name, help_text, labels, Gauge)
+        if func is not None:
+            metric.func = func
+        return metric
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS, **labels):
+        return self._get("histogram", name, help_text, labels, lambda: Histogram(buckets))
+
+    def render(self):
+        """Prometheus 텍스트 형식"""
+        lines = []
+        with self._lock:
+            families = [(f, list(f.children.items())) for f in self._families.values()]
+        for family, children in families:
+            if family.help:
+                lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for key, metric in children:
+                if family.kind == "histogram":
+                    buckets, total, count = metric.cumulative()
+                    for bound, running in buckets:
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{family.name}_bucket{_labels(key + (('le', le),))} {running}")
+                    lines.append(f"{family.name}_sum{_labels(key)} {total}")
+                    lines.append(f"{family.name}_count{_labels(key)} {count}")
+                else:
+                    try:
+                        value = metric.value
+                    except Exception as e:
+                        print(f"[ERROR] 지표 '{family.name}' 읽기 오류: {str(e)}")
+                        continue
+                    lines.append(f"{family.name}{_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """히스토그램별 개수/p50/p95 (종료 시 로그용)"""
+        result = {}
+        with self._lock:
+            families = [(f, list(f.children.items())) for f in self._families.values()]
+        for family, children in families:
+            if family.kind != "histogram":
+                continue
+            for key, metric in children:
+                if metric.count:
+                    name = family.name + _labels(key)
+                    result[name] = {"count": metric.count,
+                                    "p50_ms": round(metric.percentile(0.5) * 1000, 1),
+                                    "p95_ms": round(metric.percentile(0.95) * 1000, 1)}
+        return result
+
+
+def _labels(key):
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = MetricsRegistry()
+
+
+class MetricsServer:
+    """GET /metrics 로 REGISTRY 내용을 보여주는 로컬 HTTP 서버"""
+
+    def __init__(self, registry=REGISTRY, host="127.0.0.1", port=9464):
+        self.registry = registry
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _make_handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+class TraceWriter:
+    """이벤트별 한 줄 트레이스 (.csv 또는 .jsonl, 확장자로 결정)
+
+    CSV는 열이 고정이라 time, event, seconds, detail(나머지 필드 JSON) 네 열로 기록.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = "csv" if path.endswith(".csv") else "jsonl"
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        self._csv = csv.writer(self._file) if self.format == "csv" else None
+        if self._csv is not None and self._file.tell() == 0:
+            self._csv.writerow(["time", "event", "seconds", "detail"])
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def record(self, event, seconds=None, **fields):
+        now = round(time.time(), 3)
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._csv is not None:
+                self._csv.writerow([now, event, "" if seconds is None else round(seconds, 6),
+                                    json.dumps(fields, ensure_ascii=False) if fields else ""])
+            else:
+                record = {"time": now, "event": event}
+                if seconds is not None:
+                    record["seconds"] = round(seconds, 6)
+                record.update(fields)
+                self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+_trace = None
+
+
+def set_trace(writer):
+    """전역 트레이스 설정 (None이면 끔). 이전 writer 반환"""
+    global _trace
+    previous, _trace = _trace, writer
+    return previous
+
+
+def trace(event, seconds=None, **fields):
+    """트레이스가 켜져 있을 때만 기록 (꺼져 있으면 거의 비용 없음)"""
+    writer = _trace
+    if writer is not None:
+        writer.record(event, seconds, **fields)
+
+
+_PREFIX = re.compile(r"^\[(DEBUG|INFO|WARNING|ERROR)\]\s?")
+
+
+class _PrintToLogging:
+    """print("[DEBUG] ...") / print("[ERROR] ...") 출력을 logging 레벨로 바꿔 주는 stdout 대체"""
+
+    def __init__(self, logger, original):
+        self.logger = logger
+        self.original = original
+        self._local = threading.local()  # print는 본문과 줄바꿈을 따로 쓰므로 스레드별로 모음
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", "") + text
+        *lines, self._local.buffer = buffer.split("\n")
+        for line in lines:
+            match = _PREFIX.match(line)
+            level = getattr(logging, match.group(1)) if match else logging.INFO
+            if self.logger.isEnabledFor(level):
+                self.logger.log(level, line[match.end():] if match else line)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self.original, name)
+
+
+def enable_leveled_logging(level="INFO", path=None):
+    """기존 print 로그를 logging으로 전환 (level 미만은 출력하지 않음, path가 있으면 파일에도 기록)"""
+    handlers = [logging.StreamHandler(sys.__stderr__)]
+    if path:
+        handlers.append(logging.FileHandler(path, encoding="utf-8"))
+    logging.basicConfig(level=getattr(logging, level.upper()), handlers=handlers,
+                        format="%(asctime)s %(levelname)-5s [%(threadName)s] %(message)s")
+    if not isinstance(sys.stdout, _PrintToLogging):
+        sys.stdout = _PrintToLogging(logging.getLogger("stt"), sys.stdout)
@@ -0,0 +1,85 @@
+"""API 클라이언트 서킷 브레이커 회귀 테스트"""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+openai = pytest.importorskip("openai")
+
+from api_client import APIClient, CircuitBreaker, CircuitOpenError, RetryPolicy  # noqa: E402
+
+
+def _fail(error):
+    raise error
+
+
+def test_non_retryable_error_keeps_breaker_state():
+    client = APIClient("sk-test", base_url="http://127.0.0.1:9/v1", retry=RetryPolicy(max_attempts=1),
+                       breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    with pytest.raises(openai.APIConnectionError):
+        client.call(_fail, error=openai.APIConnectionError(request=None))
+    with pytest.raises(ValueError):
+        client.call(_fail, error=ValueError("잘못된 파라미터"))  # 연속 실패 수를 지우지 않음
+    with pytest.raises(openai.APIConnectionError):
+        client.call(_fail, error=openai.APIConnectionError(request=None))
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+
+def test_release_frees_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow() and not breaker.allow()  # 시험 요청은 하나만
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.allow()
+
+
+@pytest.fixture
+def server():
+    from fake_openai_server import FakeOpenAIServer
+    server = FakeOpenAIServer().start()
+    yield server
+    server.stop()
+
+
+def _wav():
+    from audio_encoding import EncodingConfig, encode_pcm
+    return encode_pcm(bytes(16000 * 2), 1, 2, 16000, EncodingConfig(), name="test")
+
+
+def test_server_error_is_retried_then_succeeds(server):
+    client = APIClient("sk-test", base_url=server.url, retry=RetryPolicy(max_attempts=3, base_delay=0.01))
+    server.fail_next = 1
+    text = client.transcribe(model="whisper-1", file=_wav(), timeout=5).text
+    assert text.startswith("테스트 음성")
+    assert server.errors == 1 and client.retries == 1 and client.breaker.state == CircuitBreaker.CLOSED
+    client.close()
+
+
+def test_breaker_opens_against_failing_server(server):
+    client = APIClient("sk-test", base_url=server.url, retry=RetryPolicy(max_attempts=1),
+                       breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    server.fail_next = 10
+    for _ in range(2):
+        with pytest.raises(openai.InternalServerError):
+            client.chat(model="gpt-4.1", messages=[{"role": "user", "content": "안녕"}])
+    assert client.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        client.chat(model="gpt-4.1", messages=[{"role": "user", "content": "안녕"}])
+    assert server.errors == 2 and client.rejected == 1
+    client.close()
+
+
+def test_retries_stop_at_the_overall_timeout(server):
+    server.latency = 0.3
+    server.fail_next = 100
+    client = APIClient("sk-test", base_url=server.url, retry=RetryPolicy(max_attempts=10, base_delay=0.05,
+                                                                         min_attempt_seconds=0.1))
+    started = time.monotonic()
+    with pytest.raises(openai.APIError):
+        client.transcribe(model="whisper-1", file=_wav(), timeout=1.0)
+    assert time.monotonic() - started < 1.5
+    assert server.errors < 5
+    client.close()
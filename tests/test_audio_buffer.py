@@ -0,0 +1,61 @@
+"""PCMRingBuffer 경계 처리 테스트 (단순 bytearray 기준과 비교)"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_buffer import PCMRingBuffer  # noqa: E402
+
+
+def test_random_writes_match_reference():
+    rng = random.Random(1234)
+    frame_size = 4
+    ring = PCMRingBuffer(capacity_frames=37, frame_size=frame_size)
+    reference = bytearray()  # 지금까지 쓴 전체 바이트
+    for _ in range(500):
+        # 빈 청크, 작은 청크, 경계를 넘는 청크, 용량보다 큰 청크를 섞어서
+        n = rng.choice([0, 1, 3, 7, 36, 37, 38, 80]) * frame_size
+        chunk = bytes(rng.getrandbits(8) for _ in range(n))
+        ring.write(chunk)
+        reference += chunk
+
+        assert ring.total_written == len(reference)
+        assert len(ring) == min(len(reference), ring.capacity)
+        assert bytes(ring.latest()) == bytes(reference[len(reference) - len(ring):])
+        k = rng.randint(0, len(ring) // frame_size) * frame_size
+        assert bytes(ring.latest(k)) == (bytes(reference[-k:]) if k else b"")
+        if len(ring):
+            oldest = len(reference) - len(ring)
+            start = rng.randint(oldest, len(reference))
+            end = rng.randint(start, len(reference))
+            assert bytes(ring.window(start, end)) == bytes(reference[start:end])
+
+
+def test_window_outside_buffer_raises():
+    ring = PCMRingBuffer(capacity_frames=8, frame_size=2)
+    ring.write(bytes(range(20)))
+    with pytest.raises(ValueError):
+        ring.window(0, 4)  # 이미 덮어써짐
+    with pytest.raises(ValueError):
+        ring.window(10, 22)  # 아직 기록되지 않음
+    assert bytes(ring.window(4, 20)) == bytes(range(4, 20))
+
+
+def test_latest_is_frame_aligned_and_clear_resets():
+    ring = PCMRingBuffer(capacity_frames=4, frame_size=2)
+    ring.write(b"abcdef")
+    assert bytes(ring.latest(5)) == b"cdef"
+    ring.clear()
+    assert len(ring) == 0 and bytes(ring.latest()) == b""
+
+
+def test_sync_reads_writes_from_shared_buffer():
+    shared = bytearray(32)
+    writer = PCMRingBuffer(capacity_frames=8, frame_size=2, buffer=shared)
+    reader = PCMRingBuffer(capacity_frames=8, frame_size=2, buffer=shared)
+    writer.write(bytes(range(22)))
+    reader.sync(writer.total_written)
+    assert bytes(reader.latest()) == bytes(range(6, 22))
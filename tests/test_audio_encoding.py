@@ -0,0 +1,51 @@
+"""업로드용 오디오 인코딩 테스트"""
+import os
+import sys
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import audio_encoding  # noqa: E402
+from audio_encoding import EncodingConfig, convert_pcm, encode_pcm, resample  # noqa: E402
+
+
+def _stereo(left, right, frames):
+    samples = np.empty((frames, 2), dtype="<i2")
+    samples[:, 0] = left
+    samples[:, 1] = right
+    return samples.tobytes()
+
+
+def test_resample_length():
+    samples = np.zeros((44100 * 2 + 7, 2), dtype=np.float32)
+    out = resample(samples, 44100, 16000)
+    assert out.shape == ((44100 * 2 + 7) * 16000 // 44100, 2)
+    assert resample(samples, 16000, 16000) is samples
+
+
+def test_mono_downmix_averages_channels():
+    pcm = _stereo(8000, 0, 4410)
+    out = convert_pcm(pcm, 2, 2, 44100, EncodingConfig(sample_rate=44100, channels=1))
+    assert out.shape == (4410, 1)
+    assert np.all(out == 4000)
+
+
+def test_wav_header_matches_config():
+    pcm = _stereo(1000, -1000, 44100 * 3)
+    encoded = encode_pcm(pcm, 2, 2, 44100, EncodingConfig(), name="audio_1")
+    assert encoded.name == "audio_1.wav"
+    with wave.open(encoded, "rb") as wf:
+        assert wf.getframerate() == 16000
+        assert wf.getnchannels() == 1
+        assert wf.getnframes() == 16000 * 3
+
+
+def test_missing_soundfile_falls_back_to_wav(monkeypatch):
+    monkeypatch.setattr(audio_encoding, "_soundfile", False)
+    config = EncodingConfig(container="flac")
+    assert config.container == "wav"
+    assert "soundfile" in config.fallback
+    assert EncodingConfig(container="wav").fallback is None
+    assert encode_pcm(bytes(3200), 1, 2, 16000, config).name.endswith(".wav")
@@ -0,0 +1,48 @@
+"""배치 변환 실패 집계 회귀 테스트"""
+import os
+import sys
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backends  # noqa: E402
+import batch_transcribe  # noqa: E402
+
+RATE = 16000
+
+
+class _FailingBackend(backends.TranscriptionBackend):
+    name = "failing"
+
+    def transcribe(self, audio_file, language="ko", timeout=None):
+        raise RuntimeError("서버 오류")
+
+
+def _write_speech(path):
+    tone = 8000 * np.sin(2 * np.pi * 440 * np.arange(RATE * 3) / RATE)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(np.rint(tone).astype("<i2").tobytes())
+
+
+def test_backend_interface_is_abstract():
+    try:
+        backends.TranscriptionBackend()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("transcribe를 구현하지 않은 백엔드가 만들어짐")
+
+
+def test_failed_segments_exit_non_zero(tmp_path, monkeypatch):
+    wav_path = str(tmp_path / "speech.wav")
+    _write_speech(wav_path)
+    out_path = str(tmp_path / "out.txt")
+    assert batch_transcribe.main([wav_path, "--backend", "local", "-o", out_path]) == 0
+
+    monkeypatch.setitem(backends.BACKENDS, "failing", _FailingBackend)
+    assert batch_transcribe.main([wav_path, "--backend", "failing", "-o", out_path]) == 1
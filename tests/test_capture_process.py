@@ -0,0 +1,66 @@
+"""캡처 프로세스 → 공유 메모리 링 → 메인 프로세스 읽기 테스트 (사운드 장치 없이 fake 소스)"""
+import os
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_process import CaptureProcess, SharedRingWriter  # noqa: E402
+
+RATE = 8000
+
+
+def _ramp_wav(path, seconds=1):
+    """샘플마다 값이 달라서 어긋나거나 빠진 구간을 바로 알 수 있는 WAV"""
+    data = b"".join((i % 30000).to_bytes(2, "little", signed=True) for i in range(RATE * seconds))
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(data)
+    return data
+
+
+def test_fake_source_audio_arrives_in_order_without_gaps(tmp_path):
+    path = str(tmp_path / "ramp.wav")
+    data = _ramp_wav(path)
+    capture = CaptureProcess(rate=RATE, channels=1, frames_per_buffer=256, ring_seconds=2, source="fake",
+                             wav_path=path, name="test-capture").start()
+    try:
+        start = capture._read_pos
+        received = b""
+        deadline = time.monotonic() + 5
+        while len(received) < len(data) * 1.5 and time.monotonic() < deadline:
+            received += capture.read(timeout=0.5)
+    finally:
+        capture.close()
+
+    assert len(received) >= len(data) * 1.5  # 파일 끝에서 처음으로 돌아가는 구간 포함
+    padded = data + bytes(-len(data) % (256 * 2))  # fake 소스는 파일 끝을 청크 크기까지 무음으로 채움
+    looped = padded * 3
+    offset = start % len(padded)
+    assert received == looped[offset:offset + len(received)]
+    assert capture.stats()["reader_overrun_bytes"] == 0
+    assert capture.stats()["callbacks"] > 0
+
+
+def test_lagging_reader_skips_overwritten_audio_and_keeps_copies(tmp_path):
+    capture = CaptureProcess(rate=1000, channels=1, frames_per_buffer=10, ring_seconds=1, source="fake",
+                             name="test-capture-overrun")
+    writer = SharedRingWriter(capture._shm, capture.capacity, capture.frame_size)
+    try:
+        data = bytes(i % 251 for i in range(capture.capacity + 1000))
+        writer.write(data)
+        chunk = capture.read()
+        # 용량을 넘게 밀린 부분과 쓰는 쪽이 덮어쓰는 중일 수 있는 안전 구간은 버림
+        kept = capture.capacity - capture.safety_bytes
+        assert chunk == data[-kept:]
+        assert capture.reader_overrun_bytes == len(data) - kept
+
+        writer.write(bytes(capture.capacity))  # 링 전체를 덮어써도 이미 읽은 청크는 그대로
+        assert chunk == data[-kept:]
+        assert capture.read(max_bytes=100) == bytes(100)
+    finally:
+        writer.release()
+        capture.close()
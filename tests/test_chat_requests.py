@@ -0,0 +1,55 @@
+"""ChatGPT 요청 취소/스트림 정리 테스트"""
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_requests import ChatRequest, ChatRequestManager, RequestCancelled  # noqa: E402
+
+
+class _Stream:
+    def __init__(self, chunks=()):
+        self.chunks = list(chunks)
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+def test_stream_opened_after_cancel_is_closed():
+    request = ChatRequest(0, "텍스트")
+    request.cancel()
+    stream = _Stream()
+    with pytest.raises(RequestCancelled):
+        request.attach_stream(stream)
+    assert stream.closed
+
+
+def test_stream_closed_on_every_exit():
+    manager = ChatRequestManager()
+    streams = []
+    done = threading.Event()
+
+    def call(request, chunks):
+        try:
+            stream = request.attach_stream(_Stream(chunks))
+            streams.append(stream)
+            list(stream)
+        finally:
+            request.close_stream()
+            done.set()
+
+    manager.submit(call, "첫 요청", ["토큰"])
+    assert done.wait(2)
+    assert streams[0].closed
+
+    request = ChatRequest(1, "취소될 요청")
+    stream = request.attach_stream(_Stream())
+    request.cancel()
+    assert stream.closed
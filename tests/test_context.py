@@ -0,0 +1,48 @@
+"""대화 문맥 토큰 예산 회귀 테스트"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context import RollingContext, estimate_tokens  # noqa: E402
+
+
+def test_pending_is_capped_while_summaries_fail():
+    context = RollingContext(token_budget=600, tail_tokens=300, max_pending_tokens=1000)
+    for i in range(3000):
+        context.add(f"오늘 회의 안건 {i}번을 이야기합니다")
+    stats = context.stats()
+    assert stats["pending_tokens"] <= 1000
+    assert stats["dropped_tokens"] > 0
+    assert estimate_tokens(context.prompt_text()) <= 600
+    assert "2999번" in context.prompt_text()
+
+
+def test_oversized_segment_stays_within_budget():
+    context = RollingContext(token_budget=600, tail_tokens=300)
+    context.add("짧은 발언")
+    context.add("아주 긴 발언 " * 400)
+    assert estimate_tokens(context.prompt_text()) <= 600
+    assert context.prompt_text().endswith("아주 긴 발언")
+
+
+def test_summaries_are_batched():
+    calls = []
+
+    def summarize(previous, text, max_tokens):
+        calls.append(text.count("발언"))
+        return "요약"
+
+    context = RollingContext(summarize, token_budget=600, tail_tokens=300, min_summary_tokens=100)
+    segments = 200
+    for i in range(segments):
+        context.add(f"발언 {i}번입니다")  # 구간마다 약 8토큰
+        time.sleep(0.001)
+    deadline = time.monotonic() + 2
+    while context.stats()["pending_tokens"] >= 100 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    context.close()
+    assert calls
+    assert len(calls) < segments / 5
+    assert min(calls) >= 10  # 요청마다 min_summary_tokens(약 11구간)만큼 모아서
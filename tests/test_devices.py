@@ -0,0 +1,73 @@
+"""입력 장치 목록 캐시와 장치 선택 테스트 (PyAudio 대신 가짜 장치 목록 사용)"""
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import devices  # noqa: E402
+from devices import DeviceInfo, find_device  # noqa: E402
+
+DEVICES = [
+    DeviceInfo(0, "마이크 (Realtek Audio)", 2, 48000, 0),
+    DeviceInfo(2, "스테레오 믹스 (Realtek Audio)", 2, 44100, 0),
+    DeviceInfo(5, "CABLE Output (VB-Audio Virtual Cable)", 8, 48000, 1),
+]
+
+
+@pytest.fixture
+def fake_pyaudio(monkeypatch):
+    """PyAudio 인스턴스를 만든 횟수를 세는 가짜 pyaudio 모듈"""
+    infos = [
+        {"name": "마이크 (Realtek Audio)", "maxInputChannels": 2, "defaultSampleRate": 48000.0, "hostApi": 0},
+        {"name": "스피커 (Realtek Audio)", "maxInputChannels": 0, "defaultSampleRate": 48000.0, "hostApi": 0},
+        {"name": "스테레오 믹스 (Realtek Audio)", "maxInputChannels": 2, "defaultSampleRate": 44100.0, "hostApi": 0},
+    ]
+    opened = []
+
+    class PyAudio:
+        def __init__(self):
+            opened.append(self)
+
+        def get_device_count(self):
+            return len(infos)
+
+        def get_device_info_by_index(self, i):
+            return infos[i]
+
+        def terminate(self):
+            pass
+
+    monkeypatch.setitem(sys.modules, "pyaudio", types.SimpleNamespace(PyAudio=PyAudio))
+    monkeypatch.setattr(devices, "_devices", None)
+    return infos, opened
+
+
+def test_device_list_is_queried_once_and_cached(fake_pyaudio):
+    infos, opened = fake_pyaudio
+    first = devices.list_input_devices()
+    assert [(d.index, d.rate) for d in first] == [(0, 48000), (2, 44100)]
+    first.clear()  # 반환된 목록을 바꿔도 캐시는 그대로
+    assert len(devices.list_input_devices()) == 2
+    assert find_device(2).name == "스테레오 믹스 (Realtek Audio)"
+    assert len(opened) == 1
+
+
+def test_refresh_queries_again(fake_pyaudio):
+    infos, opened = fake_pyaudio
+    devices.list_input_devices()
+    infos.append({"name": "USB 마이크", "maxInputChannels": 1, "defaultSampleRate": 16000.0, "hostApi": 0})
+    assert len(devices.list_input_devices()) == 2
+    assert [d.name for d in devices.list_input_devices(refresh=True)][-1] == "USB 마이크"
+    assert len(opened) == 2
+
+
+def test_find_device_by_index_name_or_pattern():
+    assert find_device(5, DEVICES).channels == 8
+    assert find_device(1, DEVICES) is None
+    assert find_device("CABLE Output (VB-Audio Virtual Cable)", DEVICES).index == 5
+    assert find_device(devices.LOOPBACK_PATTERN, DEVICES).index == 2
+    assert find_device("cable output", DEVICES).index == 5
+    assert find_device("없는 장치", DEVICES) is None
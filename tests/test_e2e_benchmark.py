@@ -0,0 +1,46 @@
+"""엔드 투 엔드 벤치마크 도구 테스트 (톤 픽스처, 가짜 Whisper, 단어 지연 계산, 짧은 실행)"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import e2e_benchmark  # noqa: E402
+from e2e_benchmark import VOCABULARY, transcribe_tones, word_latencies, write_tone_fixture  # noqa: E402
+
+
+def test_tone_fixture_is_transcribed_back_to_its_words(tmp_path):
+    path = str(tmp_path / "fixture.wav")
+    ids, ends, seconds = write_tone_fixture(path, sentences=3, seed=1)
+    assert len(ids) == len(ends) and ends == sorted(ends) and ends[-1] < seconds
+    assert int(seconds * e2e_benchmark.RATE) % e2e_benchmark.CHUNK == 0  # 반복 재생 주기가 정확히 맞도록
+
+    with open(path, "rb") as f:
+        body = b"--boundary\r\nContent-Type: audio/wav\r\n\r\n" + f.read()
+    assert transcribe_tones(body).split() == [VOCABULARY[k] for k in ids]
+    assert transcribe_tones(b"no audio") == ""
+
+
+def test_word_latencies_follow_playback_order_across_loops():
+    ids = [0, 1, 2]
+    ends = [1.0, 2.0, 3.0]
+    words = [VOCABULARY[k] for k in ids]
+    shown = [
+        (102.5, f"[10:00:01] {words[0]} {words[1]}"),
+        (104.0, f"[10:00:03] {words[2]} 잡음"),  # 잘못 인식된 단어는 건너뜀
+        (106.0, f"[10:00:05] {words[0]}"),  # 두 번째 바퀴
+    ]
+    latencies, unmatched = word_latencies(shown, ids, ends, loop_seconds=4.0, audio_t0=100.0)
+    assert [round(x, 3) for x in latencies] == [1.5, 0.5, 1.0, 1.0]
+    assert unmatched == 1
+
+
+def test_short_run_reports_words_and_api_calls(monkeypatch):
+    monkeypatch.setenv("OPENAI_BASE_URL", "")  # run이 가짜 서버 주소로 바꾼 값을 테스트 뒤에 되돌림
+    results = e2e_benchmark.run(seconds=6, latency=0.05, trigger_interval=3.0, sample_interval=0.5)
+    assert results["api"]["transcriptions_per_minute"] > 0
+    assert results["api"]["errors"] == 0
+    assert results["transcript"]["lines"] > 0
+    word_latency = results["word_latency"]
+    assert word_latency["words_shown"] > 0
+    assert word_latency["recall"] > 0.5
+    assert word_latency["p50_ms"] > 0
@@ -0,0 +1,89 @@
+"""STT 파이프라인 큐/윈도우 단계 테스트"""
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_buffer import PCMRingBuffer  # noqa: E402
+from pipeline import BLOCK, DROP_NEWEST, DROP_OLDEST, BoundedQueue, WindowStage  # noqa: E402
+from telemetry import REGISTRY  # noqa: E402
+from vad import SpeechSegmenter, VADConfig  # noqa: E402
+
+RATE = 16000
+
+
+def _drain(q):
+    items = []
+    while q.depth:
+        items.append(q.get(timeout=0))
+    return items
+
+
+def test_drop_oldest_keeps_latest_items():
+    q = BoundedQueue(3, DROP_OLDEST)
+    assert all(q.put(i) for i in range(5))
+    assert q.dropped == 2
+    assert _drain(q) == [2, 3, 4]
+
+
+def test_drop_newest_rejects_when_full():
+    q = BoundedQueue(3, DROP_NEWEST)
+    assert [q.put(i) for i in range(5)] == [True, True, True, False, False]
+    assert q.dropped == 2
+    assert _drain(q) == [0, 1, 2]
+
+
+def test_block_waits_for_space_then_times_out():
+    q = BoundedQueue(1, BLOCK, block_timeout=0.5)
+    assert q.put("a")
+    threading.Timer(0.05, q.get).start()
+    assert q.put("b")  # 소비자가 자리를 비울 때까지 기다림
+    started = time.monotonic()
+    q.block_timeout = 0.05
+    assert not q.put("c")
+    assert time.monotonic() - started >= 0.05
+    assert q.dropped == 1
+    assert _drain(q) == ["b"]
+
+
+def test_control_item_is_never_dropped():
+    q = BoundedQueue(2, DROP_NEWEST)
+    q.put(1)
+    q.put(2)
+    q.put_control(None)
+    assert _drain(q) == [2, None]
+    assert q.dropped == 1
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BoundedQueue(1, "drop_random")
+
+
+def test_vad_skipped_requests_and_speech_ratio_are_exported():
+    segmenter = SpeechSegmenter(VADConfig(), RATE, 1)
+    buffer = PCMRingBuffer(RATE * 12, frame_size=2)
+    stage = WindowStage(buffer, threading.Lock(), window_bytes=RATE * 2 * 2, segmenter=segmenter,
+                        name="test-vad-metrics")
+    tone = 8000 * np.sin(2 * np.pi * 440 * np.arange(RATE * 2) / RATE)
+    audio = np.concatenate([np.zeros(RATE * 10), tone, np.zeros(RATE * 2)])
+    pcm = np.rint(audio).astype("<i2").tobytes()
+    windows = []
+    for i in range(0, len(pcm), 2048):
+        window = stage._on_chunk(pcm[i:i + 2048])
+        if window is not None:
+            windows.append(window)
+
+    assert len(windows) == 1
+    skipped = REGISTRY.counter("stt_vad_skipped_requests_total", stage="test-vad-metrics").value
+    assert skipped == segmenter.skipped_windows(RATE * 2 * 2) >= 4
+    speech = REGISTRY.counter("stt_vad_speech_seconds_total", stage="test-vad-metrics").value
+    audio_seconds = REGISTRY.counter("stt_vad_audio_seconds_total", stage="test-vad-metrics").value
+    assert 1.5 <= speech <= 2.5
+    assert 13.5 <= audio_seconds <= 14.0
+    assert abs(REGISTRY.gauge("stt_speech_ratio", stage="test-vad-metrics").value - speech / audio_seconds) < 1e-9
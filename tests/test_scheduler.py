@@ -0,0 +1,58 @@
+"""AdaptiveScheduler가 응답 시간에 맞춰 윈도우 길이/동시 요청 수를 조정하는지 확인"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import AdaptiveScheduler  # noqa: E402
+
+
+def _run(scheduler, rtt, rounds=10, requests_per_second=1.0, backlog=0):
+    """interval마다 요청 결과를 관측하고 다시 계산 (누적 요청 수는 초당 requests_per_second개)"""
+    windows, concurrencies = [], []
+    for i in range(rounds):
+        now = i * scheduler.interval
+        scheduler.observe(scheduler.window, rtt)
+        scheduler.update(backlog=backlog, requests=int(now * requests_per_second), now=now)
+        windows.append(scheduler.window)
+        concurrencies.append(scheduler.concurrency)
+    return windows, concurrencies
+
+
+def test_slow_rtt_shrinks_window_and_raises_concurrency():
+    scheduler = AdaptiveScheduler(window=5.0, concurrency=2, target_latency=6.0, name="test-slow")
+    windows, concurrencies = _run(scheduler, rtt=3.5)
+
+    assert scheduler.window < 5.0
+    assert scheduler.window >= scheduler.min_window
+    assert scheduler.concurrency > 2
+    assert scheduler.concurrency <= scheduler.max_concurrency
+    # 한 번에 max_step 비율보다 크게 바뀌지 않음
+    for before, after in zip([5.0] + windows, windows):
+        assert after >= before * (1 - scheduler.max_step) - 0.01
+
+
+def test_backlog_at_max_concurrency_grows_window():
+    scheduler = AdaptiveScheduler(window=4.0, concurrency=6, max_concurrency=6, name="test-backlog")
+    _run(scheduler, rtt=5.0, rounds=3, backlog=3)
+
+    assert scheduler.concurrency == 6
+    assert scheduler.window > 4.0
+
+
+def test_fast_rtt_stays_within_bounds():
+    scheduler = AdaptiveScheduler(window=5.0, concurrency=3, min_window=2.0, max_window=8.0,
+                                  min_concurrency=1, max_concurrency=4, name="test-fast")
+    windows, concurrencies = _run(scheduler, rtt=0.1, rounds=30, requests_per_second=0.2)
+
+    assert all(2.0 <= w <= 8.0 for w in windows)
+    assert all(1 <= c <= 4 for c in concurrencies)
+    # 빠르면 목표 지연 안에서 윈도우를 늘리고 남는 동시 요청 자리는 줄임
+    assert scheduler.window > 5.0
+    assert scheduler.concurrency < 3
+
+
+def test_no_observation_keeps_settings():
+    scheduler = AdaptiveScheduler(window=5.0, concurrency=3, name="test-empty")
+    assert not scheduler.update(backlog=2, requests=0, now=0.0)
+    assert (scheduler.window, scheduler.concurrency) == (5.0, 3)
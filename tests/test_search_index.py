@@ -0,0 +1,74 @@
+"""검색 색인 n-gram 검색과 저장/불러오기 테스트"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import SearchIndex  # noqa: E402
+from segment_store import Segment  # noqa: E402
+
+TEXTS = ["예산안을 다시 검토합니다", "회의는 세 시에 시작", "예산 삭감 논의", "다음 회의 안건", "Budget review"]
+
+
+def _segments(texts):
+    return [Segment(1000.0 + i, 1001.0 + i, text) for i, text in enumerate(texts)]
+
+
+def _build(texts):
+    index = SearchIndex()
+    for segment in _segments(texts):
+        index.add(segment)
+    return index
+
+
+def _texts(hits):
+    return [segment.text for _, segment in hits]
+
+
+def test_search_matches_substrings_newest_first():
+    index = _build(TEXTS)
+    assert _texts(index.search("예산")) == ["예산 삭감 논의", "예산안을 다시 검토합니다"]
+    assert _texts(index.search("회의 안건")) == ["다음 회의 안건"]
+    assert _texts(index.search("BUDGET")) == ["Budget review"]
+    assert _texts(index.search("예산", limit=1)) == ["예산 삭감 논의"]
+    assert index.search("없는말") == []
+    assert [seg_id for seg_id, _ in index.around(2, before=1, after=1)] == [1, 2, 3]
+
+
+def test_saved_index_loads_and_indexes_only_new_segments(tmp_path):
+    path = str(tmp_path / "session.index.json")
+    _build(TEXTS[:3]).save(path)
+
+    loaded, reindexed = SearchIndex.load(path, _segments(TEXTS))
+    assert reindexed == 2
+    assert len(loaded) == 5
+    assert _texts(loaded.search("회의")) == ["다음 회의 안건", "회의는 세 시에 시작"]
+    assert _texts(loaded.search("예산")) == _texts(_build(TEXTS).search("예산"))
+
+
+def test_mismatched_index_is_rebuilt(tmp_path):
+    path = str(tmp_path / "session.index.json")
+    _build(TEXTS).save(path)
+
+    # 저널이 다른 내용으로 바뀜 (마지막 구간이 다름)
+    changed = TEXTS[:4] + ["전혀 다른 문장"]
+    loaded, reindexed = SearchIndex.load(path, _segments(changed))
+    assert reindexed == 5
+    assert _texts(loaded.search("다른")) == ["전혀 다른 문장"]
+    assert loaded.search("budget") == []
+
+    # 저널이 색인보다 짧음
+    loaded, reindexed = SearchIndex.load(path, _segments(TEXTS[:2]))
+    assert reindexed == 2 and len(loaded) == 2
+
+
+def test_corrupt_or_missing_index_is_rebuilt(tmp_path):
+    path = str(tmp_path / "session.index.json")
+    loaded, reindexed = SearchIndex.load(path, _segments(TEXTS))
+    assert reindexed == 5
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{깨진 파일")
+    loaded, reindexed = SearchIndex.load(path, _segments(TEXTS))
+    assert reindexed == 5
+    assert _texts(loaded.search("삭감")) == ["예산 삭감 논의"]
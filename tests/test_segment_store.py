@@ -0,0 +1,66 @@
+"""구간 저장소 저널/검색 색인 회귀 테스트"""
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import index_path_for  # noqa: E402
+from segment_store import SegmentStore  # noqa: E402
+
+
+def _wait_for_journal(store):
+    """저널 스레드가 앞서 넣은 작업을 모두 처리할 때까지 대기"""
+    done = threading.Event()
+    store.journal.submit(done.set)
+    assert done.wait(5)
+
+
+def test_index_saved_on_journal_thread_reopens_without_reindexing(tmp_path):
+    journal_path = str(tmp_path / "session.jsonl")
+    store = SegmentStore(journal_path=journal_path, index_save_interval=0)
+    for i in range(12):
+        store.append(f"예산안 {i}번 검토", 1000.0 + i, 1001.0 + i)
+    _wait_for_journal(store)
+    assert os.path.exists(index_path_for(journal_path))  # 닫기 전에도 저널 스레드가 저장
+    store.close()
+
+    reopened = SegmentStore(journal_path=journal_path)
+    assert reopened.reindexed == 0
+    assert len(reopened.index) == 12
+    assert [segment.text for _, segment in reopened.search("예산", limit=2)] == ["예산안 11번 검토", "예산안 10번 검토"]
+    reopened.close()
+
+
+def test_index_save_is_debounced_until_close(tmp_path):
+    journal_path = str(tmp_path / "session.jsonl")
+    index_path = index_path_for(journal_path)
+    store = SegmentStore(journal_path=journal_path, index_save_interval=3600)
+    for i in range(500):
+        store.append(f"안건 {i}", 1000.0 + i, 1001.0 + i)
+    _wait_for_journal(store)
+    assert not os.path.exists(index_path)  # 간격이 지나기 전에는 구간 수와 관계없이 저장하지 않음
+
+    store.close()
+    with open(index_path, encoding="utf-8") as f:
+        assert json.load(f)["count"] == 500
+    reopened = SegmentStore(journal_path=journal_path)
+    assert reopened.reindexed == 0
+    reopened.close()
+
+
+def test_reopen_after_crash_indexes_only_segments_after_last_save(tmp_path):
+    journal_path = str(tmp_path / "session.jsonl")
+    store = SegmentStore(journal_path=journal_path, index_save_interval=3600)
+    for i in range(10):
+        store.append(f"예산 {i}", 1000.0 + i, 1001.0 + i)
+    store.save_index()
+    for i in range(10, 15):
+        store.append(f"예산 {i}", 1000.0 + i, 1001.0 + i)
+    store.journal.close()  # 색인을 저장하지 않고 종료된 경우
+
+    reopened = SegmentStore(journal_path=journal_path)
+    assert reopened.reindexed == 5
+    assert len(reopened.search("예산")) == 15
+    reopened.close()
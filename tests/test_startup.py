@@ -0,0 +1,51 @@
+"""시작 시 무거운 모듈을 늦게 로드하는지와 백그라운드 준비 작업 테스트"""
+import os
+import subprocess
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from warmup import Warmup  # noqa: E402
+
+
+def test_importing_app_does_not_load_heavy_modules():
+    # 이미 로드된 모듈이 섞이지 않도록 새 인터프리터에서 확인
+    code = ("import sys, stt_app; "
+            "print(','.join(m for m in ('openai', 'httpx', 'pynput', 'pyaudio', 'soundfile') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_warmup_runs_each_task_once_in_background():
+    warmup = Warmup()
+    release = threading.Event()
+    calls = []
+
+    def task(name):
+        calls.append(name)
+        release.wait(2)
+
+    assert warmup.submit("devices", task, "devices")
+    assert not warmup.submit("devices", task, "again")
+    assert not warmup.wait("devices", timeout=0.05)  # 호출한 쪽을 막지 않음
+    release.set()
+    assert warmup.wait_all(timeout=2)
+    assert calls == ["devices"]
+    assert set(warmup.stats()) == {"devices"}
+    assert warmup.wait("never-submitted")
+
+
+def test_warmup_failure_is_recorded_and_not_raised():
+    warmup = Warmup()
+
+    def fail():
+        raise RuntimeError("장치 없음")
+
+    warmup.submit("devices", fail)
+    warmup.submit("api", lambda: None)
+    assert warmup.wait_all(timeout=2)
+    assert warmup.failed == {"devices"}
+    assert set(warmup.stats()) == {"devices", "api"}
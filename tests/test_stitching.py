@@ -0,0 +1,69 @@
+"""스트리밍 결과 이어 붙이기 리플레이 테스트"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stitching import TranscriptStitcher  # noqa: E402
+
+REFERENCE = ("오늘 회의에서는 다음 분기 예산 계획과 신규 프로젝트 일정에 대해 논의하겠습니다 "
+             "먼저 지난 분기 실적을 간단히 정리하면 매출은 목표 대비 팔 퍼센트 초과 달성했고 "
+             "비용은 예상보다 조금 늘었습니다 다음으로 신규 프로젝트는 삼월 첫째 주에 착수할 예정이며 "
+             "담당자는 이번 주 안에 확정하겠습니다 질문 있으시면 말씀해 주세요").split()
+
+
+def _replay(stitcher, results):
+    output = []
+    for text in results:
+        committed, _ = stitcher.add(text)
+        output.extend(committed.split())
+    output.extend(stitcher.flush().split())
+    return output
+
+
+def _simulated_whisper(words, start, end):
+    """[start, end) 구간의 단어 (앞 경계에 걸친 단어는 빠뜨리고, 끝 경계의 단어는 가끔 잘못 인식)"""
+    out = []
+    for i, (word, t) in enumerate(words):
+        if start <= t and t + 0.3 <= end:
+            out.append(word)
+        elif t < end <= t + 0.3 and i % 3 == 0:
+            out.append(word[:-1] or word)
+    return " ".join(out)
+
+
+def _sliding_windows(hop=1.5, window=6.0):
+    words = [(w, i * 0.4) for i, w in enumerate(REFERENCE)]
+    duration = words[-1][1] + 1.0
+    results = []
+    t = hop
+    while t < duration + hop:
+        results.append(_simulated_whisper(words, max(0.0, t - window), t))
+        t += hop
+    return results
+
+
+def test_agreement_keeps_words_when_window_slides_past_history():
+    results = ["a b c d", "b c d e f", "c d e f g", "d e f g h", "e f g h i j"]
+    stitcher = TranscriptStitcher("agreement")
+    first, provisional = stitcher.add(results[0])
+    assert first == "" and provisional == "a b c d"
+    assert _replay(stitcher, results[1:]) == "a b c d e f g h i j".split()
+
+
+def test_agreement_commits_before_flush():
+    stitcher = TranscriptStitcher("agreement")
+    committed = [stitcher.add(text)[0] for text in ["a b c d", "b c d e f", "c d e f g"]]
+    assert committed == ["", "a b c d", "e f"]
+
+
+def test_sliding_window_replay_reconstructs_reference():
+    # 경계에서 잘못 인식된 단어는 다음 윈도우와 일치하지 않으므로 확정되지 않음
+    output = _replay(TranscriptStitcher("agreement"), _sliding_windows())
+    assert output == REFERENCE
+
+
+def test_overlap_drops_nothing():
+    output = _replay(TranscriptStitcher("overlap"), _sliding_windows())
+    remaining = iter(output)
+    assert all(any(word.startswith(seen) for seen in remaining) for word in REFERENCE)
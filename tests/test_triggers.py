@@ -0,0 +1,85 @@
+"""트리거 디바운스/합치기와 응답 캐시 테스트"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triggers import ResponseCache, TriggerEngine  # noqa: E402
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_burst_is_debounced_into_one_dispatch():
+    calls = []
+    engine = TriggerEngine(calls.append, debounce=0.1, min_interval=0.0).start()
+    try:
+        for _ in range(50):
+            engine.fire("mouse")
+        engine.fire("hotkey")
+        assert _wait_for(lambda: calls)
+        time.sleep(0.2)
+        assert calls == [{"mouse", "hotkey"}]
+        assert engine.stats()["coalesced"] == 50
+    finally:
+        engine.stop()
+
+
+def test_min_interval_coalesces_later_triggers():
+    calls = []
+    engine = TriggerEngine(lambda sources: calls.append(time.monotonic()), debounce=0.0, min_interval=0.3).start()
+    try:
+        engine.fire("mouse")
+        assert _wait_for(lambda: len(calls) == 1)
+        engine.fire("mouse")
+        engine.fire("speech_end")
+        assert _wait_for(lambda: len(calls) == 2)
+        assert calls[1] - calls[0] >= 0.29
+        assert engine.stats()["rate_limited"] == 1
+    finally:
+        engine.stop()
+
+
+def test_concurrent_fires_are_all_counted():
+    sources = []
+    engine = TriggerEngine(sources.append, debounce=0.0, min_interval=0.0).start()
+    try:
+        def fire(name):
+            for _ in range(2000):
+                engine.fire(name)
+
+        threads = [threading.Thread(target=fire, args=(f"source{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert _wait_for(lambda: engine.seen == 8000 and engine.stats()["dispatched"]
+                         and set().union(*sources) == {f"source{i}" for i in range(4)})
+    finally:
+        engine.stop()
+
+
+def test_cache_normalizes_and_expires():
+    cache = ResponseCache(ttl=0.05)
+    cache.put("발언:  안녕하세요 ", "응답")
+    assert cache.get("발언: 안녕하세요") == "응답"
+    time.sleep(0.06)
+    assert cache.get("발언: 안녕하세요") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evicted"] == 1
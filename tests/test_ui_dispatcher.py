@@ -0,0 +1,100 @@
+"""UIDispatcher 배치 처리/덮어쓰기 이벤트 합치기 테스트"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui_dispatcher import UIDispatcher  # noqa: E402
+
+
+class FakeRoot:
+    """after로 예약된 콜백을 모아 두었다가 tick()에서 실행 (Tk 메인 루프 대신)"""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, func, *args):
+        self.pending.append((func, args))
+
+    def tick(self):
+        pending, self.pending = self.pending, []
+        for func, args in pending:
+            func(*args)
+
+
+def test_events_from_threads_are_handled_on_tick_in_order():
+    root = FakeRoot()
+    dispatcher = UIDispatcher(root, max_fps=60)
+    handled = []
+    dispatcher.register("line", handled.append)
+    dispatcher.start()
+
+    threads = [threading.Thread(target=lambda: [dispatcher.post("line", i) for i in range(100)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert handled == []  # post는 메인 루프를 기다림
+    root.tick()
+
+    assert len(handled) == 400 and dispatcher.handled == 400
+    assert dispatcher.batches == 1
+    assert sorted(handled) == sorted(list(range(100)) * 4)
+
+
+def test_max_batch_limits_work_per_tick():
+    root = FakeRoot()
+    dispatcher = UIDispatcher(root, max_batch=10)
+    handled = []
+    dispatcher.register("line", handled.append)
+    dispatcher.start()
+    for i in range(25):
+        dispatcher.post("line", i)
+
+    root.tick()
+    assert handled == list(range(10))
+    root.tick()
+    root.tick()
+    assert handled == list(range(25))
+    assert dispatcher.batches == 3 and dispatcher.max_depth == 25
+
+
+def test_coalesced_kind_keeps_only_last_event_per_batch():
+    root = FakeRoot()
+    dispatcher = UIDispatcher(root)
+    lines, partials = [], []
+    dispatcher.register("line", lines.append)
+    dispatcher.register("partial", partials.append, coalesce=True)
+    dispatcher.start()
+    for i in range(5):
+        dispatcher.post("partial", f"p{i}")
+        dispatcher.post("line", i)
+    root.tick()
+
+    assert partials == ["p4"]
+    assert lines == list(range(5))
+    assert dispatcher.coalesced == 4
+
+
+def test_handler_error_does_not_stop_batch_and_stop_ends_loop():
+    root = FakeRoot()
+    dispatcher = UIDispatcher(root)
+    handled = []
+
+    def handler(value):
+        if value == 1:
+            raise RuntimeError("실패")
+        handled.append(value)
+
+    dispatcher.register("line", handler)
+    dispatcher.start()
+    for i in range(3):
+        dispatcher.post("line", i)
+    root.tick()
+    assert handled == [0, 2]
+
+    dispatcher.stop()
+    dispatcher.post("line", 3)
+    root.tick()
+    assert handled == [0, 2] and root.pending == []
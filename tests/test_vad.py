@@ -0,0 +1,40 @@
+"""VAD 구간 분할 회귀 테스트"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vad import SpeechSegmenter, VADConfig, iter_segments  # noqa: E402
+
+RATE = 16000
+
+
+def _tone_then_hum():
+    """9.6초 톤 뒤에 작은 험 (가장 조용한 지점이 톤 끝 + 여유(0.2초)보다 뒤, 최대 길이 10초 직전)"""
+    tone = 8000 * np.sin(2 * np.pi * 440 * np.arange(int(RATE * 9.6)) / RATE)
+    t = np.arange(RATE * 3) / RATE
+    hum = (2 + 200 * np.abs(t - 0.27)) * np.sin(2 * np.pi * 50 * t)
+    return np.rint(np.concatenate([tone, hum])).astype("<i2").tobytes()
+
+
+def test_forced_cut_after_padding_keeps_segments_ordered():
+    segmenter = SpeechSegmenter(VADConfig(), RATE, 1)
+    segments = segmenter.feed(_tone_then_hum())
+    flushed = segmenter.flush()
+    if flushed:
+        segments.append(flushed)
+    assert segments
+    for start, end in segments:
+        assert start <= end
+    # 절단 뒤의 조용한 험은 음성으로 세지 않으므로 빈 구간을 따로 내보내지 않음
+    assert all(end - start > 0 for start, end in segments)
+
+
+def test_iter_segments_does_not_raise_on_forced_cut():
+    pcm = _tone_then_hum()
+    chunks = [pcm[i:i + 4096] for i in range(0, len(pcm), 4096)]
+    segments = list(iter_segments(chunks, RATE, 1, VADConfig()))
+    assert segments[0][0] == 0
+    assert all(start <= end for start, end, _ in segments)
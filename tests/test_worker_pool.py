@@ -0,0 +1,45 @@
+"""순서 보장 작업 풀 시간 초과 회귀 테스트"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from worker_pool import OrderedWorkerPool  # noqa: E402
+
+
+def test_timed_out_requests_free_their_slots():
+    hang = threading.Event()
+    results = []
+
+    def work(item):
+        if item < 2:
+            hang.wait(5)
+        return item
+
+    pool = OrderedWorkerPool(work, lambda item, result: results.append(result), max_workers=2, timeout=0.2)
+    started = time.monotonic()
+    for item in range(6):
+        pool.submit(item)
+    pool.close(timeout=3)
+    assert time.monotonic() - started < 2
+    assert results == [None, None, 2, 3, 4, 5]
+    assert pool.timeouts == 2 and pool.in_flight == 0 and pool.abandoned == 2
+    hang.set()
+
+
+def test_abandoned_requests_are_capped():
+    hang = threading.Event()
+    pool = OrderedWorkerPool(lambda item: hang.wait(5), lambda item, result: None,
+                             max_workers=1, timeout=0.1, max_abandoned=1)
+    pool.submit(0)
+    pool.submit(1)  # 0번이 시간 초과되어 자리를 비운 뒤 들어감
+    blocked = threading.Thread(target=pool.submit, args=(2,), daemon=True)
+    blocked.start()
+    blocked.join(0.5)
+    assert blocked.is_alive()  # 여분 스레드가 다 차면 새 요청은 대기
+    hang.set()
+    blocked.join(2)
+    assert not blocked.is_alive()
+    pool.close(timeout=2)
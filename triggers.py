@@ -0,0 +1,171 @@
+"""AI 응답 요청 트리거 (디바운스 + 최소 간격 + 합치기) 와 응답 캐시
+
+마우스 이동, 단축키, 말 끝남(VAD) 등 여러 곳에서 트리거가 들어온다.
+fire()는 마우스 콜백처럼 초당 수백 번 불리는 곳에서 쓰므로 짧은 락 안에서 기록하고 이벤트 set만 한다.
+실제 판단은 백그라운드 스레드가 한다:
+- debounce 동안 새 트리거가 없을 때 한 번만 실행 (그 사이 들어온 트리거는 합쳐짐)
+- 마지막 실행 후 min_interval이 지나기 전에는 실행하지 않음
+"""
+import collections
+import re
+import threading
+import time
+
+
+class TriggerEngine:
+    def __init__(self, on_fire, debounce=0.3, min_interval=2.0):
+        self.on_fire = on_fire  # on_fire(sources): sources는 합쳐진 트리거 종류 집합
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self._wake = threading.Event()
+        self._last_fire = 0.0
+        self._last_dispatch = 0.0
+        self._sources = set()
+        self._pending = 0  # 마지막 실행 이후 들어온 트리거 수
+        self._counted = 0  # 이미 처리한 트리거 수
+        self._lock = threading.Lock()  # fire()와 실행 스레드의 꺼내기 사이에 트리거가 사라지지 않게
+        self._running = False
+        self._thread = None
+
+        # 통계
+        self.coalesced = 0
+        self.rate_limited = 0
+        self.dispatched = 0
+
+    def fire(self, source):
+        """트리거 발생 (아무 스레드에서나, 매우 자주 불려도 됨)"""
+        with self._lock:
+            self._last_fire = time.monotonic()
+            self._sources.add(source)
+            self._pending += 1
+        if not self._wake.is_set():
+            self._wake.set()
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="trigger-engine", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        while self._running:
+            self._wake.wait()
+            if not self._running:
+                return
+
+            # 디바운스: 마지막 트리거 후 debounce만큼 조용해질 때까지 대기
+            while self._running:
+                quiet = time.monotonic() - self._last_fire
+                if quiet >= self.debounce:
+                    break
+                time.sleep(self.debounce - quiet)
+
+            # 최소 간격: 너무 자주 요청하지 않음 (기다리는 동안 들어온 트리거도 합쳐짐)
+            wait = self._last_dispatch + self.min_interval - time.monotonic()
+            if wait > 0:
+                self.rate_limited += 1
+                time.sleep(wait)
+            if not self._running:
+                return
+
+            with self._lock:
+                self._wake.clear()
+                sources, self._sources = self._sources, set()
+                pending, self._pending = self._pending, 0
+                self._counted += pending
+            if not sources:
+                continue  # 직전 실행에 이미 합쳐진 트리거
+            self.coalesced += max(0, pending - 1)
+            self._last_dispatch = time.monotonic()
+            self.dispatched += 1
+            try:
+                self.on_fire(sources)
+            except Exception as e:
+                print(f"[ERROR] 트리거 처리 오류: {str(e)}")
+
+    @property
+    def seen(self):
+        with self._lock:
+            return self._counted + self._pending
+
+    def stats(self):
+        return {
+            "seen": self.seen,
+            "coalesced": self.coalesced,
+            "rate_limited": self.rate_limited,
+            "dispatched": self.dispatched,
+        }
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text):
+    """캐시 키: 공백 정리 + 소문자"""
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+class ResponseCache:
+    """정규화한 프롬프트 → 응답 (LRU + TTL)"""
+
+    def __init__(self, max_entries=64, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()  # key -> (저장 시각, 응답)
+        self._lock = threading.Lock()
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def get(self, prompt):
+        key = normalize_prompt(prompt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, response = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, prompt, response):
+        key = normalize_prompt(prompt)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
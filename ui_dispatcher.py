@@ -0,0 +1,136 @@
+"""워커 스레드 → Tk 메인 루프 UI 업데이트 전달
+
+Tk 위젯은 메인 스레드에서만 만져야 한다. 워커 스레드는 post()로 작은 이벤트만 큐에 넣고,
+메인 루프가 max_fps 주기로 큐를 비우면서 한 번에 몰아서 처리한다.
+coalesce=True로 등록한 이벤트(상태 표시, 응답 전체 교체 등)는 한 번의 처리 주기 안에서
+마지막 것만 반영한다.
+"""
+import collections
+import time
+
+from telemetry import REGISTRY
+
+_EVENT_LATENCY = REGISTRY.histogram("ui_event_latency_seconds", "워커 스레드 post → 메인 루프 처리까지 시간 (초)")
+
+
+class UIDispatcher:
+    def __init__(self, root, max_fps=30, max_batch=500):
+        self.root = root
+        self.interval_ms = max(1, int(1000 / max_fps))
+        self.max_batch = max_batch
+        self._queue = collections.deque()  # append/popleft는 스레드 안전
+        self._handlers = {}
+        self._coalesce = set()
+        self._running = False
+        REGISTRY.gauge("ui_queue_depth", "메인 루프 처리를 기다리는 UI 이벤트 수", func=lambda: len(self._queue))
+
+        # 통계
+        self.posted = 0
+        self.handled = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.latencies = collections.deque(maxlen=1000)  # post → 처리까지 걸린 시간 (초)
+
+    def register(self, kind, handler, coalesce=False):
+        """kind 이벤트를 처리할 handler(*args) 등록 (메인 스레드에서 호출됨)"""
+        self._handlers[kind] = handler
+        if coalesce:
+            self._coalesce.add(kind)
+
+    def post(self, kind, *args):
+        """아무 스레드에서나 호출 가능"""
+        self._queue.append((kind, args, time.perf_counter()))
+        self.posted += 1
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        self._running = False
+
+    def _drain(self):
+        if not self._running:
+            return
+        depth = len(self._queue)
+        self.max_depth = max(self.max_depth, depth)
+        if depth:
+            self.flush(min(depth, self.max_batch))
+        self.root.after(self.interval_ms, self._drain)
+
+    def flush(self, limit=None):
+        """큐에 쌓인 이벤트를 최대 limit개 처리 (메인 스레드에서만 호출)"""
+        events = []
+        for _ in range(limit if limit is not None else len(self._queue)):
+            try:
+                events.append(self._queue.popleft())
+            except IndexError:
+                break
+        if not events:
+            return
+
+        # 덮어쓰기 이벤트는 마지막 것만 남김
+        last_index = {}
+        for i, (kind, _, _) in enumerate(events):
+            if kind in self._coalesce:
+                last_index[kind] = i
+
+        now = time.perf_counter()
+        for i, (kind, args, posted_at) in enumerate(events):
+            if kind in last_index and last_index[kind] != i:
+                self.coalesced += 1
+                continue
+            handler = self._handlers.get(kind)
+            if handler is None:
+                print(f"[ERROR] 등록되지 않은 UI 이벤트: {kind}")
+                continue
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"[ERROR] UI 이벤트 '{kind}' 처리 오류: {str(e)}")
+            self.handled += 1
+            self.latencies.append(now - posted_at)
+            _EVENT_LATENCY.observe(now - posted_at)
+        self.batches += 1
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+        return {
+            "posted": self.posted,
+            "handled": self.handled,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "latency_avg_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "latency_p95_ms": p95 * 1000,
+            "latency_max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+
+def append_line(widget, line, max_lines=None, tag=None):
+    """Text 위젯 끝에 한 줄 추가하고 max_lines를 넘는 앞줄은 삭제 (전체 다시 그리지 않음)"""
+    if widget.index("end-1c") != "1.0":
+        line = "\n" + line
+    if tag:
+        widget.insert("end", line, tag)
+    else:
+        widget.insert("end", line)
+    if max_lines:
+        line_count = int(widget.index("end-1c").split(".")[0])
+        if line_count > max_lines:
+            widget.delete("1.0", f"{line_count - max_lines + 1}.0")
+    widget.see("end")
+
+
+def replace_tagged(widget, tag, text):
+    """tag가 붙은 영역(끝에 있는 임시 텍스트 등)만 새 텍스트로 교체"""
+    ranges = widget.tag_ranges(tag)
+    if ranges:
+        widget.delete(ranges[0], ranges[-1])
+    if text:
+        widget.insert("end", text, tag)
+    widget.see("end")
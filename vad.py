@@ -0,0 +1,218 @@
+"""에너지/영교차율(ZCR) 기반 음성 구간 검출(VAD)과 발화 단위 분할
+
+프레임 특징은 numpy로 한 번에 계산하고, 프레임별 상태 전이만 파이썬 루프로 처리한다.
+무음 구간은 STT로 보내지 않고, 발화 사이의 쉼에서 구간을 끊어서 단어가 잘리지 않게 한다.
+"""
+import numpy as np
+
+from audio_buffer import PCMRingBuffer
+
+
+class VADConfig:
+    """VAD 및 구간 분할 설정 (시간 단위는 초)"""
+
+    def __init__(self, frame_seconds=0.03, energy_threshold_db=-45.0, max_zcr=0.5,
+                 pause_seconds=0.5, max_pause_seconds=2.0, min_segment_seconds=1.0,
+                 max_segment_seconds=10.0, min_speech_seconds=0.1, padding_seconds=0.2):
+        self.frame_seconds = frame_seconds
+        self.energy_threshold_db = energy_threshold_db  # 이 값(dBFS)보다 큰 프레임만 음성 후보
+        self.max_zcr = max_zcr  # 영교차율이 이보다 높으면 잡음(치찰음/히스)으로 간주
+        self.pause_seconds = pause_seconds  # 이만큼 조용하면 구간을 닫음
+        self.max_pause_seconds = max_pause_seconds  # 최소 길이 미달이어도 이만큼 조용하면 닫음
+        self.min_segment_seconds = min_segment_seconds
+        self.max_segment_seconds = max_segment_seconds  # 넘으면 가장 조용한 지점에서 강제로 자름
+        self.min_speech_seconds = min_speech_seconds  # 음성 프레임 합이 이보다 짧으면 버림 (클릭음 등)
+        self.padding_seconds = padding_seconds  # 구간 앞뒤로 붙이는 여유
+
+
+def frame_features(samples, frame_length):
+    """모노 float 샘플을 프레임으로 나눠 (RMS dBFS, 영교차율) 배열을 반환"""
+    n_frames = len(samples) // frame_length
+    frames = samples[:n_frames * frame_length].reshape(n_frames, frame_length)
+    rms = np.sqrt(np.mean(frames * frames, axis=1)) / 32768.0
+    db = 20 * np.log10(np.maximum(rms, 1e-10))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_length - 1)
+    return db, zcr
+
+
+def speech_mask(db, zcr, config):
+    """프레임별 음성 여부 (bool 배열)"""
+    return (db > config.energy_threshold_db) & (zcr < config.max_zcr)
+
+
+class SpeechSegmenter:
+    """연속으로 들어오는 16bit PCM에서 발화 구간 [start, end) (절대 바이트 위치)을 잘라냄
+
+    start_byte는 첫 feed 데이터의 절대 위치 (링 버퍼의 total_written과 맞춰서 사용).
+    """
+
+    def __init__(self, config, rate, channels, start_byte=0):
+        self.config = config
+        self.channels = channels
+        self.frame_length = max(1, int(rate * config.frame_seconds))
+        self.frame_bytes = self.frame_length * channels * 2
+        self.bytes_per_second = rate * channels * 2
+        # 구간 최대 길이 (적응형 스케줄러가 녹음 중에 바꿀 수 있도록 설정과 별도로 보관)
+        self.max_segment_bytes = self._seconds_to_bytes(config.max_segment_seconds)
+
+        self._pending = bytearray()
+        self._pos = start_byte  # _pending 첫 바이트의 절대 위치
+
+        # 현재 열린 구간 상태
+        self._seg_start = None
+        self._seg_frames = []  # (프레임 끝 위치, dB, 음성 여부) - 강제 절단 지점 탐색용
+        self._speech_frames = 0
+        self._last_speech_end = None
+        self._silence_bytes = 0
+        self.last_speech_byte = start_byte  # 마지막 음성 프레임의 끝 위치 (구간과 무관하게 유지)
+
+        # 통계
+        self.total_bytes = 0
+        self.speech_bytes = 0
+        self.segment_bytes = 0  # STT로 보낸 구간의 바이트 합
+        self.segments = 0
+        self.discarded = 0  # 너무 짧아서 버린 구간 (클릭음 등)
+
+    def _seconds_to_bytes(self, seconds):
+        frames = int(seconds * self.bytes_per_second) // (self.channels * 2)
+        return frames * self.channels * 2
+
+    @property
+    def speech_ratio(self):
+        return self.speech_bytes / self.total_bytes if self.total_bytes else 0.0
+
+    def feed(self, data):
+        """PCM 청크를 넣고 새로 닫힌 구간 목록 [(start, end), ...]을 반환"""
+        self._pending += data
+        n_frames = len(self._pending) // self.frame_bytes
+        if n_frames == 0:
+            return []
+
+        used = n_frames * self.frame_bytes
+        samples = np.frombuffer(self._pending, dtype="<i2", count=used // 2).astype(np.float32)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        db, zcr = frame_features(samples, self.frame_length)
+        is_speech = speech_mask(db, zcr, self.config)
+        del self._pending[:used]
+
+        segments = []
+        for i in range(n_frames):
+            frame_start = self._pos
+            self._pos += self.frame_bytes
+            self.total_bytes += self.frame_bytes
+            segment = self._step(frame_start, self._pos, bool(is_speech[i]), float(db[i]))
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def _step(self, frame_start, frame_end, speech, db):
+        cfg = self.config
+        if speech:
+            self.speech_bytes += self.frame_bytes
+            self.last_speech_byte = frame_end
+
+        if self._seg_start is None:
+            if not speech:
+                return None
+            self._seg_start = max(frame_start - self._seconds_to_bytes(cfg.padding_seconds), 0)
+            self._seg_frames = []
+            self._speech_frames = 0
+            self._silence_bytes = 0
+
+        self._seg_frames.append((frame_end, db, speech))
+        if speech:
+            self._speech_frames += 1
+            self._last_speech_end = frame_end
+            self._silence_bytes = 0
+        else:
+            self._silence_bytes += self.frame_bytes
+
+        length = frame_end - self._seg_start
+        if self._silence_bytes >= self._seconds_to_bytes(cfg.pause_seconds):
+            long_enough = length >= self._seconds_to_bytes(cfg.min_segment_seconds)
+            if long_enough or self._silence_bytes >= self._seconds_to_bytes(cfg.max_pause_seconds):
+                end = min(self._last_speech_end + self._seconds_to_bytes(cfg.padding_seconds), frame_end)
+                return self._close(end)
+        elif length >= self.max_segment_bytes:
+            return self._close(self._quietest_cut(), carry=True)
+        return None
+
+    def _quietest_cut(self):
+        """최근 1초 안에서 가장 조용한 프레임 끝을 절단 지점으로 선택"""
+        window = self._seg_frames[-max(1, int(1.0 / self.config.frame_seconds)):]
+        return min(window, key=lambda item: item[1])[0]
+
+    def _close(self, end, carry=False):
+        """구간을 end에서 닫음. carry=True면 end 이후 프레임으로 새 구간을 바로 이어서 시작"""
+        start = self._seg_start
+        end = max(end, start)  # 절단 지점이 마지막 음성 + 여유보다 뒤였어도 빈 구간이 거꾸로 되지 않게
+        remaining = [frame for frame in self._seg_frames if frame[0] > end]
+        speech_seconds = (self._speech_frames - sum(1 for frame in remaining if frame[2])) * self.config.frame_seconds
+
+        if carry:
+            # 절단 지점 이후 프레임으로 새 구간 상태를 다시 계산 (음성 프레임 수, 끝의 무음 길이, 마지막 음성 위치)
+            self._seg_start = end
+            self._seg_frames = remaining
+            self._speech_frames = sum(1 for frame in remaining if frame[2])
+            speech_ends = [frame[0] for frame in remaining if frame[2]]
+            self._last_speech_end = speech_ends[-1] if speech_ends else end
+            trailing = 0
+            for frame in reversed(remaining):
+                if frame[2]:
+                    break
+                trailing += 1
+            self._silence_bytes = trailing * self.frame_bytes
+        else:
+            self._seg_start = None
+            self._seg_frames = []
+            self._last_speech_end = None
+
+        if speech_seconds < self.config.min_speech_seconds:
+            self.discarded += 1
+            return None
+        self.segments += 1
+        self.segment_bytes += end - start
+        return (start, end)
+
+    def flush(self):
+        """열려 있는 구간을 닫아서 반환 (녹음 종료 시)"""
+        if self._seg_start is None or self._last_speech_end is None:
+            return None
+        end = min(self._last_speech_end + self._seconds_to_bytes(self.config.padding_seconds), self._pos)
+        return self._close(max(end, self._seg_start))
+
+    @property
+    def silent_bytes(self):
+        """STT로 보내지 않은 바이트 수 (열려 있는 구간 제외)"""
+        open_bytes = self._pos - self._seg_start if self._seg_start is not None else 0
+        return max(self.total_bytes - self.segment_bytes - open_bytes, 0)
+
+    def skipped_windows(self, window_bytes):
+        """고정 윈도우 방식이었다면 보냈을 무음 요청 수 (추정)"""
+        return int(self.silent_bytes // window_bytes) if window_bytes else 0
+
+
+def iter_segments(chunks, rate, channels, config):
+    """PCM 청크 이터러블에서 발화 구간을 (start_byte, end_byte, pcm) 으로 차례로 내보냄
+
+    파일/표준 입력처럼 끝이 있는 입력용. 가장 긴 구간만큼의 링 버퍼만 쓰므로
+    입력 길이와 관계없이 메모리 사용량이 일정하다.
+    """
+    frame_size = channels * 2
+    capacity = int(rate * (config.max_segment_seconds + config.padding_seconds * 2 + 1))
+    buffer = PCMRingBuffer(capacity, frame_size)
+    segmenter = SpeechSegmenter(config, rate, channels)
+
+    def cut(start, end):
+        start = max(start, buffer.total_written - len(buffer))
+        return start, end, bytes(buffer.window(start, end))
+
+    for chunk in chunks:
+        buffer.write(chunk)
+        for start, end in segmenter.feed(chunk):
+            yield cut(start, end)
+    segment = segmenter.flush()
+    if segment:
+        yield cut(*segment)
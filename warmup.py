@@ -0,0 +1,66 @@
+"""창을 띄운 뒤 백그라운드에서 미리 해 두는 준비 작업
+
+창이 뜨기 전에 무거운 모듈(openai, pynput, pyaudio)을 로드하거나 API 연결을 맺으면 시작이 느리고,
+첫 녹음 때 하면 첫 전사가 늦어진다. 그래서 창이 보인 직후 이 작업들을 백그라운드 스레드에서 실행한다.
+
+    warmup = Warmup()
+    warmup.submit("devices", list_input_devices)
+    warmup.submit("api", lambda: get_client(api_key).warm_up())
+
+작업은 이름별로 한 번만 실행된다. 쓰는 쪽은 기다릴 필요 없이 평소처럼 호출하면 되고
+(장치 목록/클라이언트는 캐시되어 있거나, 준비 중이면 그 락에서 잠깐 기다림), 실패해도 그때 다시 시도된다.
+"""
+import threading
+import time
+
+from telemetry import REGISTRY, trace
+
+
+class Warmup:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._done = {}  # 이름 -> threading.Event
+        self.seconds = {}  # 이름 -> 걸린 시간 (초)
+        self.failed = set()
+
+    def submit(self, name, func, *args):
+        """func(*args)를 백그라운드 스레드에서 실행 (같은 이름이 이미 있으면 무시하고 False)"""
+        with self._lock:
+            if name in self._done:
+                return False
+            self._done[name] = threading.Event()
+        threading.Thread(target=self._run, args=(name, func, args), name=f"warmup-{name}", daemon=True).start()
+        return True
+
+    def _run(self, name, func, args):
+        started = time.perf_counter()
+        ok = True
+        try:
+            func(*args)
+        except Exception as e:
+            ok = False
+            self.failed.add(name)
+            print(f"[ERROR] 미리 준비 '{name}' 실패 (필요할 때 다시 시도): {str(e)}")
+        elapsed = time.perf_counter() - started
+        self.seconds[name] = elapsed
+        REGISTRY.gauge("stt_warmup_seconds", "시작 후 백그라운드 준비 작업 시간 (초)", task=name).set(elapsed)
+        trace("warmup", elapsed, task=name, ok=ok)
+        print(f"[DEBUG] 미리 준비 '{name}' 완료: {elapsed * 1000:.0f}ms")
+        self._done[name].set()
+
+    def wait(self, name, timeout=None):
+        """작업이 끝날 때까지 대기 (제출되지 않은 이름이면 바로 True)"""
+        event = self._done.get(name)
+        return event.wait(timeout) if event is not None else True
+
+    def wait_all(self, timeout=None):
+        """지금까지 제출된 작업이 모두 끝날 때까지 대기 (벤치마크/테스트용)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for event in list(self._done.values()):
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not event.wait(remaining):
+                return False
+        return True
+
+    def stats(self):
+        return {name: round(seconds * 1000, 1) for name, seconds in self.seconds.items()}
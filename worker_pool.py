@@ -0,0 +1,188 @@
+"""여러 요청을 동시에 처리하고 결과는 제출한 순서대로 돌려주는 작업 풀
+
+STT 요청은 응답 시간이 들쭉날쭉해서 한 번에 하나씩 보내면 뒤처지기 쉽다.
+OrderedWorkerPool은 최대 max_workers개의 요청을 동시에 진행하되, 결과는 내부 순번으로
+다시 정렬해서 on_result를 항상 제출 순서대로 (한 번에 하나씩) 호출한다.
+timeout 안에 끝나지 않은 요청은 건너뛰고(on_result에 None 전달) 뒤 결과를 막지 않는다.
+시간 초과된 요청은 동시 실행 자리도 바로 비우므로 응답 없는 요청 몇 개가 새 요청을 막지 않는다
+(끝날 때까지 스레드는 차지하므로 이런 요청은 max_abandoned개까지만 허용).
+마감 시각은 요청마다 타이머 스레드를 만들지 않고 힙 하나를 스레드 하나가 확인한다.
+동시 실행 수는 실행 중에 set_max_workers로 바꿀 수 있다 (max_limit까지).
+"""
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_TIMED_OUT = object()
+
+
+class OrderedWorkerPool:
+    """func(item)을 병렬로 실행하고 on_result(item, result)를 제출 순서대로 호출
+
+    func에서 예외가 나거나 timeout이 지나면 result는 None.
+    """
+
+    def __init__(self, func, on_result, max_workers=3, timeout=30.0, name="worker", max_limit=None,
+                 max_abandoned=None):
+        self.func = func
+        self.on_result = on_result
+        self.max_limit = max(max_limit or max_workers, max_workers)  # set_max_workers의 상한 (스레드 수)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.name = name
+        # 시간 초과 후에도 끝나지 않은 요청을 위한 여분 스레드 수 (다 차면 submit이 다시 대기)
+        self.max_abandoned = self.max_limit if max_abandoned is None else max_abandoned
+        self._threads = self.max_limit + self.max_abandoned
+        self._executor = ThreadPoolExecutor(max_workers=self._threads, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._deliver_lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._slot_free = threading.Condition(self._lock)
+        self._deadline_changed = threading.Condition(self._lock)
+        self._deadlines = []  # (마감 시각, 순번) 힙
+        self._running = set()  # 진행 중이고 아직 시간 초과되지 않은 순번
+        self._expired = set()  # 시간 초과로 자리를 비웠지만 아직 스레드를 차지하는 순번
+        self._closed = False
+        self._items = {}  # 순번 -> 아이템 (아직 전달 안 된 것)
+        self._results = {}  # 순번 -> 결과 (완료됐지만 앞 순번을 기다리는 것)
+        self._next_submit = 0
+        self._next_deliver = 0
+
+        # 통계
+        self.in_flight = 0  # 동시 실행 자리를 차지한 요청 수 (시간 초과된 요청 제외)
+        self.blocked = 0  # 자리가 나기를 기다리는 submit 호출 수
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+
+        self._deadline_thread = threading.Thread(target=self._watch_deadlines, name=f"{name}-deadline", daemon=True)
+        self._deadline_thread.start()
+
+    @property
+    def waiting(self):
+        """완료됐지만 앞 순번 때문에 전달을 기다리는 결과 수"""
+        return len(self._results)
+
+    @property
+    def abandoned(self):
+        """시간 초과됐지만 아직 끝나지 않아 스레드를 차지하는 요청 수"""
+        return len(self._expired)
+
+    def _has_slot(self):
+        return self.in_flight < self.max_workers and self.in_flight + len(self._expired) < self._threads
+
+    def submit(self, item):
+        """작업 제출 (동시 실행 수가 가득 차면 자리가 날 때까지 대기)"""
+        with self._lock:
+            if not self._has_slot():
+                self.blocked += 1
+                self._slot_free.wait_for(self._has_slot)
+                self.blocked -= 1
+            seq = self._next_submit
+            self._next_submit += 1
+            self._items[seq] = item
+            self.in_flight += 1
+            self._running.add(seq)
+            heapq.heappush(self._deadlines, (time.monotonic() + self.timeout, seq))
+            self._deadline_changed.notify()
+        future = self._executor.submit(self.func, item)
+        future.add_done_callback(lambda f: self._complete(seq, f))
+        return seq
+
+    def set_max_workers(self, max_workers):
+        """동시 실행 수 변경 (1 ~ max_limit). 줄일 때 이미 진행 중인 요청은 그대로 끝까지 진행"""
+        with self._lock:
+            self.max_workers = max(1, min(int(max_workers), self.max_limit))
+            self._slot_free.notify_all()
+        return self.max_workers
+
+    def _complete(self, seq, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"[ERROR] 작업 풀 '{self.name}' 요청 #{seq} 실패: {str(e)}")
+            result = None
+            failed = True
+        else:
+            failed = False
+        with self._lock:
+            if seq in self._expired:
+                self._expired.discard(seq)  # 이미 건너뛴 요청: 스레드만 돌려받음
+                self._slot_free.notify_all()
+                return
+            self._running.discard(seq)
+            self.in_flight -= 1
+            self._slot_free.notify_all()
+            self._results[seq] = result
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+        self._drain()
+
+    def _watch_deadlines(self):
+        """마감 시각이 지난 요청을 건너뛰고 자리를 비움 (풀마다 스레드 하나)"""
+        while True:
+            with self._lock:
+                expired = []
+                now = time.monotonic()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    _, seq = heapq.heappop(self._deadlines)
+                    if seq in self._running:  # 이미 끝난 요청의 마감은 무시
+                        self._running.discard(seq)
+                        self._expired.add(seq)
+                        self.in_flight -= 1
+                        self._results[seq] = _TIMED_OUT
+                        self.timeouts += 1
+                        expired.append(seq)
+                if expired:
+                    self._slot_free.notify_all()
+                elif self._closed:
+                    return
+                else:
+                    wait = self._deadlines[0][0] - now if self._deadlines else None
+                    self._deadline_changed.wait(wait)
+                    continue
+            for seq in expired:
+                print(f"[ERROR] 작업 풀 '{self.name}' 요청 #{seq} 시간 초과 ({self.timeout}초), 건너뜀")
+            self._drain()
+
+    def _drain(self):
+        """앞 순번부터 연속으로 준비된 결과를 전달"""
+        with self._deliver_lock:
+            while True:
+                with self._lock:
+                    seq = self._next_deliver
+                    if seq not in self._results:
+                        self._idle.notify_all()
+                        return
+                    result = self._results.pop(seq)
+                    item = self._items.pop(seq)
+                    self._next_deliver += 1
+                if result is _TIMED_OUT:
+                    result = None
+                try:
+                    self.on_result(item, result)
+                except Exception as e:
+                    print(f"[ERROR] 작업 풀 '{self.name}' 결과 처리 오류: {str(e)}")
+
+    def close(self, timeout=None):
+        """제출된 작업이 모두 전달될 때까지 (최대 timeout초) 기다린 뒤 풀 종료"""
+        with self._lock:
+            self._idle.wait_for(lambda: self._next_deliver >= self._next_submit, timeout)
+            self._closed = True
+            self._deadline_changed.notify()
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "abandoned": self.abandoned,
+            "max_workers": self.max_workers,
+            "blocked": self.blocked,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+        }